@@ -1,37 +1,68 @@
-from flask import Flask, jsonify, request, session
+from flask import Flask, jsonify, request, session, Response
 from flask_cors import CORS
+from flask_sock import Sock
 import subprocess
 import psutil
 import os
+import sys
 import json
-from datetime import datetime
+from datetime import datetime, timezone
 import paramiko
 import threading
 import shutil
 import urllib.request
+import urllib.error
+import urllib.parse
+import http.client
 import zipfile
+import zlib
 import tarfile
 import time
 from pathlib import Path
 import base64
 from cryptography.fernet import Fernet
 import re
+import queue
+import socket
+import sqlite3
+import copy
+import secrets
+import hashlib
+import shlex
+import fnmatch
+import mimetypes
+import heapq
+import functools
+import stat
+import fcntl
+import struct
+import ctypes
+import ctypes.util
+import signal
+import select
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from array import array
+from collections import deque, OrderedDict
+
+try:
+    import zstandard
+except ImportError:
+    # Optional, only needed for tar.zst directory downloads
+    zstandard = None
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-change-this-in-production'
 CORS(app, supports_credentials=True)
-
-# SSH connections storage (in-memory, use Redis in production)
-# Each connection has: client, channel, host, username, current_dir
-ssh_connections = {}
-
-# Gameserver installation status
-gameserver_installations = {}
+sock = Sock(app)
 
 # Data files
+DATABASE_FILE = 'data/homeserver.db'
+# Legacy JSON files, migrated into DATABASE_FILE on first start
 DNS_FILE = 'data/dns_entries.json'
 WEBSPACE_FILE = 'data/webspaces.json'
 GAMESERVER_FILE = 'data/gameservers.json'
+SERVICES_FILE = 'data/services.json'
 CREDENTIALS_FILE = 'data/credentials.enc'
 
 # Encryption key for credentials (in production, use environment variable!)
@@ -58,12 +89,6 @@ except PermissionError:
     os.makedirs(GAMESERVER_BASE_DIR, exist_ok=True)
     print(f"   Fallback: Verwende {GAMESERVER_BASE_DIR}")
 
-# Initialize data files if they don't exist
-for file in [DNS_FILE, WEBSPACE_FILE, GAMESERVER_FILE]:
-    if not os.path.exists(file):
-        with open(file, 'w') as f:
-            json.dump([], f)
-
 # Helper Functions
 def run_command(command):
     """Execute a shell command and return the output"""
@@ -95,14 +120,269 @@ def load_json_file(filename):
         return []
 
 def save_json_file(filename, data):
-    """Save data to a JSON file"""
+    """Save data to a JSON file (atomically via temp file + rename)"""
+    tmp_file = f"{filename}.tmp"
     try:
-        with open(filename, 'w') as f:
+        with open(tmp_file, 'w') as f:
             json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        # A crash leaves either the old or the new file, never a truncated one
+        os.replace(tmp_file, filename)
         return True
     except:
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
         return False
 
+# Database
+# Seconds between checks of the database files for changes by other processes
+DATABASE_CHECK_INTERVAL = 1.0
+
+class DataStore:
+    """SQLite storage for gameservers, DNS entries and webspaces with a write-through cache"""
+
+    # table -> (key column, legacy JSON file)
+    TABLES = {
+        'gameservers': ('name', GAMESERVER_FILE),
+        'dns_entries': ('domain', DNS_FILE),
+        'webspaces': ('domain', WEBSPACE_FILE),
+    }
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS gameservers (
+            name TEXT PRIMARY KEY,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS dns_entries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            domain TEXT NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_dns_entries_domain ON dns_entries(domain);
+        CREATE TABLE IF NOT EXISTS webspaces (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            domain TEXT NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_webspaces_domain ON webspaces(domain);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+    def __init__(self, path=DATABASE_FILE):
+        self.path = path
+        self.local = threading.local()
+        # All reads are served from the cache; writes update SQLite first, then the cache
+        self.cache_lock = threading.RLock()
+        self.cache = {}  # table -> OrderedDict(rowid -> record)
+        self.index = {}  # table -> {key value -> [rowids]}
+        self.signature = None
+        self.checked = 0
+        self.connection().executescript(self.SCHEMA)
+        self.migrate_json_files()
+        self.load_cache()
+
+    def connection(self):
+        """Return the SQLite connection of the current thread"""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            # Autocommit mode, transactions are opened explicitly in transaction()
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self.local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Run a block of statements atomically (write lock is taken up front)"""
+        conn = self.connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+            conn.execute('COMMIT')
+        except:
+            conn.execute('ROLLBACK')
+            raise
+
+    def migrate_json_files(self):
+        """Import the legacy JSON files once, then rename them to *.migrated"""
+        for table, (key, filename) in self.TABLES.items():
+            marker = f'migrated:{table}'
+            conn = self.connection()
+            if conn.execute('SELECT 1 FROM meta WHERE key = ?', (marker,)).fetchone():
+                continue
+            records = load_json_file(filename) if os.path.exists(filename) else []
+            with self.transaction() as conn:
+                for record in records:
+                    if not record.get(key):
+                        continue
+                    conn.execute(
+                        f'INSERT OR IGNORE INTO {table} ({key}, data) VALUES (?, ?)',
+                        (record[key], json.dumps(record))
+                    )
+                conn.execute('INSERT INTO meta (key, value) VALUES (?, ?)', (marker, datetime.now().isoformat()))
+            if os.path.exists(filename):
+                os.replace(filename, filename + '.migrated')
+                print(f"[DATABASE] {len(records)} Einträge aus {filename} übernommen")
+
+    # Cache
+    def _file_signature(self):
+        """mtime and size of the database and its WAL file"""
+        signature = []
+        for path in (self.path, self.path + '-wal'):
+            try:
+                st = os.stat(path)
+                signature.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def load_cache(self):
+        """(Re)load all tables into memory"""
+        with self.cache_lock:
+            conn = self.connection()
+            for table, (key, _) in self.TABLES.items():
+                records = OrderedDict()
+                index = {}
+                for rowid, key_value, data in conn.execute(f'SELECT rowid, {key}, data FROM {table} ORDER BY rowid'):
+                    records[rowid] = json.loads(data)
+                    index.setdefault(key_value, []).append(rowid)
+                self.cache[table] = records
+                self.index[table] = index
+            self.signature = self._file_signature()
+            self.checked = time.time()
+
+    def _check_external_changes(self):
+        """Reload the cache if the database files were modified by someone else"""
+        now = time.time()
+        if now - self.checked < DATABASE_CHECK_INTERVAL:
+            return
+        self.checked = now
+        if self._file_signature() != self.signature:
+            print("[DATABASE] Externe Änderung erkannt, lade Cache neu")
+            self.load_cache()
+
+    @contextmanager
+    def _write(self):
+        """Transaction for our own writes that keeps the cache signature in step
+
+        The signature is compared while the write lock is held, before our
+        change, so an external edit made since the last check is not hidden
+        by taking the signature after our own write.
+        """
+        with self.transaction() as conn:
+            external = self._file_signature() != self.signature
+            yield conn
+        if external:
+            print("[DATABASE] Externe Änderung erkannt, lade Cache neu")
+            self.load_cache()
+        else:
+            self.signature = self._file_signature()
+
+    def _cache_put(self, table, rowid, record):
+        key = self.TABLES[table][0]
+        if rowid not in self.cache[table]:
+            self.index[table].setdefault(record[key], []).append(rowid)
+        self.cache[table][rowid] = copy.deepcopy(record)
+
+    # Generic helpers (table names only ever come from TABLES)
+    def _list(self, table):
+        with self.cache_lock:
+            self._check_external_changes()
+            return [copy.deepcopy(record) for record in self.cache[table].values()]
+
+    def _get(self, table, key_value):
+        with self.cache_lock:
+            self._check_external_changes()
+            rowids = self.index[table].get(key_value)
+            return copy.deepcopy(self.cache[table][rowids[0]]) if rowids else None
+
+    def _insert(self, table, record):
+        key = self.TABLES[table][0]
+        with self.cache_lock:
+            self._check_external_changes()
+            try:
+                with self._write() as conn:
+                    cursor = conn.execute(f'INSERT INTO {table} ({key}, data) VALUES (?, ?)', (record[key], json.dumps(record)))
+            except sqlite3.IntegrityError:
+                return False
+            self._cache_put(table, cursor.lastrowid, record)
+        return True
+
+    def _delete(self, table, key_value):
+        key = self.TABLES[table][0]
+        with self.cache_lock:
+            self._check_external_changes()
+            with self._write() as conn:
+                deleted = conn.execute(f'DELETE FROM {table} WHERE {key} = ?', (key_value,)).rowcount
+            for rowid in self.index[table].pop(key_value, []):
+                self.cache[table].pop(rowid, None)
+        return deleted
+
+    # Gameservers
+    def list_gameservers(self):
+        return self._list('gameservers')
+
+    def gameserver_names(self):
+        with self.cache_lock:
+            self._check_external_changes()
+            return list(self.index['gameservers'])
+
+    def get_gameserver(self, name):
+        return self._get('gameservers', name)
+
+    def add_gameserver(self, record):
+        """Insert a gameserver, returns False if the name is already taken"""
+        return self._insert('gameservers', record)
+
+    def update_gameserver(self, name, updates, remove=()):
+        """Atomically merge fields into a gameserver record (returns the new record or None)"""
+        with self.cache_lock:
+            self._check_external_changes()
+            with self._write() as conn:
+                row = conn.execute('SELECT rowid, data FROM gameservers WHERE name = ?', (name,)).fetchone()
+                if not row:
+                    return None
+                rowid, data = row
+                record = json.loads(data)
+                record.update(updates)
+                for field in remove:
+                    record.pop(field, None)
+                conn.execute('UPDATE gameservers SET data = ? WHERE rowid = ?', (json.dumps(record), rowid))
+            self._cache_put('gameservers', rowid, record)
+        return record
+
+    def delete_gameserver(self, name):
+        return self._delete('gameservers', name) > 0
+
+    # DNS entries
+    def list_dns_entries(self):
+        return self._list('dns_entries')
+
+    def add_dns_entry(self, entry):
+        return self._insert('dns_entries', entry)
+
+    def delete_dns_entries(self, domain):
+        return self._delete('dns_entries', domain)
+
+    # Webspaces
+    def list_webspaces(self):
+        return self._list('webspaces')
+
+    def add_webspace(self, webspace):
+        return self._insert('webspaces', webspace)
+
+    def delete_webspaces(self, domain):
+        return self._delete('webspaces', domain)
+
+store = DataStore()
+
 def save_credentials(username, password, host='localhost', port=22):
     """Save encrypted credentials"""
     global linux_credentials
@@ -119,6 +399,8 @@ def save_credentials(username, password, host='localhost', port=22):
             f.write(encrypted)
         # Store in memory
         linux_credentials = credentials
+        # Pooled connections were authenticated with the old credentials
+        ssh_pool.close_all()
         return True
     except Exception as e:
         print(f"Error saving credentials: {e}")
@@ -146,31 +428,135 @@ def delete_credentials():
         if os.path.exists(CREDENTIALS_FILE):
             os.remove(CREDENTIALS_FILE)
         linux_credentials = None
+        ssh_pool.close_all()
         return True
     except Exception as e:
         print(f"Error deleting credentials: {e}")
         return False
 
+# SSH Connection Pool
+# Seconds between SSH keepalive packets on pooled transports
+SSH_POOL_KEEPALIVE = 30
+
+class SSHConnectionPool:
+    """Keeps authenticated SSH connections open and runs each command on its own channel"""
+
+    def __init__(self, keepalive=SSH_POOL_KEEPALIVE):
+        self.keepalive = keepalive
+        self.clients = {}  # (host, port, username) -> paramiko.SSHClient
+        self.connect_locks = {}  # (host, port, username) -> lock, avoids parallel handshakes
+        self.lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'reconnects': 0,
+            'errors': 0,
+            'handshakes': 0,
+            'handshake_time_total': 0.0,
+            'handshake_time_last': None
+        }
+
+    def _key(self, credentials):
+        return (credentials['host'], int(credentials['port']), credentials['username'])
+
+    def _is_healthy(self, client):
+        transport = client.get_transport()
+        if not transport or not transport.is_active() or not transport.is_authenticated():
+            return False
+        try:
+            # Cheap write on the socket, fails fast if the peer is gone
+            transport.send_ignore()
+            return True
+        except Exception:
+            return False
+
+    def checkout(self, credentials):
+        """Return a connected client for the credentials, reconnecting if necessary"""
+        key = self._key(credentials)
+        with self.lock:
+            connect_lock = self.connect_locks.setdefault(key, threading.Lock())
+        with connect_lock:
+            with self.lock:
+                client = self.clients.get(key)
+            if client and self._is_healthy(client):
+                with self.lock:
+                    self.stats['hits'] += 1
+                return client
+
+            with self.lock:
+                self.stats['misses'] += 1
+                if client:
+                    self.stats['reconnects'] += 1
+            if client:
+                client.close()
+
+            start = time.time()
+            client = paramiko.SSHClient()
+            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            client.connect(
+                hostname=credentials['host'],
+                port=credentials['port'],
+                username=credentials['username'],
+                password=credentials['password'],
+                timeout=10
+            )
+            client.get_transport().set_keepalive(self.keepalive)
+            elapsed = time.time() - start
+
+            with self.lock:
+                self.clients[key] = client
+                self.stats['handshakes'] += 1
+                self.stats['handshake_time_total'] += elapsed
+                self.stats['handshake_time_last'] = elapsed
+            return client
+
+    def discard(self, credentials):
+        """Drop a connection that failed while in use"""
+        with self.lock:
+            client = self.clients.pop(self._key(credentials), None)
+            self.stats['errors'] += 1
+        if client:
+            client.close()
+
+    def close_all(self):
+        with self.lock:
+            clients = list(self.clients.values())
+            self.clients.clear()
+        for client in clients:
+            client.close()
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats['connections'] = len(self.clients)
+            stats['active'] = sum(1 for client in self.clients.values()
+                                  if client.get_transport() and client.get_transport().is_active())
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else None
+        stats['handshake_time_avg'] = (round(stats['handshake_time_total'] / stats['handshakes'], 4)
+                                       if stats['handshakes'] else None)
+        return stats
+
+ssh_pool = SSHConnectionPool()
+
 def run_sudo_command(command, use_credentials=True):
     """Execute a sudo command using stored credentials"""
     if use_credentials and linux_credentials:
         try:
-            # Use SSH to execute command with password
-            ssh = paramiko.SSHClient()
-            ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            ssh.connect(
-                hostname=linux_credentials['host'],
-                port=linux_credentials['port'],
-                username=linux_credentials['username'],
-                password=linux_credentials['password'],
-                timeout=10
-            )
-            
             # Execute with sudo
             if not command.startswith('sudo'):
                 command = f'sudo -S {command}'
             
-            stdin, stdout, stderr = ssh.exec_command(command, get_pty=True)
+            # Reuse the pooled connection; retry once on a fresh one if it went stale
+            for attempt in range(2):
+                ssh = ssh_pool.checkout(linux_credentials)
+                try:
+                    stdin, stdout, stderr = ssh.exec_command(command, get_pty=True)
+                    break
+                except (paramiko.SSHException, EOFError, OSError):
+                    ssh_pool.discard(linux_credentials)
+                    if attempt:
+                        raise
             
             # Send password if prompted
             stdin.write(linux_credentials['password'] + '\n')
@@ -179,8 +565,7 @@ def run_sudo_command(command, use_credentials=True):
             output = stdout.read().decode('utf-8', errors='ignore')
             error = stderr.read().decode('utf-8', errors='ignore')
             exit_code = stdout.channel.recv_exit_status()
-            
-            ssh.close()
+            stdout.channel.close()
             
             return {
                 'success': exit_code == 0,
@@ -198,51 +583,738 @@ def run_sudo_command(command, use_credentials=True):
         # Fallback to local command
         return run_command(command)
 
-def download_file(url, dest_path, callback=None):
-    """Download file with progress tracking"""
+# Downloads
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+# Files above DOWNLOAD_SEGMENT_MIN_SIZE are fetched in up to DOWNLOAD_SEGMENTS parallel ranges
+DOWNLOAD_SEGMENTS = 4
+DOWNLOAD_SEGMENT_MIN_SIZE = 8 * 1024 * 1024
+DOWNLOAD_RETRIES = 5
+DOWNLOAD_TIMEOUT = 30
+# Seconds between writes of the resume state of a running download
+DOWNLOAD_STATE_INTERVAL = 2.0
+DOWNLOAD_USER_AGENT = 'Homeserver-API'
+
+# Known checksums of installer artifacts, verified after every download
+DOWNLOAD_MANIFEST = {
+    'https://piston-data.mojang.com/v1/objects/145ff0858209bcfc164859ba735d4199aafa1eea/server.jar': {
+        'sha1': '145ff0858209bcfc164859ba735d4199aafa1eea'
+    }
+}
+
+CONTENT_RANGE_PATTERN = re.compile(r'bytes\s+(\d+)-(\d+)/(\d+|\*)')
+
+class DownloadError(Exception):
+    pass
+
+class RemoteFileChanged(DownloadError):
+    """The file on the server no longer matches the partially downloaded one"""
+
+class Downloader:
+    """HTTP downloader with Range resume, parallel segments and checksum verification
+
+    Data is written into a preallocated `<dest>.part` file; the byte ranges still
+    missing are kept in `<dest>.part.json` so an interrupted download continues
+    where it stopped instead of starting from zero. The server's ETag or
+    Last-Modified is stored with them and sent as If-Range, so a file that was
+    replaced in the meantime is downloaded again instead of being spliced.
+    """
+
+    def __init__(self, chunk_size=DOWNLOAD_CHUNK_SIZE, segments=DOWNLOAD_SEGMENTS,
+                 segment_min_size=DOWNLOAD_SEGMENT_MIN_SIZE, retries=DOWNLOAD_RETRIES):
+        self.chunk_size = chunk_size
+        self.segments = segments
+        self.segment_min_size = segment_min_size
+        self.retries = retries
+        # Private opener: install_opener() would change urllib globally for all threads
+        self.opener = urllib.request.build_opener()
+
+    def download(self, url, dest_path, callback=None, checksum=None):
+        """Download url to dest_path; callback(downloaded_bytes, total_bytes) reports progress"""
+        part_path = f"{dest_path}.part"
+        state_path = f"{part_path}.json"
+        state = self._load_state(state_path, url, part_path)
+        probe = self._probe(url)
+        size, _, validator = probe
+
+        if state is not None and (state['size'], state.get('validator')) != (size, validator):
+            print(f"[DOWNLOAD] Datei auf dem Server geändert, starte neu: {dest_path}")
+            state = None
+        if state is None:
+            state = self._start(url, part_path, state_path, *probe)
+        else:
+            print(f"[DOWNLOAD] Setze Download fort: {dest_path}")
+
+        try:
+            self._fetch(url, part_path, state, state_path, callback)
+        except RemoteFileChanged:
+            # The file was replaced between probe and fetch: the .part data is stale
+            print(f"[DOWNLOAD] Datei auf dem Server geändert, starte neu: {dest_path}")
+            state = self._start(url, part_path, state_path, *self._probe(url))
+            self._fetch(url, part_path, state, state_path, callback)
+
+        try:
+            os.remove(state_path)
+        except OSError:
+            pass
+        if checksum:
+            self.verify(part_path, checksum)
+        os.replace(part_path, dest_path)
+        return os.path.getsize(dest_path)
+
+    def _start(self, url, part_path, state_path, size, ranges, validator):
+        """Create an empty preallocated .part file and its resume state"""
+        state = {'url': url, 'size': size, 'ranges': ranges, 'validator': validator,
+                 'segments': self._split(size, ranges)}
+        with open(part_path, 'wb') as f:
+            if size:
+                self._preallocate(f.fileno(), size)
+        save_json_file(state_path, state)
+        return state
+
+    def _fetch(self, url, part_path, state, state_path, callback):
+        progress = _DownloadProgress(state, state_path, callback)
+        fd = os.open(part_path, os.O_WRONLY)
+        try:
+            if state['ranges']:
+                self._fetch_segments(url, fd, state, progress)
+            else:
+                self._fetch_stream(url, fd, state, progress)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+            progress.save()
+
+    @staticmethod
+    def verify(path, checksum):
+        """Compare the file against {'sha1'|'sha256': hexdigest}; a mismatch discards it"""
+        for algorithm, expected in checksum.items():
+            digest = hashlib.new(algorithm)
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(block)
+            if digest.hexdigest() != expected.lower():
+                os.remove(path)
+                raise DownloadError(f"{algorithm} stimmt nicht überein: {digest.hexdigest()} != {expected}")
+
+    def _request(self, url, start=None, end=None, validator=None):
+        headers = {'User-Agent': DOWNLOAD_USER_AGENT}
+        if start is not None:
+            headers['Range'] = f"bytes={start}-{'' if end is None else end}"
+            if validator:
+                # A changed file is answered with 200 and the full body instead of 206
+                headers['If-Range'] = validator
+        return self.opener.open(urllib.request.Request(url, headers=headers), timeout=DOWNLOAD_TIMEOUT)
+
+    @staticmethod
+    def _validator(response):
+        """Strong ETag or Last-Modified of a response (weak ETags are not allowed in If-Range)"""
+        etag = response.headers.get('ETag')
+        if etag and not etag.startswith('W/'):
+            return etag
+        return response.headers.get('Last-Modified')
+
+    def _probe(self, url):
+        """Return (size, supports_ranges, validator) using a one-byte range request"""
+        with self._request(url, 0, 0) as response:
+            validator = self._validator(response)
+            match = CONTENT_RANGE_PATTERN.match(response.headers.get('Content-Range', ''))
+            if response.status == 206 and match and match.group(3) != '*':
+                return int(match.group(3)), True, validator
+            length = response.headers.get('Content-Length')
+            return (int(length) if length else None), False, validator
+
+    def _split(self, size, ranges):
+        """Divide the file into [start, end, position] segments (end inclusive)"""
+        if not ranges or not size:
+            return [[0, size - 1 if size else None, 0]]
+        count = max(1, min(self.segments, size // self.segment_min_size))
+        bounds = [size * i // count for i in range(count + 1)]
+        return [[bounds[i], bounds[i + 1] - 1, bounds[i]] for i in range(count)]
+
+    @staticmethod
+    def _load_state(state_path, url, part_path):
+        try:
+            with open(state_path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get('url') != url or not state.get('ranges') or not os.path.exists(part_path):
+            return None
+        return state
+
+    @staticmethod
+    def _preallocate(fd, size):
+        try:
+            os.posix_fallocate(fd, 0, size)
+        except (AttributeError, OSError):
+            os.ftruncate(fd, size)
+
+    def _fetch_segments(self, url, fd, state, progress):
+        pending = [segment for segment in state['segments'] if segment[2] <= segment[1]]
+        errors = []
+        # Set on the first failure so the other segments stop instead of finishing a doomed download
+        stop = threading.Event()
+
+        def worker(segment):
+            # BaseException: a cancellation raised by the progress callback must not end
+            # a thread silently and leave a zero-filled hole in a "complete" file
+            try:
+                self._fetch_range(url, fd, segment, progress, stop)
+            except BaseException as e:
+                errors.append(e)
+                stop.set()
+
+        threads = [threading.Thread(target=worker, args=(segment,), daemon=True) for segment in pending[1:]]
+        try:
+            for thread in threads:
+                thread.start()
+            if pending:
+                worker(pending[0])
+        finally:
+            # The caller closes fd afterwards, no thread may still be writing to it
+            for thread in threads:
+                if thread.ident is not None:
+                    thread.join()
+        if errors:
+            # A cancellation (not an Exception) wins over the errors it caused elsewhere
+            raise next((e for e in errors if not isinstance(e, Exception)), errors[0])
+
+    def _fetch_range(self, url, fd, segment, progress, stop):
+        start, end, _ = segment
+        attempt = 0
+        while segment[2] <= end and not stop.is_set():
+            try:
+                validator = progress.state.get('validator')
+                with self._request(url, segment[2], end, validator) as response:
+                    if response.status != 206:
+                        if validator:
+                            raise RemoteFileChanged(f"If-Range nicht erfüllt (HTTP {response.status})")
+                        raise DownloadError(f"Server ignoriert Range-Anfrage (HTTP {response.status})")
+                    if validator and self._validator(response) not in (None, validator):
+                        raise RemoteFileChanged('Validator stimmt nicht überein')
+                    while segment[2] <= end:
+                        if stop.is_set():
+                            return
+                        data = response.read(min(self.chunk_size, end - segment[2] + 1))
+                        if not data:
+                            break
+                        os.pwrite(fd, data, segment[2])
+                        progress.advance(segment, len(data))
+                        attempt = 0
+                if segment[2] <= end:
+                    raise ConnectionError('Verbindung vorzeitig beendet')
+            except (OSError, http.client.HTTPException) as e:
+                attempt = self._retry(attempt, e, stop)
+
+    def _fetch_stream(self, url, fd, state, progress):
+        """Fallback for servers without Range support: restart from zero on errors"""
+        segment = state['segments'][0]
+        attempt = 0
+        while True:
+            try:
+                progress.reset(segment)
+                with self._request(url) as response:
+                    while True:
+                        data = response.read(self.chunk_size)
+                        if not data:
+                            break
+                        os.pwrite(fd, data, segment[2])
+                        progress.advance(segment, len(data))
+                if state['size'] and segment[2] < state['size']:
+                    raise ConnectionError('Verbindung vorzeitig beendet')
+                os.ftruncate(fd, segment[2])
+                return
+            except (OSError, http.client.HTTPException) as e:
+                attempt = self._retry(attempt, e)
+
+    def _retry(self, attempt, error, stop=None):
+        # Client errors (404, 403, ...) will not go away by retrying
+        if isinstance(error, urllib.error.HTTPError) and error.code < 500:
+            raise error
+        attempt += 1
+        if attempt > self.retries:
+            raise error
+        print(f"[DOWNLOAD] Fehler: {error}, Versuch {attempt}/{self.retries}")
+        delay = min(2 ** attempt, 30)
+        if stop:
+            stop.wait(delay)
+        else:
+            time.sleep(delay)
+        return attempt
+
+class _DownloadProgress:
+    """Thread-safe byte counter that also persists the resume state periodically"""
+
+    def __init__(self, state, state_path, callback):
+        self.state = state
+        self.state_path = state_path
+        self.callback = callback
+        self.lock = threading.Lock()
+        self.downloaded = sum(segment[2] - segment[0] for segment in state['segments'])
+        self.saved = time.time()
+        self._report()
+
+    def advance(self, segment, count):
+        with self.lock:
+            segment[2] += count
+            self.downloaded += count
+            self._report()
+            if time.time() - self.saved >= DOWNLOAD_STATE_INTERVAL:
+                self._save()
+
+    def reset(self, segment):
+        with self.lock:
+            self.downloaded -= segment[2] - segment[0]
+            segment[2] = segment[0]
+            self._report()
+
+    def save(self):
+        with self.lock:
+            self._save()
+
+    def _save(self):
+        if self.state['ranges']:
+            save_json_file(self.state_path, self.state)
+        self.saved = time.time()
+
+    def _report(self):
+        if self.callback:
+            self.callback(self.downloaded, self.state['size'])
+
+downloader = Downloader()
+
+def download_file(url, dest_path, callback=None, checksum=None):
+    """Download file with progress tracking, resume and checksum verification"""
     try:
         print(f"[DOWNLOAD] Starte Download: {url} -> {dest_path}")
-        
-        # Create opener that follows redirects
-        opener = urllib.request.build_opener(urllib.request.HTTPRedirectHandler)
-        urllib.request.install_opener(opener)
-        
-        def reporthook(block_num, block_size, total_size):
-            if callback and total_size > 0:
-                downloaded = block_num * block_size
-                percent = min(100, (downloaded * 100) // total_size)
-                callback(percent)
-        
-        urllib.request.urlretrieve(url, dest_path, reporthook)
-        
-        if os.path.exists(dest_path):
-            file_size = os.path.getsize(dest_path)
-            print(f"[DOWNLOAD] Download erfolgreich: {dest_path} ({file_size} bytes)")
-            return True
-        else:
-            print(f"[DOWNLOAD ERROR] Datei existiert nicht nach Download: {dest_path}")
-            return False
+        file_size = downloader.download(url, dest_path, callback, checksum or DOWNLOAD_MANIFEST.get(url))
+        print(f"[DOWNLOAD] Download erfolgreich: {dest_path} ({file_size} bytes)")
+        return True
     except Exception as e:
         print(f"[DOWNLOAD ERROR] Download fehlgeschlagen: {e}")
         import traceback
         traceback.print_exc()
         return False
 
-def extract_archive(archive_path, extract_to):
-    """Extract zip or tar.gz archives"""
+# Artifact Cache
+ARTIFACT_CACHE_DIR = 'data/artifacts'
+ARTIFACT_CACHE_MAX_SIZE = 10 * 1024 ** 3
+# ioctl that clones a file's extents on copy-on-write filesystems (btrfs, XFS)
+FICLONE = 0x40049409
+
+def clone_file(source, target):
+    """Reflink source to target, falling back to a plain copy
+
+    Never hardlinks: both sides stay independently writable. Returns 'reflink' or 'copy'.
+    """
     try:
-        if archive_path.endswith('.zip'):
-            with zipfile.ZipFile(archive_path, 'r') as zip_ref:
-                zip_ref.extractall(extract_to)
-        elif archive_path.endswith('.tar.gz') or archive_path.endswith('.tgz'):
-            with tarfile.open(archive_path, 'r:gz') as tar_ref:
-                tar_ref.extractall(extract_to)
-        elif archive_path.endswith('.tar.bz2') or archive_path.endswith('.tbz2'):
-            with tarfile.open(archive_path, 'r:bz2') as tar_ref:
-                tar_ref.extractall(extract_to)
-        else:
-            print(f"[extract_archive] Unbekanntes Archivformat: {archive_path}")
+        with open(source, 'rb') as src, open(target, 'wb') as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        shutil.copystat(source, target)
+        return 'reflink'
+    except OSError:
+        if os.path.exists(target):
+            os.remove(target)
+    shutil.copy2(source, target)
+    return 'copy'
+
+class ArtifactCache:
+    """Content-addressed store of downloaded installer artifacts
+
+    Objects live under objects/<sha256[:2]>/<sha256>; index.json maps each URL
+    to its object. Objects are read-only and installers get reflinked copies
+    (a plain copy where reflinks are unsupported), never hardlinks: server files
+    are edited in place by the file manager and would otherwise change the cache.
+    """
+
+    def __init__(self, cache_dir=ARTIFACT_CACHE_DIR, max_size=ARTIFACT_CACHE_MAX_SIZE):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.index_file = os.path.join(cache_dir, 'index.json')
+        self.lock = threading.Lock()
+        self.url_locks = {}
+        self.index = None
+        self.hits = 0
+        self.misses = 0
+
+    def fetch(self, url, dest_path, callback=None, checksum=None):
+        """Place the artifact for url at dest_path, downloading it only on a cache miss"""
+        with self._url_lock(url):
+            entry = self._lookup(url, checksum)
+            if entry and not self._intact(entry):
+                print(f"[ARTIFACTS] Cache-Objekt {entry['sha256'][:12]} verändert, lade neu")
+                self._discard(url)
+                entry = None
+            if entry:
+                self.hits += 1
+                print(f"[ARTIFACTS] Cache-Treffer für {url}")
+            else:
+                self.misses += 1
+                entry = self._download(url, callback, checksum)
+            self._place(self._object_path(entry['sha256']), dest_path)
+            if callback:
+                callback(entry['size'], entry['size'])
+            return entry
+
+    def stats(self):
+        with self.lock:
+            index = self._load_index()
+            objects = {entry['sha256']: entry['size'] for entry in index.values()}
+            return {
+                'artifacts': len(index),
+                'objects': len(objects),
+                'size': sum(objects.values()),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+    def _url_lock(self, url):
+        with self.lock:
+            return self.url_locks.setdefault(url, threading.Lock())
+
+    def _load_index(self):
+        if self.index is None:
+            index = load_json_file(self.index_file)
+            self.index = index if isinstance(index, dict) else {}
+        return self.index
+
+    def _object_path(self, sha256):
+        return os.path.join(self.cache_dir, 'objects', sha256[:2], sha256)
+
+    def _lookup(self, url, checksum):
+        with self.lock:
+            entry = self._load_index().get(url)
+            if not entry or not os.path.exists(self._object_path(entry['sha256'])):
+                return None
+            if checksum and any(entry.get(algorithm) != expected.lower()
+                                for algorithm, expected in checksum.items()):
+                return None
+            entry['last_used'] = time.time()
+            save_json_file(self.index_file, self.index)
+            return dict(entry)
+
+    def _intact(self, entry):
+        """Cheap check against the size and mtime recorded when the object was hashed"""
+        try:
+            st = os.stat(self._object_path(entry['sha256']))
+        except OSError:
             return False
+        return st.st_size == entry['size'] and st.st_mtime_ns == entry.get('mtime_ns', st.st_mtime_ns)
+
+    def _discard(self, url):
+        """Forget url and delete its (modified) object"""
+        with self.lock:
+            entry = self._load_index().pop(url, None)
+            save_json_file(self.index_file, self.index)
+        if entry:
+            try:
+                os.remove(self._object_path(entry['sha256']))
+            except OSError:
+                pass
+
+    def _download(self, url, callback, checksum):
+        downloads_dir = os.path.join(self.cache_dir, 'downloads')
+        os.makedirs(downloads_dir, exist_ok=True)
+        # Stable name per URL so an interrupted download resumes on the next install
+        tmp_path = os.path.join(downloads_dir, hashlib.sha256(url.encode()).hexdigest())
+        downloader.download(url, tmp_path, callback, checksum)
+
+        sha1, sha256 = hashlib.sha1(), hashlib.sha256()
+        with open(tmp_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                sha1.update(block)
+                sha256.update(block)
+        entry = {
+            'sha1': sha1.hexdigest(),
+            'sha256': sha256.hexdigest(),
+            'size': os.path.getsize(tmp_path),
+            'last_used': time.time()
+        }
+        object_path = self._object_path(entry['sha256'])
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        if os.path.exists(object_path) and os.path.getsize(object_path) == entry['size']:
+            # Same content under another URL, keep the existing object
+            os.remove(tmp_path)
+        else:
+            os.chmod(tmp_path, 0o444)
+            os.replace(tmp_path, object_path)
+        # Hashed just now; later hits only compare size and mtime against this stamp
+        entry['mtime_ns'] = os.stat(object_path).st_mtime_ns
+
+        with self.lock:
+            self._load_index()[url] = entry
+            self._evict(keep=entry['sha256'])
+            save_json_file(self.index_file, self.index)
+        return dict(entry)
+
+    def _evict(self, keep):
+        """Remove least recently used objects until the cache fits into max_size"""
+        objects = {}
+        for url, entry in self.index.items():
+            obj = objects.setdefault(entry['sha256'], {'size': entry['size'], 'last_used': 0, 'urls': []})
+            obj['last_used'] = max(obj['last_used'], entry['last_used'])
+            obj['urls'].append(url)
+        total = sum(obj['size'] for obj in objects.values())
+        for sha256, obj in sorted(objects.items(), key=lambda item: item[1]['last_used']):
+            if total <= self.max_size:
+                break
+            if sha256 == keep:
+                continue
+            try:
+                os.remove(self._object_path(sha256))
+            except OSError:
+                pass
+            for url in obj['urls']:
+                del self.index[url]
+            total -= obj['size']
+            print(f"[ARTIFACTS] Entferne {sha256[:12]} aus dem Cache ({obj['size']} bytes)")
+
+    @staticmethod
+    def _place(source, dest_path):
+        """Reflink or copy the cached object to dest_path as a writable file"""
+        os.makedirs(os.path.dirname(dest_path) or '.', exist_ok=True)
+        tmp_path = f"{dest_path}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        clone_file(source, tmp_path)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, dest_path)
+
+artifact_cache = ArtifactCache()
+
+# Archive Extraction
+EXTRACT_CHUNK_SIZE = 1024 * 1024
+EXTRACT_WORKERS = 4
+# Zip archives with less uncompressed data are extracted by a single thread
+EXTRACT_PARALLEL_MIN_SIZE = 64 * 1024 * 1024
+# Self-extracting scripts store the offset of their payload in the header
+SFX_SKIP_PATTERN = re.compile(rb'(?:skip|offset)=\D{0,20}(\d+)|tail\s+(?:-n\s*)?\+(\d+)', re.IGNORECASE)
+
+ARCHIVE_SIGNATURES = [
+    (0, b'PK\x03\x04', 'zip'),
+    (0, b'PK\x05\x06', 'zip'),
+    (0, b'\x1f\x8b', 'tar'),
+    (0, b'BZh', 'tar'),
+    (0, b'\xfd7zXZ\x00', 'tar'),
+    (257, b'ustar', 'tar'),
+    (0, b'#!', 'sfx'),
+]
+
+class ExtractError(Exception):
+    pass
+
+def detect_archive_format(header):
+    """Return 'zip', 'tar' (any compression) or 'sfx' based on the magic bytes"""
+    for offset, signature, archive_format in ARCHIVE_SIGNATURES:
+        if header[offset:offset + len(signature)] == signature:
+            return archive_format
+    return None
+
+class _CountingReader:
+    """File wrapper reporting how many bytes of the archive were consumed"""
+
+    def __init__(self, f, report):
+        self.f = f
+        self.report = report
+        self.start = f.tell()
+
+    def read(self, size=-1):
+        data = self.f.read(size)
+        self.report(self.f.tell() - self.start)
+        return data
+
+class ArchiveExtractor:
+    """Streams archive members to disk with byte progress and path checks"""
+
+    def __init__(self, archive_path, extract_to, callback=None, workers=EXTRACT_WORKERS):
+        self.archive_path = archive_path
+        self.root = os.path.realpath(extract_to)
+        self.callback = callback
+        self.workers = workers
+        self.lock = threading.Lock()
+        self.done = 0
+        self.total = 0
+
+    def extract(self):
+        with open(self.archive_path, 'rb') as f:
+            archive_format = detect_archive_format(f.read(512))
+        os.makedirs(self.root, exist_ok=True)
+        if archive_format == 'zip':
+            self._extract_zip()
+        elif archive_format == 'tar':
+            self._extract_tar(0)
+        elif archive_format == 'sfx':
+            self._extract_tar(self._sfx_payload_offset())
+        else:
+            raise ExtractError(f"Unbekanntes Archivformat: {self.archive_path}")
+
+    def _advance(self, count):
+        with self.lock:
+            self.done += count
+            done = self.done
+        self._report(done)
+
+    def _report(self, done):
+        if self.callback:
+            self.callback(min(done, self.total), self.total)
+
+    def _inside(self, path):
+        path = os.path.realpath(path)
+        return path == self.root or path.startswith(self.root + os.sep)
+
+    def _target(self, name):
+        """Resolve a member name below the extraction root, refusing anything outside"""
+        name = name.replace('\\', '/').lstrip('/')
+        target = os.path.join(self.root, name)
+        if not self._inside(target):
+            raise ExtractError(f"Unsicherer Pfad im Archiv: {name}")
+        return os.path.realpath(target)
+
+    def _copy(self, source, target, mode=None, count=True):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if os.path.islink(target):
+            os.remove(target)
+        with open(target, 'wb') as f:
+            while True:
+                chunk = source.read(EXTRACT_CHUNK_SIZE)
+                if not chunk:
+                    break
+                f.write(chunk)
+                if count:
+                    self._advance(len(chunk))
+        if mode:
+            # Never restore setuid/setgid bits from an archive
+            os.chmod(target, mode & 0o777)
+
+    # Zip: progress counts uncompressed bytes, large archives use a thread pool
+    def _extract_zip(self):
+        with zipfile.ZipFile(self.archive_path) as archive:
+            members = archive.infolist()
+            self.total = sum(member.file_size for member in members)
+            self._report(0)
+            files = []
+            for member in members:
+                target = self._target(member.filename)
+                mode = member.external_attr >> 16
+                if member.is_dir():
+                    os.makedirs(target, exist_ok=True)
+                elif stat.S_ISLNK(mode):
+                    self._symlink(archive.read(member).decode(), target)
+                    self._advance(member.file_size)
+                else:
+                    files.append((member, target, mode))
+
+        if self.total < EXTRACT_PARALLEL_MIN_SIZE or self.workers < 2:
+            with zipfile.ZipFile(self.archive_path) as archive:
+                for member, target, mode in files:
+                    self._extract_zip_member(archive, member, target, mode)
+            return
+
+        local = threading.local()
+        opened = []
+
+        def work(item):
+            # ZipFile objects must not be shared between threads
+            if not hasattr(local, 'archive'):
+                local.archive = zipfile.ZipFile(self.archive_path)
+                opened.append(local.archive)
+            self._extract_zip_member(local.archive, *item)
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                # Largest first keeps the workers evenly busy
+                for future in [pool.submit(work, item) for item in
+                               sorted(files, key=lambda item: item[0].file_size, reverse=True)]:
+                    future.result()
+        finally:
+            for archive in opened:
+                archive.close()
+
+    def _extract_zip_member(self, archive, member, target, mode):
+        with archive.open(member) as source:
+            self._copy(source, target, mode if stat.S_ISREG(mode) else None)
+
+    # Tar: streamed in one pass, progress counts compressed bytes read
+    def _extract_tar(self, offset):
+        self.total = os.path.getsize(self.archive_path) - offset
+        self._report(0)
+        with open(self.archive_path, 'rb') as raw:
+            raw.seek(offset)
+            reader = _CountingReader(raw, self._report)
+            with tarfile.open(fileobj=reader, mode='r|*') as archive:
+                for member in archive:
+                    target = self._target(member.name)
+                    if member.isdir():
+                        os.makedirs(target, exist_ok=True)
+                    elif member.isfile():
+                        self._copy(archive.extractfile(member), target, member.mode, count=False)
+                        os.utime(target, (member.mtime, member.mtime))
+                    elif member.issym():
+                        self._symlink(member.linkname, target)
+                    elif member.islnk():
+                        source = self._target(member.linkname)
+                        if os.path.exists(target):
+                            os.remove(target)
+                        os.link(source, target)
+                    # Devices and FIFOs are skipped
+        self._report(self.total)
+
+    def _symlink(self, link_target, target):
+        # The link must resolve inside the extraction root as well
+        if not self._inside(os.path.join(os.path.dirname(target), link_target)):
+            raise ExtractError(f"Unsicherer Link im Archiv: {target} -> {link_target}")
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if os.path.lexists(target):
+            os.remove(target)
+        os.symlink(link_target, target)
+
+    def _sfx_payload_offset(self):
+        """Locate the tar payload appended to a self-extracting shell script"""
+        with open(self.archive_path, 'rb') as f:
+            header = f.read(64 * 1024)
+        match = SFX_SKIP_PATTERN.search(header)
+        if match:
+            # Payload starts at the given line (tail -n +N) or after N header lines (skip=N)
+            line = int(match.group(2)) - 1 if match.group(2) else int(match.group(1))
+            position = 0
+            with open(self.archive_path, 'rb') as f:
+                for _ in range(line):
+                    if not f.readline():
+                        break
+                position = f.tell()
+                payload_format = detect_archive_format(f.read(512))
+            if payload_format == 'tar':
+                return position
+        # No usable header hint: take the first compressed stream starting at a line
+        for signature in (b'\n\x1f\x8b\x08', b'\nBZh', b'\n\xfd7zXZ\x00'):
+            index = self._find(signature)
+            if index >= 0:
+                return index + 1
+        raise ExtractError(f"Kein Archiv im Skript gefunden: {self.archive_path}")
+
+    def _find(self, signature):
+        with open(self.archive_path, 'rb') as f:
+            position = 0
+            tail = b''
+            while True:
+                block = f.read(EXTRACT_CHUNK_SIZE)
+                if not block:
+                    return -1
+                data = tail + block
+                index = data.find(signature)
+                if index >= 0:
+                    return position - len(tail) + index
+                tail = data[-len(signature):]
+                position += len(block)
+
+def extract_archive(archive_path, extract_to, callback=None):
+    """Extract zip, tar(.gz/.bz2/.xz) and self-extracting shell archives
+
+    callback(done_bytes, total_bytes) reports progress while extracting.
+    """
+    try:
+        ArchiveExtractor(archive_path, extract_to, callback).extract()
         return True
     except Exception as e:
         print(f"Extract error: {e}")
@@ -264,107 +1336,513 @@ def run_command_async(command, cwd=None):
         print(f"Command error: {e}")
         return None
 
+# Event Bus (Server-Sent Events)
+# Seconds between keepalive comments on idle SSE streams
+SSE_HEARTBEAT_INTERVAL = 15
+
+class EventBus:
+    """In-process publish/subscribe bus feeding Server-Sent Event streams"""
+
+    def __init__(self, queue_size=256):
+        self.queue_size = queue_size
+        self.subscribers = {}  # topic -> set of queues
+        self.lock = threading.Lock()
+
+    def subscribe(self, topic):
+        subscriber = queue.Queue(maxsize=self.queue_size)
+        with self.lock:
+            self.subscribers.setdefault(topic, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, topic, subscriber):
+        with self.lock:
+            subscribers = self.subscribers.get(topic)
+            if subscribers:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self.subscribers[topic]
+
+    def publish(self, topic, event):
+        with self.lock:
+            subscribers = list(self.subscribers.get(topic, ()))
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(event)
+            except queue.Full:
+                # Slow client, drop the event instead of blocking the publisher
+                pass
+
+event_bus = EventBus()
+
+def sse_response(topic, initial_events=(), until=None):
+    """Stream events published on a topic to the client as text/event-stream
+
+    The stream ends after the first event for which until(event) is true.
+    """
+    subscriber = event_bus.subscribe(topic)
+
+    def generate():
+        try:
+            for event in initial_events:
+                yield f"data: {json.dumps(event)}\n\n"
+                if until and until(event):
+                    return
+            while True:
+                try:
+                    event = subscriber.get(timeout=SSE_HEARTBEAT_INTERVAL)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"data: {json.dumps(event)}\n\n"
+                if until and until(event):
+                    return
+        finally:
+            event_bus.unsubscribe(topic, subscriber)
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+# Installation Progress
+# Seconds a finished installation stays queryable before it is dropped
+INSTALLATION_RETENTION = 15 * 60
+INSTALLATION_LOG_LINES = 200
+INSTALLATION_FINAL_STATES = ('complete', 'error', 'cancelled')
+
+class InstallationTracker:
+    """Keeps installation progress in memory and publishes every change on the event bus"""
+
+    def __init__(self, retention=INSTALLATION_RETENTION):
+        self.retention = retention
+        self.installations = {}  # installation ID -> status dict
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def topic(installation_id):
+        return f'installation:{installation_id}'
+
+    def update(self, installation_id, status, progress=0, message='', queue_position=None):
+        now = time.time()
+        with self.lock:
+            entry = self.installations.setdefault(installation_id, {
+                'log': deque(maxlen=INSTALLATION_LOG_LINES),
+                'download': None,
+                'started': now
+            })
+            entry.update({
+                'status': status,
+                'progress': progress,
+                'message': message,
+                'timestamp': now,
+                'queue_position': queue_position,
+                'finished': now if status in INSTALLATION_FINAL_STATES else None
+            })
+            if message and (not entry['log'] or entry['log'][-1] != message):
+                entry['log'].append(message)
+            event = self._event(installation_id, entry, 'status')
+        event_bus.publish(self.topic(installation_id), event)
+        self.prune()
+
+    def log(self, installation_id, line):
+        """Append an installer log line and stream it to subscribers"""
+        with self.lock:
+            entry = self.installations.get(installation_id)
+            if entry is None:
+                return
+            entry['log'].append(line)
+        event_bus.publish(self.topic(installation_id), {
+            'type': 'log',
+            'installation_id': installation_id,
+            'line': line,
+            'timestamp': time.time()
+        })
+
+    def download_progress(self, installation_id, downloaded, total):
+        """Record downloaded bytes, publishing only when the percentage changes"""
+        percent = min(100, downloaded * 100 // total) if total else None
+        with self.lock:
+            entry = self.installations.get(installation_id)
+            if entry is None:
+                return
+            previous = entry['download']
+            entry['download'] = {'bytes': downloaded, 'total': total, 'percent': percent}
+            # Without a known size publish once per MiB instead of once per percent
+            if previous and (previous['percent'] == percent if total else
+                             previous['bytes'] >> 20 == downloaded >> 20):
+                return
+        event_bus.publish(self.topic(installation_id), {
+            'type': 'download',
+            'installation_id': installation_id,
+            'bytes': downloaded,
+            'total': total,
+            'percent': percent,
+            'timestamp': time.time()
+        })
+
+    def get(self, installation_id):
+        """Return a copy of the installation status (None if unknown or expired)"""
+        self.prune()
+        with self.lock:
+            entry = self.installations.get(installation_id)
+            if entry is None:
+                return None
+            return self._status(entry)
+
+    def snapshot_event(self, installation_id):
+        with self.lock:
+            entry = self.installations.get(installation_id)
+            if entry is None:
+                return None
+            return self._event(installation_id, entry, 'snapshot')
+
+    def prune(self):
+        cutoff = time.time() - self.retention
+        with self.lock:
+            expired = [installation_id for installation_id, entry in self.installations.items()
+                       if entry['finished'] and entry['finished'] < cutoff]
+            for installation_id in expired:
+                del self.installations[installation_id]
+
+    @staticmethod
+    def is_final(event):
+        return event.get('type') in ('status', 'snapshot') and event['status']['status'] in INSTALLATION_FINAL_STATES
+
+    @staticmethod
+    def _status(entry):
+        status = {key: value for key, value in entry.items() if key != 'log'}
+        status['log'] = list(entry['log'])
+        return status
+
+    def _event(self, installation_id, entry, event_type):
+        return {
+            'type': event_type,
+            'installation_id': installation_id,
+            'status': self._status(entry),
+            'timestamp': time.time()
+        }
+
+gameserver_installations = InstallationTracker()
+
+# Gameserver Templates
+TEMPLATE_BASE_DIR = os.path.join(GAMESERVER_BASE_DIR, '.templates')
+TEMPLATE_META_FILE = '.template.json'
+
+def clone_tree(source, target, exclude=()):
+    """Recreate a directory tree with cloned files, returns {'reflink': n, 'copy': n}"""
+    counts = {'reflink': 0, 'copy': 0}
+    os.makedirs(target, exist_ok=True)
+    for entry in os.scandir(source):
+        if entry.name in exclude:
+            continue
+        target_path = os.path.join(target, entry.name)
+        if entry.is_symlink():
+            os.symlink(os.readlink(entry.path), target_path)
+        elif entry.is_dir():
+            for method, count in clone_tree(entry.path, target_path).items():
+                counts[method] += count
+        elif entry.is_file():
+            method = clone_file(entry.path, target_path)
+            counts[method] += 1
+    shutil.copystat(source, target)
+    return counts
+
+class TemplateStore:
+    """Golden templates: fully installed base directories per server type and version"""
+
+    def __init__(self, base_dir=TEMPLATE_BASE_DIR):
+        self.base_dir = base_dir
+        self.lock = threading.Lock()
+
+    def path(self, server_type, version):
+        return os.path.join(self.base_dir, server_type, version)
+
+    def exists(self, server_type, version):
+        return os.path.exists(os.path.join(self.path(server_type, version), TEMPLATE_META_FILE))
+
+    def create(self, server_type, version, source_dir, exclude=()):
+        """Capture source_dir as template unless one exists already"""
+        if self.exists(server_type, version):
+            return False
+        template_dir = self.path(server_type, version)
+        tmp_dir = f"{template_dir}.tmp-{secrets.token_hex(4)}"
+        try:
+            counts = clone_tree(source_dir, tmp_dir, exclude)
+            with open(os.path.join(tmp_dir, TEMPLATE_META_FILE), 'w') as f:
+                json.dump({
+                    'type': server_type,
+                    'version': version,
+                    'created': datetime.now().isoformat(),
+                    'files': counts
+                }, f, indent=2)
+            with self.lock:
+                if self.exists(server_type, version):
+                    shutil.rmtree(tmp_dir)
+                    return False
+                os.makedirs(os.path.dirname(template_dir), exist_ok=True)
+                if os.path.exists(template_dir):
+                    shutil.rmtree(template_dir)
+                os.rename(tmp_dir, template_dir)
+            print(f"[TEMPLATE] Vorlage erstellt: {server_type} {version} {counts}")
+            return True
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+    def clone(self, server_type, version, target_dir):
+        return clone_tree(self.path(server_type, version), target_dir, exclude=(TEMPLATE_META_FILE,))
+
+    def list(self):
+        templates = []
+        if not os.path.isdir(self.base_dir):
+            return templates
+        for server_type in sorted(os.listdir(self.base_dir)):
+            type_dir = os.path.join(self.base_dir, server_type)
+            if not os.path.isdir(type_dir):
+                continue
+            for version in sorted(os.listdir(type_dir)):
+                meta = load_json_file(os.path.join(type_dir, version, TEMPLATE_META_FILE))
+                if isinstance(meta, dict):
+                    templates.append(meta)
+        return templates
+
+    def remove(self, server_type, version=None):
+        """Delete one version or all templates of a type (existing servers keep their files)"""
+        target = self.path(server_type, version) if version else os.path.join(self.base_dir, server_type)
+        if not os.path.realpath(target).startswith(os.path.realpath(self.base_dir) + os.sep) or not os.path.isdir(target):
+            return False
+        shutil.rmtree(target)
+        return True
+
+template_store = TemplateStore()
+
 # Gameserver Installer Classes
 class GameserverInstaller:
     """Base class for gameserver installers"""
     
-    def __init__(self, server_name, port, ram):
+    server_type = None
+    # Installers with a fixed upstream version can be provisioned from a template
+    template_version = None
+    template_exclude = ()
+    
+    def __init__(self, server_name, port, ram, installation_id=None):
         self.server_name = server_name
         self.port = port
         self.ram = ram
         self.server_dir = os.path.join(GAMESERVER_BASE_DIR, server_name)
-        self.installation_id = f"{server_name}_{int(time.time())}"
+        self.installation_id = installation_id or f"{server_name}_{int(time.time())}"
+        self.cancel_event = threading.Event()
         
     def update_status(self, status, progress=0, message=""):
         """Update installation status"""
-        gameserver_installations[self.installation_id] = {
-            'status': status,
-            'progress': progress,
-            'message': message,
-            'timestamp': time.time()
+        self.check_cancelled()
+        gameserver_installations.update(self.installation_id, status, progress, message)
+    
+    def check_cancelled(self):
+        """Abort the installation at the next progress report once cancel() was requested"""
+        if self.cancel_event.is_set():
+            raise InstallationCancelled(self.installation_id)
+    
+    def log(self, line):
+        """Print a line and add it to the installation log"""
+        print(line)
+        gameserver_installations.log(self.installation_id, line)
+    
+    def run_logged(self, command):
+        """Run a shell command, adding its output to the installation log while it runs
+
+        Returns a dict like run_command(). The command is killed on cancellation.
+        """
+        process = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   start_new_session=True)
+        output = []
+        pending = b''
+        try:
+            while True:
+                if select.select([process.stdout], [], [], 0.5)[0]:
+                    data = os.read(process.stdout.fileno(), 65536)
+                    if not data:
+                        break
+                    # SteamCMD and friends redraw progress lines with \r
+                    *lines, pending = re.split(rb'[\r\n]', pending + data)
+                    for line in lines:
+                        self._log_output(line, output)
+                self.check_cancelled()
+            self._log_output(pending, output)
+        except BaseException:
+            os.killpg(process.pid, signal.SIGKILL)
+            raise
+        finally:
+            process.stdout.close()
+            returncode = process.wait()
+        return {
+            'success': True,
+            'output': '\n'.join(output),
+            'error': '',
+            'returncode': returncode
         }
     
+    def _log_output(self, line, output):
+        line = line.decode('utf-8', errors='replace').strip()
+        if line:
+            output.append(line)
+            self.log(line)
+    
+    def report_download(self, downloaded, total):
+        """download_file() progress callback"""
+        self.check_cancelled()
+        gameserver_installations.download_progress(self.installation_id, downloaded, total)
+    
+    def extract_progress(self, start, end, message):
+        """extract_archive() callback mapping extracted bytes onto the progress range start..end"""
+        last_percent = [None]
+        
+        def report(done, total):
+            self.check_cancelled()
+            percent = done * 100 // total if total else 100
+            if percent != last_percent[0]:
+                last_percent[0] = percent
+                self.update_status('installing', start + (end - start) * percent // 100, f'{message} ({percent}%)')
+        return report
+    
+    def extract(self, archive_path, extract_to, start, end, message):
+        """Extract an archive within a CPU slot, reporting progress in the range start..end"""
+        with install_scheduler.slot('cpu', self):
+            return extract_archive(archive_path, extract_to, self.extract_progress(start, end, message))
+    
+    def fetch_artifact(self, url, dest_path):
+        """Get a download through the artifact cache, returns False on failure"""
+        try:
+            with install_scheduler.slot('download', self):
+                artifact_cache.fetch(url, dest_path, self.report_download, DOWNLOAD_MANIFEST.get(url))
+            self.log(f"[INSTALLER] Datei bereitgestellt: {dest_path}")
+            return True
+        except Exception as e:
+            self.log(f"[INSTALLER ERROR] Download fehlgeschlagen: {e}")
+            return False
+    
     def create_directory(self):
         """Create server directory"""
         try:
-            print(f"[INSTALLER] Erstelle Verzeichnis: {self.server_dir}")
+            self.log(f"[INSTALLER] Erstelle Verzeichnis: {self.server_dir}")
             os.makedirs(self.server_dir, exist_ok=True)
             if os.path.exists(self.server_dir):
-                print(f"[INSTALLER] Verzeichnis erfolgreich erstellt: {self.server_dir}")
+                self.log(f"[INSTALLER] Verzeichnis erfolgreich erstellt: {self.server_dir}")
                 return True
             else:
-                print(f"[INSTALLER ERROR] Verzeichnis existiert nicht nach Erstellung: {self.server_dir}")
+                self.log(f"[INSTALLER ERROR] Verzeichnis existiert nicht nach Erstellung: {self.server_dir}")
                 return False
         except Exception as e:
-            print(f"[INSTALLER ERROR] Fehler beim Erstellen des Verzeichnisses: {str(e)}")
+            self.log(f"[INSTALLER ERROR] Fehler beim Erstellen des Verzeichnisses: {str(e)}")
             raise
     
     def install(self):
         """Override this in subclasses"""
         raise NotImplementedError
+    
+    def configure(self):
+        """Write the per-instance files (port, RAM, name); override in subclasses"""
+    
+    def provision(self):
+        """Clone the golden template if there is one, otherwise run the full installer"""
+        if not (self.template_version and template_store.exists(self.server_type, self.template_version)):
+            return self.install()
+        try:
+            self.log(f"[INSTALLER] Klone Vorlage {self.server_type} {self.template_version} für {self.server_name}")
+            self.update_status('installing', 10, 'Klone Vorlage...')
+            counts = template_store.clone(self.server_type, self.template_version, self.server_dir)
+            self.log(f"[INSTALLER] Vorlage geklont: {counts}")
+            self.configure()
+            self.update_status('complete', 100, 'Installation abgeschlossen!')
+            return True
+        except Exception as e:
+            error_msg = f'Fehler: {str(e)}'
+            self.log(f"[INSTALLER ERROR] {error_msg}")
+            self.update_status('error', 0, error_msg)
+            return False
+    
+    def capture_template(self):
+        """Save the freshly installed base files (before configure()) as template"""
+        if not self.template_version:
+            return
+        try:
+            template_store.create(self.server_type, self.template_version, self.server_dir, self.template_exclude)
+        except Exception as e:
+            self.log(f"[TEMPLATE ERROR] Vorlage konnte nicht erstellt werden: {e}")
+    
+    def write_instance_file(self, relative_path, content, mode=None):
+        """Write a per-instance file atomically (temp file + rename)"""
+        path = os.path.join(self.server_dir, relative_path)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(content)
+        if mode:
+            os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+        return path
 
 class MinecraftJavaInstaller(GameserverInstaller):
     """Minecraft Java Edition server installer"""
     
+    server_type = 'minecraft-java'
+    template_version = '145ff0858209bcfc164859ba735d4199aafa1eea'
+    
+    def configure(self):
+        self.update_status('installing', 50, 'Erstelle Start-Skript...')
+        # Create start script
+        start_script = f"""#!/bin/bash
+cd "{self.server_dir}"
+java -Xmx{self.ram}G -Xms{self.ram}G -jar server.jar nogui
+"""
+        self.write_instance_file('start.sh', start_script, 0o755)
+        
+        self.update_status('installing', 70, 'Akzeptiere EULA...')
+        # Accept EULA
+        self.write_instance_file('eula.txt', 'eula=true\n')
+        
+        self.update_status('installing', 80, 'Erstelle server.properties...')
+        # Create server.properties
+        properties = f"""server-port={self.port}
+motd=Minecraft Server via Control Panel
+max-players=20
+online-mode=true
+difficulty=normal
+gamemode=survival
+pvp=true
+"""
+        properties_path = self.write_instance_file('server.properties', properties)
+        self.log(f"[MC-JAVA] Konfiguration erstellt: {properties_path}")
+    
     def install(self):
         try:
-            print(f"[MC-JAVA] Starte Installation für {self.server_name}")
+            self.log(f"[MC-JAVA] Starte Installation für {self.server_name}")
             self.update_status('installing', 10, 'Erstelle Verzeichnis...')
             self.create_directory()
-            print(f"[MC-JAVA] Verzeichnis erstellt: {self.server_dir}")
+            self.log(f"[MC-JAVA] Verzeichnis erstellt: {self.server_dir}")
             
             self.update_status('installing', 20, 'Lade Minecraft Server herunter...')
             # Download latest Minecraft server jar
             server_jar_url = 'https://piston-data.mojang.com/v1/objects/145ff0858209bcfc164859ba735d4199aafa1eea/server.jar'
             server_jar_path = os.path.join(self.server_dir, 'server.jar')
             
-            print(f"[MC-JAVA] Lade Server-Datei herunter: {server_jar_url}")
-            if not download_file(server_jar_url, server_jar_path):
+            self.log(f"[MC-JAVA] Lade Server-Datei herunter: {server_jar_url}")
+            if not self.fetch_artifact(server_jar_url, server_jar_path):
                 error_msg = 'Download fehlgeschlagen'
-                print(f"[MC-JAVA ERROR] {error_msg}")
+                self.log(f"[MC-JAVA ERROR] {error_msg}")
                 self.update_status('error', 0, error_msg)
                 return False
-            print(f"[MC-JAVA] Download abgeschlossen: {server_jar_path}")
+            self.log(f"[MC-JAVA] Download abgeschlossen: {server_jar_path}")
             
-            self.update_status('installing', 50, 'Erstelle Start-Skript...')
-            # Create start script
-            start_script = f"""#!/bin/bash
-cd "{self.server_dir}"
-java -Xmx{self.ram}G -Xms{self.ram}G -jar server.jar nogui
-"""
-            start_script_path = os.path.join(self.server_dir, 'start.sh')
-            with open(start_script_path, 'w') as f:
-                f.write(start_script)
-            os.chmod(start_script_path, 0o755)
-            
-            self.update_status('installing', 70, 'Akzeptiere EULA...')
-            # Accept EULA
-            eula_path = os.path.join(self.server_dir, 'eula.txt')
-            with open(eula_path, 'w') as f:
-                f.write('eula=true\n')
-            
-            self.update_status('installing', 80, 'Erstelle server.properties...')
-            # Create server.properties
-            properties = f"""server-port={self.port}
-motd=Minecraft Server via Control Panel
-max-players=20
-online-mode=true
-difficulty=normal
-gamemode=survival
-pvp=true
-"""
-            properties_path = os.path.join(self.server_dir, 'server.properties')
-            with open(properties_path, 'w') as f:
-                f.write(properties)
-            print(f"[MC-JAVA] Konfiguration erstellt: {properties_path}")
+            self.capture_template()
+            self.configure()
             
             self.update_status('complete', 100, 'Installation abgeschlossen!')
-            print(f"[MC-JAVA] Installation erfolgreich abgeschlossen")
+            self.log(f"[MC-JAVA] Installation erfolgreich abgeschlossen")
             return True
             
         except Exception as e:
             error_msg = f'Fehler: {str(e)}'
-            print(f"[MC-JAVA ERROR] {error_msg}")
+            self.log(f"[MC-JAVA ERROR] {error_msg}")
             import traceback
             traceback.print_exc()
             self.update_status('error', 0, error_msg)
@@ -373,72 +1851,75 @@ pvp=true
 class MinecraftBedrockInstaller(GameserverInstaller):
     """Minecraft Bedrock Edition server installer"""
     
+    server_type = 'minecraft-bedrock'
+    template_version = '1.20.51.01'
+    
+    def configure(self):
+        self.update_status('installing', 70, 'Konfiguriere Server...')
+        # Create start script
+        start_script = f"""#!/bin/bash
+cd "{self.server_dir}"
+LD_LIBRARY_PATH=. ./bedrock_server
+"""
+        self.write_instance_file('start.sh', start_script, 0o755)
+        
+        self.update_status('installing', 90, 'Aktualisiere server.properties...')
+        # Update server.properties with port
+        properties_path = os.path.join(self.server_dir, 'server.properties')
+        if os.path.exists(properties_path):
+            with open(properties_path, 'r') as f:
+                content = f.read()
+            content = content.replace('server-port=19132', f'server-port={self.port}')
+            self.write_instance_file('server.properties', content)
+        self.log(f"[MC-BEDROCK] server.properties aktualisiert")
+    
     def install(self):
         try:
-            print(f"[MC-BEDROCK] Starte Installation für {self.server_name}")
+            self.log(f"[MC-BEDROCK] Starte Installation für {self.server_name}")
             self.update_status('installing', 10, 'Erstelle Verzeichnis...')
             self.create_directory()
-            print(f"[MC-BEDROCK] Verzeichnis erstellt: {self.server_dir}")
+            self.log(f"[MC-BEDROCK] Verzeichnis erstellt: {self.server_dir}")
             
             self.update_status('installing', 20, 'Lade Bedrock Server herunter...')
             # Download Bedrock server
             bedrock_url = 'https://minecraft.azureedge.net/bin-linux/bedrock-server-1.20.51.01.zip'
             zip_path = os.path.join(self.server_dir, 'bedrock.zip')
             
-            print(f"[MC-BEDROCK] Lade Server-Datei herunter: {bedrock_url}")
-            if not download_file(bedrock_url, zip_path):
+            self.log(f"[MC-BEDROCK] Lade Server-Datei herunter: {bedrock_url}")
+            if not self.fetch_artifact(bedrock_url, zip_path):
                 error_msg = 'Download fehlgeschlagen'
-                print(f"[MC-BEDROCK ERROR] {error_msg}")
+                self.log(f"[MC-BEDROCK ERROR] {error_msg}")
                 self.update_status('error', 0, error_msg)
                 return False
-            print(f"[MC-BEDROCK] Download abgeschlossen: {zip_path}")
+            self.log(f"[MC-BEDROCK] Download abgeschlossen: {zip_path}")
             
             self.update_status('installing', 50, 'Entpacke Server-Dateien...')
-            print(f"[MC-BEDROCK] Entpacke Archiv...")
-            if not extract_archive(zip_path, self.server_dir):
+            self.log(f"[MC-BEDROCK] Entpacke Archiv...")
+            if not self.extract(zip_path, self.server_dir, 50, 70, 'Entpacke Server-Dateien...'):
                 error_msg = 'Entpacken fehlgeschlagen'
-                print(f"[MC-BEDROCK ERROR] {error_msg}")
+                self.log(f"[MC-BEDROCK ERROR] {error_msg}")
                 self.update_status('error', 0, error_msg)
                 return False
-            print(f"[MC-BEDROCK] Archiv entpackt")
+            self.log(f"[MC-BEDROCK] Archiv entpackt")
             
             os.remove(zip_path)
-            print(f"[MC-BEDROCK] Archiv gelöscht")
+            self.log(f"[MC-BEDROCK] Archiv gelöscht")
             
-            self.update_status('installing', 70, 'Konfiguriere Server...')
             # Make bedrock_server executable
             bedrock_exec = os.path.join(self.server_dir, 'bedrock_server')
             if os.path.exists(bedrock_exec):
                 os.chmod(bedrock_exec, 0o755)
             
-            # Create start script
-            start_script = f"""#!/bin/bash
-cd "{self.server_dir}"
-LD_LIBRARY_PATH=. ./bedrock_server
-"""
-            start_script_path = os.path.join(self.server_dir, 'start.sh')
-            with open(start_script_path, 'w') as f:
-                f.write(start_script)
-            os.chmod(start_script_path, 0o755)
-            
-            self.update_status('installing', 90, 'Aktualisiere server.properties...')
-            # Update server.properties with port
-            properties_path = os.path.join(self.server_dir, 'server.properties')
-            if os.path.exists(properties_path):
-                with open(properties_path, 'r') as f:
-                    content = f.read()
-                content = content.replace('server-port=19132', f'server-port={self.port}')
-                with open(properties_path, 'w') as f:
-                    f.write(content)
-            print(f"[MC-BEDROCK] server.properties aktualisiert")
+            self.capture_template()
+            self.configure()
             
             self.update_status('complete', 100, 'Installation abgeschlossen!')
-            print(f"[MC-BEDROCK] Installation erfolgreich abgeschlossen")
+            self.log(f"[MC-BEDROCK] Installation erfolgreich abgeschlossen")
             return True
             
         except Exception as e:
             error_msg = f'Fehler: {str(e)}'
-            print(f"[MC-BEDROCK ERROR] {error_msg}")
+            self.log(f"[MC-BEDROCK ERROR] {error_msg}")
             import traceback
             traceback.print_exc()
             self.update_status('error', 0, error_msg)
@@ -447,12 +1928,41 @@ LD_LIBRARY_PATH=. ./bedrock_server
 class BeamMPInstaller(GameserverInstaller):
     """BeamMP (BeamNG.drive multiplayer) server installer"""
     
+    server_type = 'beammp'
+    template_version = 'v3.9.0'
+    
+    def configure(self):
+        self.update_status('installing', 50, 'Erstelle Konfiguration...')
+        # Create ServerConfig.toml
+        config = f"""[General]
+Name = "{self.server_name}"
+Port = {self.port}
+MaxPlayers = 8
+Map = "/levels/gridmap_v2/info.json"
+Description = "BeamMP Server via Control Panel"
+Private = false
+
+[Misc]
+SendErrors = true
+ImScaredOfUpdates = false
+"""
+        self.write_instance_file('ServerConfig.toml', config)
+        
+        self.update_status('installing', 70, 'Erstelle Start-Skript...')
+        # Create start script
+        start_script = f"""#!/bin/bash
+cd "{self.server_dir}"
+./BeamMP-Server
+"""
+        start_script_path = self.write_instance_file('start.sh', start_script, 0o755)
+        self.log(f"[BEAMMP] Start-Skript erstellt: {start_script_path}")
+    
     def install(self):
         try:
-            print(f"[BEAMMP] Starte Installation für {self.server_name}")
+            self.log(f"[BEAMMP] Starte Installation für {self.server_name}")
             self.update_status('installing', 10, 'Erstelle Verzeichnis...')
             self.create_directory()
-            print(f"[BEAMMP] Verzeichnis erstellt: {self.server_dir}")
+            self.log(f"[BEAMMP] Verzeichnis erstellt: {self.server_dir}")
             
             self.update_status('installing', 20, 'Lade BeamMP Server herunter...')
             # Download BeamMP server (Debian 12 version)
@@ -460,70 +1970,43 @@ class BeamMPInstaller(GameserverInstaller):
             beammp_url = 'https://github.com/BeamMP/BeamMP-Server/releases/download/v3.9.0/BeamMP-Server.debian.12.x86_64'
             server_path = os.path.join(self.server_dir, 'BeamMP-Server')
             
-            print(f"[BEAMMP] Lade Server-Datei herunter: {beammp_url}")
-            if not download_file(beammp_url, server_path):
+            self.log(f"[BEAMMP] Lade Server-Datei herunter: {beammp_url}")
+            if not self.fetch_artifact(beammp_url, server_path):
                 error_msg = 'Download fehlgeschlagen - Prüfe Internetverbindung'
-                print(f"[BEAMMP ERROR] {error_msg}")
+                self.log(f"[BEAMMP ERROR] {error_msg}")
                 self.update_status('error', 0, error_msg)
                 return False
             
             # Verify download
             if not os.path.exists(server_path):
                 error_msg = 'Download-Datei nicht gefunden'
-                print(f"[BEAMMP ERROR] {error_msg}")
+                self.log(f"[BEAMMP ERROR] {error_msg}")
                 self.update_status('error', 0, error_msg)
                 return False
                 
             file_size = os.path.getsize(server_path)
             if file_size < 100000:  # Mindestens 100KB
                 error_msg = f'Download unvollständig (nur {file_size} bytes)'
-                print(f"[BEAMMP ERROR] {error_msg}")
+                self.log(f"[BEAMMP ERROR] {error_msg}")
                 self.update_status('error', 0, error_msg)
                 return False
                 
-            print(f"[BEAMMP] Download erfolgreich: {server_path} ({file_size} bytes)")
+            self.log(f"[BEAMMP] Download erfolgreich: {server_path} ({file_size} bytes)")
             
             self.update_status('installing', 40, 'Setze Berechtigungen...')
             os.chmod(server_path, 0o755)
-            print(f"[BEAMMP] Berechtigungen gesetzt")
-            
-            self.update_status('installing', 50, 'Erstelle Konfiguration...')
-            # Create ServerConfig.toml
-            config = f"""[General]
-Name = "{self.server_name}"
-Port = {self.port}
-MaxPlayers = 8
-Map = "/levels/gridmap_v2/info.json"
-Description = "BeamMP Server via Control Panel"
-Private = false
-
-[Misc]
-SendErrors = true
-ImScaredOfUpdates = false
-"""
-            config_path = os.path.join(self.server_dir, 'ServerConfig.toml')
-            with open(config_path, 'w') as f:
-                f.write(config)
+            self.log(f"[BEAMMP] Berechtigungen gesetzt")
             
-            self.update_status('installing', 70, 'Erstelle Start-Skript...')
-            # Create start script
-            start_script = f"""#!/bin/bash
-cd "{self.server_dir}"
-./BeamMP-Server
-"""
-            start_script_path = os.path.join(self.server_dir, 'start.sh')
-            with open(start_script_path, 'w') as f:
-                f.write(start_script)
-            os.chmod(start_script_path, 0o755)
-            print(f"[BEAMMP] Start-Skript erstellt: {start_script_path}")
+            self.capture_template()
+            self.configure()
             
             self.update_status('complete', 100, 'Installation abgeschlossen!')
-            print(f"[BEAMMP] Installation erfolgreich abgeschlossen")
+            self.log(f"[BEAMMP] Installation erfolgreich abgeschlossen")
             return True
             
         except Exception as e:
             error_msg = f'Fehler: {str(e)}'
-            print(f"[BEAMMP ERROR] {error_msg}")
+            self.log(f"[BEAMMP ERROR] {error_msg}")
             import traceback
             traceback.print_exc()
             self.update_status('error', 0, error_msg)
@@ -532,12 +2015,23 @@ cd "{self.server_dir}"
 
 class ValheimInstaller(GameserverInstaller):
     """Valheim dedicated server installer"""
+    server_type = 'valheim'
+    # SteamCMD always installs the latest build; delete the template to pick up updates
+    template_version = 'steam-896660'
+    template_exclude = ('install.sh',)
+    
+    def configure(self):
+        self.update_status('installing', 80, 'Erstelle Start-Skript...')
+        start_script = f"""#!/bin/bash\ncd \"{self.server_dir}\"\nexport LD_LIBRARY_PATH=\"./linux64:$LD_LIBRARY_PATH\"\nexport SteamAppId=892970\n./valheim_server.x86_64 -name \"{self.server_name}\" -port {self.port} -world \"Dedicated\" -password \"changeme123\" -public 0\n"""
+        start_script_path = self.write_instance_file('start.sh', start_script, 0o755)
+        self.log(f"[VALHEIM] Start-Skript erstellt: {start_script_path}")
+    
     def install(self):
         try:
-            print(f"[VALHEIM] Starte Installation für {self.server_name}")
+            self.log(f"[VALHEIM] Starte Installation für {self.server_name}")
             self.update_status('installing', 10, 'Erstelle Verzeichnis...')
             self.create_directory()
-            print(f"[VALHEIM] Verzeichnis erstellt: {self.server_dir}")
+            self.log(f"[VALHEIM] Verzeichnis erstellt: {self.server_dir}")
             self.update_status('installing', 20, 'Installiere SteamCMD...')
             steamcmd_script = f"""#!/bin/bash\nsteamcmd +force_install_dir \"{self.server_dir}\" +login anonymous +app_update 896660 validate +quit\n"""
             steamcmd_script_path = os.path.join(self.server_dir, 'install.sh')
@@ -545,23 +2039,19 @@ class ValheimInstaller(GameserverInstaller):
                 f.write(steamcmd_script)
             os.chmod(steamcmd_script_path, 0o755)
             self.update_status('installing', 30, 'Lade Valheim Server herunter...')
-            result = run_command(steamcmd_script_path)
+            with install_scheduler.slot('download', self):
+                result = self.run_logged(steamcmd_script_path)
             if not result['success']:
                 self.update_status('error', 0, 'SteamCMD Installation fehlgeschlagen. Stelle sicher, dass steamcmd installiert ist.')
                 return False
-            self.update_status('installing', 80, 'Erstelle Start-Skript...')
-            start_script = f"""#!/bin/bash\ncd \"{self.server_dir}\"\nexport LD_LIBRARY_PATH=\"./linux64:$LD_LIBRARY_PATH\"\nexport SteamAppId=892970\n./valheim_server.x86_64 -name \"{self.server_name}\" -port {self.port} -world \"Dedicated\" -password \"changeme123\" -public 0\n"""
-            start_script_path = os.path.join(self.server_dir, 'start.sh')
-            with open(start_script_path, 'w') as f:
-                f.write(start_script)
-            os.chmod(start_script_path, 0o755)
-            print(f"[VALHEIM] Start-Skript erstellt: {start_script_path}")
+            self.capture_template()
+            self.configure()
             self.update_status('complete', 100, 'Installation abgeschlossen!')
-            print(f"[VALHEIM] Installation erfolgreich abgeschlossen")
+            self.log(f"[VALHEIM] Installation erfolgreich abgeschlossen")
             return True
         except Exception as e:
             error_msg = f'Fehler: {str(e)}'
-            print(f"[VALHEIM ERROR] {error_msg}")
+            self.log(f"[VALHEIM ERROR] {error_msg}")
             import traceback
             traceback.print_exc()
             self.update_status('error', 0, error_msg)
@@ -570,28 +2060,41 @@ class ValheimInstaller(GameserverInstaller):
 # Battlefield 2 AIX Installer
 class Battlefield2AIXInstaller(GameserverInstaller):
     """Battlefield 2 AIX Mod Server Installer"""
+    server_type = 'battlefield2-aix'
+    template_version = '1.5.3153.0-aix2.0'
+    
+    def configure(self):
+        # Erstelle Startskript für AIX
+        self.update_status('installing', 90, 'Erstelle Startskript...')
+        bf2_install_dir = os.path.join(self.server_dir, 'bf2')
+        start_aix_sh = self.write_instance_file('bf2/start_aix.sh', f"""#!/bin/bash
+cd "{bf2_install_dir}"
+./start.sh +modPath mods/aix2.0 +port {self.port}
+""", 0o755)
+        self.log(f"[BF2-AIX] Startskript erstellt: {start_aix_sh}")
+    
     def install(self):
         try:
-            print(f"[BF2-AIX] Starte Installation für {self.server_name}")
+            self.log(f"[BF2-AIX] Starte Installation für {self.server_name}")
             self.update_status('installing', 10, 'Erstelle Verzeichnis...')
             self.create_directory()
-            print(f"[BF2-AIX] Verzeichnis erstellt: {self.server_dir}")
+            self.log(f"[BF2-AIX] Verzeichnis erstellt: {self.server_dir}")
             
             # Download BF2 Server Installer
             self.update_status('installing', 20, 'Lade Battlefield 2 Server herunter...')
             bf2_url = 'https://www.bf-games.net/downloads/mirror/2956'
             bf2_archive = os.path.join(self.server_dir, 'bf2-linuxded-1.5.3153.0-installer.tgz')
-            if not download_file(bf2_url, bf2_archive):
+            if not self.fetch_artifact(bf2_url, bf2_archive):
                 self.update_status('error', 0, 'Download BF2 Server fehlgeschlagen')
                 return False
-            print(f"[BF2-AIX] BF2 Server Download abgeschlossen: {bf2_archive}")
+            self.log(f"[BF2-AIX] BF2 Server Download abgeschlossen: {bf2_archive}")
             
             # Entpacke das Installer-Archiv
             self.update_status('installing', 30, 'Entpacke Battlefield 2 Installer...')
-            if not extract_archive(bf2_archive, self.server_dir):
+            if not self.extract(bf2_archive, self.server_dir, 30, 35, 'Entpacke Battlefield 2 Installer...'):
                 self.update_status('error', 0, 'Entpacken BF2 Server fehlgeschlagen')
                 return False
-            print(f"[BF2-AIX] BF2 Installer entpackt")
+            self.log(f"[BF2-AIX] BF2 Installer entpackt")
             
             # Finde das Installer-Skript
             installer_sh = os.path.join(self.server_dir, 'bf2-linuxded-1.5.3153.0-installer.sh')
@@ -604,19 +2107,13 @@ class Battlefield2AIXInstaller(GameserverInstaller):
             bf2_install_dir = os.path.join(self.server_dir, 'bf2')
             os.makedirs(bf2_install_dir, exist_ok=True)
             
-            # Führe den Installer automatisch aus mit expect oder direkter Eingabe
-            self.update_status('installing', 40, 'Installiere Battlefield 2 Server...')
-            install_cmd = f'cd "{self.server_dir}" && echo "{bf2_install_dir}" | sh bf2-linuxded-1.5.3153.0-installer.sh'
-            result = run_command(install_cmd)
-            if not result['success']:
-                # Fallback: Versuche mit direkter Pfadangabe
+            # Entpacke das selbstextrahierende Installer-Skript direkt
+            self.update_status('installing', 35, 'Installiere Battlefield 2 Server...')
+            if not self.extract(installer_sh, bf2_install_dir, 35, 50, 'Installiere Battlefield 2 Server...'):
+                self.log(f"[BF2-AIX] Direkte Extraktion fehlgeschlagen, führe Installer-Skript aus...")
                 install_cmd = f'cd "{self.server_dir}" && sh bf2-linuxded-1.5.3153.0-installer.sh --target "{bf2_install_dir}" --noexec --nox11'
-                result = run_command(install_cmd)
-                if not result['success']:
-                    print(f"[BF2-AIX] Installation fehlgeschlagen, versuche manuelle Extraktion...")
-                    # Wenn alles fehlschlägt, extrahiere manuell
-                    extract_cmd = f'cd "{self.server_dir}" && tail -n +479 bf2-linuxded-1.5.3153.0-installer.sh | tar -xz -C "{bf2_install_dir}"'
-                    result = run_command(extract_cmd)
+                with install_scheduler.slot('cpu', self):
+                    self.run_logged(install_cmd)
             
             # Prüfe ob start.sh existiert
             start_sh = os.path.join(bf2_install_dir, 'start.sh')
@@ -624,23 +2121,23 @@ class Battlefield2AIXInstaller(GameserverInstaller):
                 self.update_status('error', 0, f'start.sh nicht gefunden in {bf2_install_dir}')
                 return False
             os.chmod(start_sh, 0o755)
-            print(f"[BF2-AIX] BF2 Server installiert in {bf2_install_dir}")
+            self.log(f"[BF2-AIX] BF2 Server installiert in {bf2_install_dir}")
             
             # Download AIX Mod
             self.update_status('installing', 50, 'Lade AIX Mod herunter...')
             aix_url = 'https://www.bf-games.net/downloads/mirror/2347'
             aix_zip = os.path.join(self.server_dir, 'aix2.0core.zip')
-            if not download_file(aix_url, aix_zip):
+            if not self.fetch_artifact(aix_url, aix_zip):
                 self.update_status('error', 0, 'Download AIX Mod fehlgeschlagen')
                 return False
-            print(f"[BF2-AIX] AIX Mod Download abgeschlossen: {aix_zip}")
+            self.log(f"[BF2-AIX] AIX Mod Download abgeschlossen: {aix_zip}")
             
             # Entpacke AIX Mod
             self.update_status('installing', 60, 'Entpacke AIX Mod...')
-            if not extract_archive(aix_zip, self.server_dir):
+            if not self.extract(aix_zip, self.server_dir, 60, 70, 'Entpacke AIX Mod...'):
                 self.update_status('error', 0, 'Entpacken AIX Mod fehlgeschlagen')
                 return False
-            print(f"[BF2-AIX] AIX Mod entpackt")
+            self.log(f"[BF2-AIX] AIX Mod entpackt")
             
             # Verschiebe mods-Ordner in den bf2-Ordner
             mods_src = os.path.join(self.server_dir, 'mods')
@@ -652,40 +2149,32 @@ class Battlefield2AIXInstaller(GameserverInstaller):
                     shutil.rmtree(mods_dst)
                 # Verschiebe den kompletten mods-Ordner
                 shutil.move(mods_src, mods_dst)
-                print(f"[BF2-AIX] mods-Ordner verschoben: {mods_dst}")
+                self.log(f"[BF2-AIX] mods-Ordner verschoben: {mods_dst}")
             else:
-                print(f"[BF2-AIX] WARNUNG: mods-Ordner nicht gefunden bei {mods_src}")
-            
-            # Erstelle Startskript für AIX
-            self.update_status('installing', 70, 'Erstelle Startskript...')
-            start_aix_sh = os.path.join(bf2_install_dir, 'start_aix.sh')
-            with open(start_aix_sh, 'w') as f:
-                f.write(f"""#!/bin/bash
-cd "{bf2_install_dir}"
-./start.sh +modPath mods/aix2.0 +port {self.port}
-""")
-            os.chmod(start_aix_sh, 0o755)
-            print(f"[BF2-AIX] Startskript erstellt: {start_aix_sh}")
+                self.log(f"[BF2-AIX] WARNUNG: mods-Ordner nicht gefunden bei {mods_src}")
             
             # Aufräumen
-            self.update_status('installing', 90, 'Räume auf...')
+            self.update_status('installing', 70, 'Räume auf...')
             for cleanup_file in [bf2_archive, aix_zip, installer_sh]:
                 if os.path.exists(cleanup_file):
                     os.remove(cleanup_file)
             
+            self.capture_template()
+            self.configure()
+            
             self.update_status('complete', 100, 'Installation abgeschlossen!')
-            print(f"[BF2-AIX] Installation erfolgreich abgeschlossen")
+            self.log(f"[BF2-AIX] Installation erfolgreich abgeschlossen")
             return True
             
         except Exception as e:
             error_msg = f'Fehler: {str(e)}'
-            print(f"[BF2-AIX ERROR] {error_msg}")
+            self.log(f"[BF2-AIX ERROR] {error_msg}")
             import traceback
             traceback.print_exc()
             self.update_status('error', 0, error_msg)
             return False
 
-def get_installer(server_type, server_name, port, ram):
+def get_installer(server_type, server_name, port, ram, installation_id=None):
     """Factory function to get the appropriate installer"""
     installers = {
         'minecraft-java': MinecraftJavaInstaller,
@@ -696,109 +2185,847 @@ def get_installer(server_type, server_name, port, ram):
     }
     installer_class = installers.get(server_type)
     if installer_class:
-        return installer_class(server_name, port, ram)
+        return installer_class(server_name, port, ram, installation_id)
     return None
 
-# System Stats API
-@app.route('/api/system/stats', methods=['GET'])
-def get_system_stats():
-    """Get system statistics (CPU, RAM, Disk, Temperature)"""
-    try:
-        cpu = psutil.cpu_percent(interval=1)
-        ram = psutil.virtual_memory().percent
-        disk = psutil.disk_usage('/').percent
+# Installation Scheduler
+INSTALL_WORKERS = 2
+# Concurrent network-bound (downloads, SteamCMD) and CPU/disk-bound (extraction) steps
+INSTALL_DOWNLOAD_SLOTS = 2
+INSTALL_CPU_SLOTS = 1
+# Seconds a delete waits for a running installation to notice its cancellation
+INSTALL_CANCEL_TIMEOUT = 30
+
+class InstallationCancelled(BaseException):
+    """Raised from progress callbacks after cancel(); a BaseException so the
+    installers' and extract_archive()'s `except Exception` handlers let it through"""
+
+class InstallationScheduler:
+    """Runs gameserver installations on a bounded worker pool in FIFO order
+
+    The queue is persisted through the gameserver records (status 'queued' or
+    'installing' plus installation_id), so pending jobs resume after a restart.
+    """
+
+    def __init__(self, workers=INSTALL_WORKERS, download_slots=INSTALL_DOWNLOAD_SLOTS,
+                 cpu_slots=INSTALL_CPU_SLOTS):
+        self.workers = workers
+        self.slots = {
+            'download': threading.BoundedSemaphore(download_slots),
+            'cpu': threading.BoundedSemaphore(cpu_slots)
+        }
+        self.pending = deque()
+        self.running = {}  # installation ID -> installer
+        self.condition = threading.Condition()
+        self.threads = []
+
+    def ensure_started(self):
+        with self.condition:
+            if self.threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f'installer-{index}')
+                thread.daemon = True
+                thread.start()
+                self.threads.append(thread)
+        self._resume()
+
+    def submit(self, installer):
+        self.ensure_started()
+        with self.condition:
+            # Already picked up from the database by _resume()
+            if self._find(installer.installation_id):
+                return
+            self.pending.append(installer)
+            self.condition.notify()
+        self._publish_positions()
+
+    def cancel(self, installation_id):
+        """Cancel a queued installation or ask a running one to stop"""
+        with self.condition:
+            installer = self._find(installation_id)
+            if installer and installation_id in self.running:
+                installer.cancel_event.set()
+                return True
+            if installer:
+                self.pending.remove(installer)
+        if not installer:
+            return False
+        self._finish_cancelled(installer)
+        self._publish_positions()
+        return True
+
+    def wait(self, installation_id, timeout=None):
+        """Block until the installation is no longer running, returns False on timeout"""
+        with self.condition:
+            return self.condition.wait_for(lambda: installation_id not in self.running, timeout)
+
+    def _find(self, installation_id):
+        if installation_id in self.running:
+            return self.running[installation_id]
+        return next((i for i in self.pending if i.installation_id == installation_id), None)
+
+    def stats(self):
+        with self.condition:
+            return {
+                'workers': self.workers,
+                'queued': [installer.installation_id for installer in self.pending],
+                'running': list(self.running)
+            }
+
+    @contextmanager
+    def slot(self, kind, installer):
+        """Hold a download or CPU slot while a step runs, staying responsive to cancellation"""
+        semaphore = self.slots[kind]
+        while not semaphore.acquire(timeout=0.5):
+            installer.check_cancelled()
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+    def _resume(self):
+        for server in store.list_gameservers():
+            if server.get('status') not in ('queued', 'installing') or not server.get('installation_id'):
+                continue
+            installer = get_installer(server.get('type'), server.get('name'), server.get('port'),
+                                      server.get('ram', 4), server['installation_id'])
+            if not installer:
+                continue
+            print(f"[INSTALLER] Setze Installation von {installer.server_name} fort")
+            store.update_gameserver(installer.server_name, {'status': 'queued'})
+            with self.condition:
+                self.pending.append(installer)
+                self.condition.notify()
+        self._publish_positions()
+
+    def _publish_positions(self):
+        with self.condition:
+            pending = list(self.pending)
+        for position, installer in enumerate(pending, 1):
+            gameserver_installations.update(installer.installation_id, 'queued', 0,
+                                            f'In Warteschlange (Position {position})', queue_position=position)
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+                installer = self.pending.popleft()
+                self.running[installer.installation_id] = installer
+            self._publish_positions()
+            try:
+                self._install(installer)
+            finally:
+                with self.condition:
+                    self.running.pop(installer.installation_id, None)
+                    self.condition.notify_all()
+
+    def _install(self, installer):
+        server_name = installer.server_name
+        installation_id = installer.installation_id
+        try:
+            print(f"[GAMESERVER] Starte Installation von {server_name}")
+            print(f"[GAMESERVER] Installation ID: {installation_id}")
+            print(f"[GAMESERVER] Zielverzeichnis: {installer.server_dir}")
+            store.update_gameserver(server_name, {'status': 'installing'})
+            installer.update_status('installing', 0, 'Installation gestartet...')
+            
+            installer.provision()
+            
+            # Update server status after installation
+            status = gameserver_installations.get(installation_id) or {}
+            if status.get('status') == 'complete':
+                store.update_gameserver(server_name, {'status': 'stopped'})
+                print(f"[GAMESERVER] Installation von {server_name} erfolgreich abgeschlossen")
+            else:
+                store.update_gameserver(server_name, {'status': 'error'})
+                error_msg = status.get('message', 'Unbekannter Fehler')
+                print(f"[GAMESERVER] Installation von {server_name} fehlgeschlagen: {error_msg}")
+        
+        except InstallationCancelled:
+            self._finish_cancelled(installer)
         
-        # Try to get temperature (Linux only)
-        temp = 0
+        except Exception as e:
+            error_msg = f"Kritischer Fehler im Install-Thread: {str(e)}"
+            print(f"[GAMESERVER ERROR] {error_msg}")
+            import traceback
+            traceback.print_exc()
+            
+            # Update installation status with error
+            gameserver_installations.update(installation_id, 'error', 0, error_msg)
+            
+            # Update server status in database
+            store.update_gameserver(server_name, {'status': 'error'})
+
+    def _finish_cancelled(self, installer):
+        """Remove everything a cancelled installation created"""
+        print(f"[GAMESERVER] Installation von {installer.server_name} abgebrochen")
+        if os.path.exists(installer.server_dir):
+            shutil.rmtree(installer.server_dir, ignore_errors=True)
+        server = store.get_gameserver(installer.server_name)
+        if server and server.get('installation_id') == installer.installation_id:
+            store.delete_gameserver(installer.server_name)
+        gameserver_installations.update(installer.installation_id, 'cancelled', 0, 'Installation abgebrochen')
+
+install_scheduler = InstallationScheduler()
+
+# System Stats Sampler
+# Sampling interval in seconds for the background metrics thread
+SYSTEM_STATS_INTERVAL = 1.0
+
+# History resolutions as (step in seconds, number of slots):
+# 1 s for 10 minutes, 10 s for one day, 1 min for one week
+SYSTEM_STATS_RESOLUTIONS = [(1, 600), (10, 8640), (60, 10080)]
+SYSTEM_STATS_COLUMNS = ('cpu', 'ram', 'disk', 'temp', 'net_sent', 'net_recv', 'disk_read', 'disk_write')
+
+class MetricsRingBuffer:
+    """Fixed-size ring buffer storing one preallocated array per column"""
+
+    def __init__(self, step, capacity, columns=SYSTEM_STATS_COLUMNS):
+        self.step = step
+        self.capacity = capacity
+        self.columns = columns
+        self.timestamps = array('d', [0.0]) * capacity
+        self.values = {column: array('d', [0.0]) * capacity for column in columns}
+        self.head = 0  # Next write position
+        self.count = 0
+
+    def append(self, timestamp, sample):
+        self.timestamps[self.head] = timestamp
+        for column in self.columns:
+            self.values[column][self.head] = sample.get(column) or 0.0
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def oldest(self):
+        """Timestamp of the oldest stored sample (None if empty)"""
+        if not self.count:
+            return None
+        return self.timestamps[(self.head - self.count) % self.capacity]
+
+    def query(self, start, end):
+        """Return (timestamps, {column: values}) for samples within [start, end]"""
+        timestamps = []
+        values = {column: [] for column in self.columns}
+        for i in range(self.count):
+            index = (self.head - self.count + i) % self.capacity
+            ts = self.timestamps[index]
+            if ts < start or ts > end:
+                continue
+            timestamps.append(ts)
+            for column in self.columns:
+                values[column].append(self.values[column][index])
+        return timestamps, values
+
+class SystemStatsHistory:
+    """Multi-resolution metrics history with automatic downsampling"""
+
+    def __init__(self, resolutions=SYSTEM_STATS_RESOLUTIONS, columns=SYSTEM_STATS_COLUMNS):
+        self.columns = columns
+        self.levels = [MetricsRingBuffer(step, capacity, columns) for step, capacity in resolutions]
+        # Per coarse level: [bucket_start, sums, count] of the bucket being filled
+        self.pending = [None] * len(self.levels)
+        self.lock = threading.Lock()
+
+    def add(self, sample):
+        timestamp = sample['timestamp']
+        with self.lock:
+            self.levels[0].append(timestamp, sample)
+            for i in range(1, len(self.levels)):
+                level = self.levels[i]
+                bucket = timestamp - (timestamp % level.step)
+                pending = self.pending[i]
+                if pending and pending[0] != bucket:
+                    self._flush(i)
+                    pending = None
+                if pending is None:
+                    pending = self.pending[i] = [bucket, dict.fromkeys(self.columns, 0.0), 0]
+                for column in self.columns:
+                    pending[1][column] += sample.get(column) or 0.0
+                pending[2] += 1
+
+    def _flush(self, i):
+        bucket, sums, count = self.pending[i]
+        self.levels[i].append(bucket, {column: total / count for column, total in sums.items()})
+        self.pending[i] = None
+
+    def query(self, start, end, step=None):
+        """Return columns for [start, end], using the finest level that covers start"""
+        with self.lock:
+            level = self.levels[0]
+            filled = [l for l in self.levels if l.count]
+            if filled:
+                covering = [l for l in filled if l.oldest() <= start]
+                # Fall back to the level reaching back the furthest
+                level = covering[0] if covering else min(filled, key=lambda l: l.oldest())
+            timestamps, values = level.query(start, end)
+
+        # Aggregate further if a coarser step than the stored one was requested
+        if step and step > level.step and timestamps:
+            buckets = {}
+            order = []
+            for i, ts in enumerate(timestamps):
+                bucket = ts - (ts % step)
+                if bucket not in buckets:
+                    buckets[bucket] = []
+                    order.append(bucket)
+                buckets[bucket].append(i)
+            values = {column: [sum(values[column][i] for i in buckets[b]) / len(buckets[b]) for b in order]
+                      for column in self.columns}
+            timestamps = order
+            result_step = step
+        else:
+            result_step = level.step
+
+        columns = {'timestamp': timestamps}
+        for column in self.columns:
+            columns[column] = [round(v, 2) for v in values[column]]
+        return result_step, columns
+
+system_history = SystemStatsHistory()
+
+class SystemStatsSampler:
+    """Collects system metrics in a background thread into a shared snapshot"""
+
+    def __init__(self, interval=SYSTEM_STATS_INTERVAL):
+        self.interval = interval
+        self.snapshot = None
+        self.lock = threading.Lock()
+        self.updated = threading.Condition(self.lock)
+        self.thread = None
+        self.last_io = None  # (timestamp, net counters, disk counters), only used by the sampler thread
+
+    def ensure_started(self):
+        """Start the sampler thread if it is not running yet"""
+        with self.lock:
+            if self.thread and self.thread.is_alive():
+                return
+            # Prime psutil's CPU counters so the first sample is meaningful
+            psutil.cpu_percent(interval=None)
+            psutil.cpu_percent(interval=None, percpu=True)
+            self.thread = threading.Thread(target=self._run, name='system-stats-sampler')
+            self.thread.daemon = True
+            self.thread.start()
+
+    def _read_temperature(self):
+        """Read the first available temperature sensor (Linux only)"""
         try:
             if hasattr(psutil, 'sensors_temperatures'):
                 temps = psutil.sensors_temperatures()
                 if temps:
-                    temp = list(temps.values())[0][0].current
+                    return list(temps.values())[0][0].current
         except:
-            temp = 0
-        
+            pass
+        return 0
+
+    def _read_io_rates(self, now):
+        """Compute network and disk throughput in bytes/s since the previous sample"""
+        net = psutil.net_io_counters()
+        try:
+            disk = psutil.disk_io_counters()
+        except Exception:
+            disk = None
+        rates = {'net_sent': 0, 'net_recv': 0, 'disk_read': 0, 'disk_write': 0}
+        if self.last_io:
+            last_time, last_net, last_disk = self.last_io
+            elapsed = now - last_time
+            if elapsed > 0:
+                if net and last_net:
+                    rates['net_sent'] = max(0, net.bytes_sent - last_net.bytes_sent) / elapsed
+                    rates['net_recv'] = max(0, net.bytes_recv - last_net.bytes_recv) / elapsed
+                if disk and last_disk:
+                    rates['disk_read'] = max(0, disk.read_bytes - last_disk.read_bytes) / elapsed
+                    rates['disk_write'] = max(0, disk.write_bytes - last_disk.write_bytes) / elapsed
+        self.last_io = (now, net, disk)
+        return {key: int(value) for key, value in rates.items()}
+
+    def sample(self):
+        """Take one non-blocking sample and store it as the current snapshot
+
+        Only the sampler thread calls this: every call moves psutil's CPU
+        baseline and the I/O counters used for the next sample.
+        """
+        # cpu_percent(interval=None) compares against the previous call,
+        # so the sampler thread itself provides the measurement window
+        cpu = psutil.cpu_percent(interval=None)
+        cpu_per_core = psutil.cpu_percent(interval=None, percpu=True)
+        now = time.time()
+        snapshot = {
+            'cpu': round(cpu, 1),
+            'cpu_per_core': [round(c, 1) for c in cpu_per_core],
+            'ram': round(psutil.virtual_memory().percent, 1),
+            'disk': round(psutil.disk_usage('/').percent, 1),
+            'temp': round(self._read_temperature(), 1),
+            'timestamp': now
+        }
+        snapshot.update(self._read_io_rates(now))
+        with self.updated:
+            self.snapshot = snapshot
+            self.updated.notify_all()
+        return snapshot
+
+    def get_snapshot(self, max_age=None):
+        """Return the latest snapshot, waiting for the next sample if it is older than max_age seconds"""
+        self.ensure_started()
+
+        def fresh():
+            if self.snapshot is None:
+                return False
+            return max_age is None or time.time() - self.snapshot['timestamp'] <= max_age
+
+        with self.updated:
+            # The sampler delivers within one interval; never sample inline
+            if not fresh():
+                requested = time.time()
+                self.updated.wait_for(
+                    lambda: self.snapshot is not None and self.snapshot['timestamp'] >= requested or fresh(),
+                    timeout=self.interval * 2 + 1
+                )
+            if self.snapshot is None:
+                raise RuntimeError('No system sample available yet')
+            return self.snapshot
+
+    def _run(self):
+        while True:
+            try:
+                system_history.add(self.sample())
+            except Exception as e:
+                print(f"[SAMPLER ERROR] {e}")
+            time.sleep(self.interval)
+
+system_sampler = SystemStatsSampler()
+
+# System Stats API
+@app.route('/api/system/stats', methods=['GET'])
+def get_system_stats():
+    """Get system statistics (CPU, RAM, Disk, Temperature)"""
+    try:
+        max_age = request.args.get('max_age', type=float)
+        snapshot = system_sampler.get_snapshot(max_age=max_age)
+
         return jsonify({
             'success': True,
-            'cpu': round(cpu, 1),
-            'ram': round(ram, 1),
-            'disk': round(disk, 1),
-            'temp': round(temp, 1)
+            'cpu': snapshot['cpu'],
+            'cpu_per_core': snapshot['cpu_per_core'],
+            'ram': snapshot['ram'],
+            'disk': snapshot['disk'],
+            'temp': snapshot['temp'],
+            'net_sent': snapshot['net_sent'],
+            'net_recv': snapshot['net_recv'],
+            'disk_read': snapshot['disk_read'],
+            'disk_write': snapshot['disk_write'],
+            'timestamp': snapshot['timestamp'],
+            'age': round(time.time() - snapshot['timestamp'], 3)
         })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
-# Services API
-@app.route('/api/services/list', methods=['GET'])
-def list_services():
-    """List all monitored services"""
-    services = ['apache2', 'bind9', 'pihole-FTL', 'ssh']
-    service_list = []
-    
-    for service in services:
+@app.route('/api/system/stats/history', methods=['GET'])
+def get_system_stats_history():
+    """Get metrics history as columns (from/to are unix timestamps, negative from = seconds ago)"""
+    try:
+        system_sampler.ensure_started()
+        now = time.time()
+        end = request.args.get('to', default=now, type=float)
+        start = request.args.get('from', default=-600, type=float)
+        if start < 0:
+            start = end + start
+        step = request.args.get('step', type=float)
+
+        if start > end:
+            return jsonify({'success': False, 'error': 'from must be before to'}), 400
+
+        result_step, columns = system_history.query(start, end, step)
+
+        return jsonify({
+            'success': True,
+            'from': start,
+            'to': end,
+            'step': result_step,
+            'columns': columns
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+# Service Status Provider
+# Seconds a batched systemd status result stays valid
+SERVICE_STATUS_TTL = 2.0
+SERVICE_PROPERTIES = ['Id', 'LoadState', 'ActiveState', 'SubState', 'MainPID', 'MemoryCurrent']
+
+class ServiceStatusProvider:
+    """Fetches the state of many systemd units with a single `systemctl show` call"""
+
+    def __init__(self, ttl=SERVICE_STATUS_TTL):
+        self.ttl = ttl
+        self.cache = {}  # unit -> (timestamp, status)
+        self.lock = threading.Lock()
+
+    def _parse_value(self, key, value):
+        if key in ('MainPID', 'MemoryCurrent'):
+            # systemd reports unset memory as "[not set]" or UINT64_MAX
+            if not value.isdigit() or int(value) >= 2**64 - 1:
+                return None
+            return int(value)
+        return value
+
+    def _build_status(self, unit, props):
+        active_state = props.get('ActiveState', 'unknown')
+        if active_state == 'active':
+            status = 'running'
+        elif props.get('LoadState') == 'not-found' or active_state == 'unknown':
+            status = 'unknown'
+        else:
+            status = 'stopped'
+        return {
+            'name': unit,
+            'status': status,
+            'load_state': props.get('LoadState', 'unknown'),
+            'active_state': active_state,
+            'sub_state': props.get('SubState', 'unknown'),
+            'main_pid': props.get('MainPID'),
+            'memory': props.get('MemoryCurrent')
+        }
+
+    def _query(self, units):
+        """Run one `systemctl show` for all units and parse the property blocks"""
         try:
             result = subprocess.run(
-                f'systemctl is-active {service}',
-                shell=True,
+                ['systemctl', 'show', '--no-pager', '--property=' + ','.join(SERVICE_PROPERTIES), *units],
                 capture_output=True,
+                text=True,
+                timeout=10
+            )
+            blocks = result.stdout.strip().split('\n\n') if result.stdout.strip() else []
+        except Exception as e:
+            print(f"[SERVICES ERROR] systemctl show fehlgeschlagen: {e}")
+            blocks = []
+
+        parsed = []
+        for block in blocks:
+            props = {}
+            for line in block.splitlines():
+                key, sep, value = line.partition('=')
+                if sep:
+                    props[key] = self._parse_value(key, value)
+            parsed.append(props)
+
+        statuses = {}
+        # systemctl prints one block per unit, in argument order
+        if len(parsed) == len(units):
+            for unit, props in zip(units, parsed):
+                statuses[unit] = self._build_status(unit, props)
+        else:
+            by_id = {props.get('Id', '').removesuffix('.service'): props for props in parsed}
+            for unit in units:
+                statuses[unit] = self._build_status(unit, by_id.get(unit.removesuffix('.service'), {}))
+        return statuses
+
+    def get_statuses(self, units):
+        """Return {unit: status}, querying only expired or unknown units in one batch"""
+        now = time.time()
+        with self.lock:
+            statuses = {u: self.cache[u][1] for u in units if u in self.cache and now - self.cache[u][0] <= self.ttl}
+        stale = [u for u in units if u not in statuses]
+        if stale:
+            fresh = self._query(stale)
+            with self.lock:
+                for unit, status in fresh.items():
+                    self.cache[unit] = (now, status)
+            # Use the results directly, an invalidate() may already have dropped them from the cache
+            statuses.update(fresh)
+        return {unit: statuses[unit] for unit in units}
+
+    def get_status(self, unit):
+        return self.get_statuses([unit])[unit]
+
+    def invalidate(self, unit=None):
+        with self.lock:
+            if unit is None:
+                self.cache.clear()
+            else:
+                self.cache.pop(unit, None)
+
+service_status = ServiceStatusProvider()
+
+# Monitored Service Registry
+DEFAULT_MONITORED_SERVICES = [
+    {'name': 'apache2', 'aliases': []},
+    {'name': 'bind9', 'aliases': ['dns']},
+    {'name': 'pihole-FTL', 'aliases': ['pihole']},
+    {'name': 'ssh', 'aliases': []},
+]
+# Unit names end up in systemctl command lines, so keep them strict
+SERVICE_NAME_PATTERN = re.compile(r'^[A-Za-z0-9@._:-]+$')
+
+class ServiceRegistry:
+    """List of monitored systemd units, persisted in SERVICES_FILE"""
+
+    def __init__(self, filename=SERVICES_FILE):
+        self.filename = filename
+        self.lock = threading.Lock()
+        if not os.path.exists(filename):
+            save_json_file(filename, DEFAULT_MONITORED_SERVICES)
+        self.services = load_json_file(filename)
+
+    def entries(self):
+        with self.lock:
+            return [dict(entry) for entry in self.services]
+
+    def units(self):
+        with self.lock:
+            return [entry['name'] for entry in self.services]
+
+    def resolve(self, name):
+        """Map a unit name or alias to the monitored unit name (None if unknown)"""
+        with self.lock:
+            for entry in self.services:
+                if name == entry['name'] or name in entry.get('aliases', []):
+                    return entry['name']
+        return None
+
+    def add(self, name, aliases=None):
+        aliases = aliases or []
+        if not all(SERVICE_NAME_PATTERN.match(n) for n in [name, *aliases]):
+            return False, 'Invalid service name'
+        with self.lock:
+            if any(entry['name'] == name for entry in self.services):
+                return False, 'Service already monitored'
+            self.services.append({'name': name, 'aliases': aliases})
+            if not save_json_file(self.filename, self.services):
+                self.services.pop()
+                return False, 'Failed to save service registry'
+        return True, None
+
+    def remove(self, name):
+        with self.lock:
+            remaining = [entry for entry in self.services if entry['name'] != name]
+            if len(remaining) == len(self.services):
+                return False
+            self.services = remaining
+            save_json_file(self.filename, self.services)
+        service_status.invalidate(name)
+        return True
+
+service_registry = ServiceRegistry()
+
+# Service State Watcher
+# Fallback poll interval in seconds (used as safety net while journalctl runs)
+SERVICE_WATCH_INTERVAL = 2.0
+SERVICE_WATCH_INTERVAL_JOURNAL = 10.0
+# Short delay after a journal hint so systemd has settled the unit state
+SERVICE_WATCH_DEBOUNCE = 0.05
+
+class ServiceWatcher:
+    """Follows unit state transitions and publishes them on the event bus"""
+
+    def __init__(self):
+        self.states = {}  # unit -> last published status dict
+        self.wake = threading.Event()
+        self.journal_running = False
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def ensure_started(self):
+        with self.lock:
+            if self.thread and self.thread.is_alive():
+                return
+            self.thread = threading.Thread(target=self._poll_loop, name='service-watcher')
+            self.thread.daemon = True
+            self.thread.start()
+            journal_thread = threading.Thread(target=self._follow_journal, name='service-journal')
+            journal_thread.daemon = True
+            journal_thread.start()
+
+    def notify(self):
+        """Request an immediate re-check (e.g. after a control action)"""
+        self.wake.set()
+
+    def snapshot(self):
+        statuses = service_status.get_statuses(service_registry.units())
+        return list(statuses.values())
+
+    def _follow_journal(self):
+        """Wake the poll loop whenever systemd logs something about a monitored unit"""
+        try:
+            process = subprocess.Popen(
+                ['journalctl', '-f', '-o', 'json', '-n', '0', '_PID=1'],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
                 text=True
             )
-            status = 'running' if result.stdout.strip() == 'active' else 'stopped'
-        except:
-            status = 'unknown'
-        
-        service_list.append({
-            'name': service,
-            'status': status
-        })
+        except Exception as e:
+            print(f"[SERVICES] journalctl nicht verfügbar, nutze Polling: {e}")
+            return
+        self.journal_running = True
+        try:
+            for line in process.stdout:
+                try:
+                    unit = json.loads(line).get('UNIT', '')
+                except ValueError:
+                    continue
+                if unit and unit.removesuffix('.service') in service_registry.units():
+                    self.wake.set()
+        finally:
+            self.journal_running = False
+            print("[SERVICES] journalctl beendet, nutze Polling")
+
+    def _check(self):
+        service_status.invalidate()
+        for status in self.snapshot():
+            previous = self.states.get(status['name'])
+            self.states[status['name']] = status
+            if previous and (previous['active_state'], previous['sub_state']) != (status['active_state'], status['sub_state']):
+                event_bus.publish('services', {
+                    'type': 'change',
+                    'service': status,
+                    'previous': previous['status'],
+                    'timestamp': time.time()
+                })
+
+    def _poll_loop(self):
+        while True:
+            interval = SERVICE_WATCH_INTERVAL_JOURNAL if self.journal_running else SERVICE_WATCH_INTERVAL
+            if self.wake.wait(timeout=interval):
+                time.sleep(SERVICE_WATCH_DEBOUNCE)
+                self.wake.clear()
+            try:
+                self._check()
+            except Exception as e:
+                print(f"[SERVICES ERROR] {e}")
+
+service_watcher = ServiceWatcher()
+
+# Services API
+@app.route('/api/services/list', methods=['GET'])
+def list_services():
+    """List all monitored services"""
+    units = service_registry.units()
+    statuses = service_status.get_statuses(units)
+    
+    return jsonify({
+        'success': True,
+        'services': [statuses[service] for service in units]
+    })
+
+@app.route('/api/services/events', methods=['GET'])
+def service_events():
+    """Stream service state changes as Server-Sent Events"""
+    service_watcher.ensure_started()
+    return sse_response('services', [{
+        'type': 'snapshot',
+        'services': service_watcher.snapshot(),
+        'timestamp': time.time()
+    }])
+
+@app.route('/api/services/registry', methods=['GET'])
+def get_service_registry():
+    """List monitored services with their aliases"""
+    return jsonify({
+        'success': True,
+        'services': service_registry.entries()
+    })
+
+@app.route('/api/services/registry', methods=['POST'])
+def add_service_to_registry():
+    """Add a systemd unit to the monitored services"""
+    data = request.get_json()
+    name = data.get('name')
+    aliases = data.get('aliases', [])
+    
+    if not name:
+        return jsonify({
+            'success': False,
+            'message': 'Service name required'
+        }), 400
+    
+    success, error = service_registry.add(name, aliases)
+    if not success:
+        return jsonify({
+            'success': False,
+            'message': error
+        }), 400
     
+    # The watcher only publishes changes of units it has seen before
+    event_bus.publish('services', {
+        'type': 'snapshot',
+        'services': service_watcher.snapshot(),
+        'timestamp': time.time()
+    })
+    return jsonify({
+        'success': True,
+        'message': 'Service added'
+    })
+
+@app.route('/api/services/registry', methods=['DELETE'])
+def remove_service_from_registry():
+    """Remove a systemd unit from the monitored services"""
+    data = request.get_json()
+    name = data.get('name')
+    
+    if not name or not service_registry.remove(name):
+        return jsonify({
+            'success': False,
+            'message': 'Service not found'
+        }), 404
+    
+    event_bus.publish('services', {
+        'type': 'snapshot',
+        'services': service_watcher.snapshot(),
+        'timestamp': time.time()
+    })
     return jsonify({
         'success': True,
-        'services': service_list
+        'message': 'Service removed'
     })
 
 @app.route('/api/service/<service>/<action>', methods=['POST'])
 def control_service(service, action):
     """Control a service (start, stop, restart)"""
     valid_actions = ['start', 'stop', 'restart', 'enable', 'disable']
-    valid_services = ['apache2', 'bind9', 'pihole-FTL', 'ssh', 'dns', 'pihole']
     
-    # Map service aliases
-    service_map = {
-        'dns': 'bind9',
-        'pihole': 'pihole-FTL'
-    }
-    
-    service = service_map.get(service, service)
+    service = service_registry.resolve(service)
     
-    if action not in valid_actions or service not in valid_services:
+    if action not in valid_actions or not service:
         return jsonify({
             'success': False,
             'message': 'Invalid service or action'
         }), 400
     
     result = run_command(f'sudo systemctl {action} {service}')
+    service_status.invalidate(service)
+    service_watcher.notify()
     
     return jsonify({
         'success': result['success'],
-        'message': result.get('output', result.get('error', ''))
+        'message': result.get('output', result.get('error', '')),
+        'state': service_status.get_status(service)
     })
 
 @app.route('/api/service/<service>/status', methods=['GET'])
 def get_service_status(service):
     """Get detailed service status"""
+    service = service_registry.resolve(service)
+    
+    if not service:
+        return jsonify({
+            'success': False,
+            'status': 'Unknown service'
+        }), 404
+    
     result = run_command(f'sudo systemctl status {service}')
     
     return jsonify({
         'success': result['success'],
-        'status': result.get('output', result.get('error', ''))
+        'status': result.get('output', result.get('error', '')),
+        'state': service_status.get_status(service)
     })
 
 # DNS API
 @app.route('/api/dns/list', methods=['GET'])
 def list_dns_entries():
     """List all DNS entries"""
-    entries = load_json_file(DNS_FILE)
+    entries = store.list_dns_entries()
     return jsonify({
         'success': True,
         'entries': entries
@@ -817,14 +3044,13 @@ def add_dns_entry():
             'message': 'Domain and IP required'
         }), 400
     
-    entries = load_json_file(DNS_FILE)
-    entries.append({
+    entry = {
         'domain': domain,
         'ip': ip,
         'created': datetime.now().isoformat()
-    })
+    }
     
-    if save_json_file(DNS_FILE, entries):
+    if store.add_dns_entry(entry):
         # Update DNS server configuration (example for BIND)
         # This would need to be adapted to your specific DNS server
         return jsonify({
@@ -849,15 +3075,13 @@ def delete_dns_entry():
             'message': 'Domain required'
         }), 400
     
-    entries = load_json_file(DNS_FILE)
-    entries = [e for e in entries if e['domain'] != domain]
-    
-    if save_json_file(DNS_FILE, entries):
+    try:
+        store.delete_dns_entries(domain)
         return jsonify({
             'success': True,
             'message': 'DNS entry deleted'
         })
-    else:
+    except sqlite3.Error:
         return jsonify({
             'success': False,
             'message': 'Failed to delete DNS entry'
@@ -923,19 +3147,582 @@ def update_gravity():
         'message': 'Gravity updated'
     })
 
+# Gameserver Supervisor
+# Bytes of console output kept in memory per server
+CONSOLE_BUFFER_SIZE = 256 * 1024
+# Seconds to wait after SIGTERM before the process group is killed
+GAMESERVER_STOP_TIMEOUT = 15
+CONSOLE_COLUMNS = 200
+CONSOLE_ROWS = 50
+# Seconds between reads of the server log while following console output
+CONSOLE_POLL_INTERVAL = 0.1
+# State files and input FIFOs of running servers, used to re-attach after a restart
+GAMESERVER_RUN_DIR = 'data/supervisor'
+
+class ConsoleBuffer:
+    """Ring buffer of console output addressed by absolute byte offsets"""
+
+    def __init__(self, size=CONSOLE_BUFFER_SIZE):
+        self.size = size
+        self.data = bytearray()
+        self.start = 0  # absolute offset of data[0]
+        self.condition = threading.Condition()
+        self.closed = False
+
+    @property
+    def end(self):
+        return self.start + len(self.data)
+
+    def append(self, chunk):
+        with self.condition:
+            self.data += chunk
+            overflow = len(self.data) - self.size
+            if overflow > 0:
+                del self.data[:overflow]
+                self.start += overflow
+            self.condition.notify_all()
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def read(self, offset=None, timeout=None):
+        """Return (data, next offset) after offset, waiting up to timeout for new output
+
+        Output that was already overwritten is skipped.
+        """
+        with self.condition:
+            if offset is None:
+                offset = self.end
+            elif offset > self.end:
+                # Offset of an earlier run of the server, start over
+                offset = self.start
+            if timeout and offset == self.end and not self.closed:
+                self.condition.wait(timeout)
+            offset = max(offset, self.start)
+            return bytes(self.data[offset - self.start:]), self.end
+
+    def tail(self, lines):
+        with self.condition:
+            data = bytes(self.data)
+        return b'\n'.join(data.splitlines()[-lines:])
+
+def decode_console(data):
+    return ANSI_ESCAPE_PATTERN.sub('', data.decode('utf-8', errors='replace')).replace('\r', '')
+
+# Runs detached from the backend in its own session: owns the PTY of one gameserver,
+# appends its output to stdout (the server log) and feeds the FIFO into its input.
+# Started as `python -c GAMESERVER_HOLDER <fifo> <exit file> <rows> <columns> <command...>`
+GAMESERVER_HOLDER = r'''
+import fcntl, os, pty, select, struct, sys, termios
+fifo, exit_file, rows, columns = sys.argv[1:5]
+pid, master = pty.fork()
+if pid == 0:
+    os.execvp(sys.argv[5], sys.argv[5:])
+fcntl.ioctl(master, termios.TIOCSWINSZ, struct.pack('HHHH', int(rows), int(columns), 0, 0))
+# Opened read-write so the FIFO never reports EOF while no backend is attached
+stdin = os.open(fifo, os.O_RDWR)
+while True:
+    ready = select.select([master, stdin], [], [])[0]
+    try:
+        if master in ready:
+            data = os.read(master, 65536)
+            if not data:
+                break
+            os.write(1, data)
+        if stdin in ready:
+            os.write(master, os.read(stdin, 65536))
+    except OSError:
+        # EIO once every process holding the PTY slave has exited
+        break
+code = os.waitstatus_to_exitcode(os.waitpid(pid, 0)[1])
+with open(exit_file, 'w') as f:
+    f.write(str(code))
+'''
+
+class SupervisedProcess:
+    """A gameserver running under a detached PTY holder process
+
+    The holder is not a child of the backend's session, so servers keep running
+    when the backend restarts; the state file in GAMESERVER_RUN_DIR lets the next
+    backend re-attach to them. Console output is followed from the server log.
+    """
+
+    def __init__(self, name, state, popen=None):
+        self.name = name
+        self.state = state
+        self.popen = popen  # only for holders this backend started, to reap them
+        self.holder = psutil.Process(state['holder_pid'])
+        self.server_pid = None
+        self.buffer = ConsoleBuffer()
+        self.started = state['started']
+        self.exit_code = None
+        self.log = open(state['log_file'], 'rb')
+        self.log.seek(state['offset'])
+        self.thread = threading.Thread(target=self._read_loop, name=f'console-{name}')
+        self.thread.daemon = True
+        self.thread.start()
+
+    @staticmethod
+    def paths(name):
+        base = os.path.abspath(os.path.join(GAMESERVER_RUN_DIR, name))
+        return {'state': f'{base}.json', 'fifo': f'{base}.stdin', 'exit': f'{base}.exit'}
+
+    @classmethod
+    def start(cls, name, command, cwd, log_file):
+        paths = cls.paths(name)
+        os.makedirs(GAMESERVER_RUN_DIR, exist_ok=True)
+        for path in (paths['fifo'], paths['exit']):
+            if os.path.exists(path):
+                os.remove(path)
+        os.mkfifo(paths['fifo'], 0o600)
+        with open(log_file, 'ab') as log:
+            offset = log.tell()
+            popen = subprocess.Popen(
+                [sys.executable, '-c', GAMESERVER_HOLDER, paths['fifo'], paths['exit'],
+                 str(CONSOLE_ROWS), str(CONSOLE_COLUMNS)] + command,
+                cwd=cwd,
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                start_new_session=True,  # survives the backend and its process group
+                close_fds=True
+            )
+        state = {
+            'holder_pid': popen.pid,
+            'holder_created': psutil.Process(popen.pid).create_time(),
+            'log_file': os.path.abspath(log_file),
+            'offset': offset,
+            'started': time.time()
+        }
+        save_json_file(paths['state'], state)
+        return cls(name, state, popen)
+
+    @classmethod
+    def attach(cls, name):
+        """Re-attach to a server started by an earlier backend, None if it has exited"""
+        paths = cls.paths(name)
+        state = load_json_file(paths['state'])
+        try:
+            holder = psutil.Process(state['holder_pid'])
+            if abs(holder.create_time() - state['holder_created']) > 1:
+                raise psutil.NoSuchProcess(state['holder_pid'])
+            # Refill the console buffer with the most recent output
+            state['offset'] = max(state['offset'], os.path.getsize(state['log_file']) - CONSOLE_BUFFER_SIZE)
+            return cls(name, state)
+        except (TypeError, KeyError, OSError, psutil.Error):
+            cls._cleanup(paths)
+            return None
+
+    @staticmethod
+    def _cleanup(paths):
+        for path in paths.values():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    @property
+    def pid(self):
+        """PID of the server itself (session leader below the holder)"""
+        if self.server_pid is None:
+            try:
+                children = self.holder.children()
+            except psutil.Error:
+                children = []
+            if not children:
+                return self.holder.pid
+            self.server_pid = children[0].pid
+        return self.server_pid
+
+    def is_running(self):
+        if self.popen:
+            return self.popen.poll() is None
+        return self.holder.is_running()
+
+    def _read_loop(self):
+        while True:
+            data = self.log.read(65536)
+            if data:
+                self.buffer.append(data)
+                continue
+            if not self.is_running():
+                # Output written between the last read and the exit
+                data = self.log.read()
+                if data:
+                    self.buffer.append(data)
+                break
+            time.sleep(CONSOLE_POLL_INTERVAL)
+        paths = self.paths(self.name)
+        try:
+            with open(paths['exit']) as f:
+                self.exit_code = int(f.read())
+        except (OSError, ValueError):
+            pass
+        self.buffer.close()
+        self.log.close()
+        # A newer start under the same name owns the files by now
+        if gameserver_supervisor.get(self.name) in (self, None):
+            self._cleanup(paths)
+        print(f"[SUPERVISOR] {self.name} beendet (Exit-Code {self.exit_code})")
+
+    def write(self, data):
+        if not self.is_running():
+            raise RuntimeError('Server läuft nicht')
+        if isinstance(data, str):
+            data = data.encode()
+        fd = os.open(self.paths(self.name)['fifo'], os.O_WRONLY | os.O_NONBLOCK)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+
+    def _wait(self, timeout):
+        if self.popen:
+            self.popen.wait(timeout)
+        else:
+            self.holder.wait(timeout)
+
+    def stop(self, timeout=GAMESERVER_STOP_TIMEOUT):
+        """SIGTERM the server's process group, SIGKILL it if it does not exit within timeout"""
+        if not self.is_running():
+            return
+        pid = self.pid
+        try:
+            os.killpg(pid, signal.SIGTERM)
+            self._wait(timeout)
+        except (subprocess.TimeoutExpired, psutil.TimeoutExpired):
+            os.killpg(pid, signal.SIGKILL)
+            self._wait(None)
+        except (ProcessLookupError, psutil.NoSuchProcess):
+            pass
+
+class GameserverSupervisor:
+    """Starts gameservers under PTY holders and keeps their console output in memory
+
+    Servers that are still running from an earlier backend are adopted on first use,
+    so only the process that actually serves requests attaches to them.
+    """
+
+    def __init__(self):
+        self.processes = {}  # server name -> SupervisedProcess (kept after exit for the console)
+        self.lock = threading.Lock()
+        self.adopted = False
+
+    def _adopt(self):
+        """Re-attach to running servers, called with self.lock held"""
+        if self.adopted:
+            return
+        self.adopted = True
+        try:
+            files = os.listdir(GAMESERVER_RUN_DIR)
+        except OSError:
+            return
+        for file in files:
+            if not file.endswith('.json'):
+                continue
+            name = file[:-len('.json')]
+            process = SupervisedProcess.attach(name)
+            if process:
+                self.processes[name] = process
+                print(f"[SUPERVISOR] {name} läuft noch, Console wieder verbunden (PID {process.pid})")
+
+    def start(self, name, start_script, cwd, log_file):
+        with self.lock:
+            self._adopt()
+            current = self.processes.get(name)
+            if current and current.is_running():
+                raise RuntimeError(f'Server {name} läuft bereits')
+            self.processes[name] = SupervisedProcess.start(name, ['bash', start_script], cwd, log_file)
+        gameserver_index.invalidate()
+        return self.processes[name]
+
+    def get(self, name):
+        with self.lock:
+            self._adopt()
+            return self.processes.get(name)
+
+    def is_running(self, name):
+        process = self.get(name)
+        return bool(process and process.is_running())
+
+    def running(self):
+        """Return {server name: pid} of all running supervised servers"""
+        with self.lock:
+            self._adopt()
+            return {name: process.pid for name, process in self.processes.items() if process.is_running()}
+
+    def stop(self, name, timeout=GAMESERVER_STOP_TIMEOUT):
+        process = self.get(name)
+        if not process:
+            return False
+        process.stop(timeout)
+        gameserver_index.invalidate()
+        return True
+
+    def forget(self, name):
+        with self.lock:
+            self.processes.pop(name, None)
+
+gameserver_supervisor = GameserverSupervisor()
+
+# Gameserver Process Index
+# Seconds a `screen -ls` result is reused before refreshing
+GAMESERVER_STATUS_TTL = 1.0
+SCREEN_SESSION_PATTERN = re.compile(r'^\s+(\d+)\.(\S+)\s')
+
+class GameserverProcessIndex:
+    """Maps server names to PIDs: supervised servers plus (legacy) screen sessions
+
+    Servers started before the supervisor existed still run in screen; those are
+    found with one `screen -ls` per refresh.
+    """
+
+    def __init__(self, ttl=GAMESERVER_STATUS_TTL):
+        self.ttl = ttl
+        self.sessions = {}  # session name -> screen PID
+        self.refreshed = 0
+        self.processes = {}  # pid -> psutil.Process (keeps cpu_percent state between calls)
+        self.lock = threading.Lock()
+
+    def refresh(self, force=False):
+        """Return {session name: pid}, re-reading `screen -ls` if the cache expired"""
+        with self.lock:
+            if not force and time.time() - self.refreshed < self.ttl:
+                return self._merged()
+            sessions = {}
+            try:
+                # screen -ls exits non-zero when sessions exist, only the output matters
+                result = subprocess.run(['screen', '-ls'], capture_output=True, text=True, timeout=10)
+                for line in result.stdout.splitlines():
+                    match = SCREEN_SESSION_PATTERN.match(line)
+                    if match:
+                        sessions[match.group(2)] = int(match.group(1))
+            except Exception as e:
+                print(f"[GAMESERVER] screen -ls fehlgeschlagen: {e}")
+            self.sessions = sessions
+            self.refreshed = time.time()
+            return self._merged()
+
+    def _merged(self):
+        sessions = dict(self.sessions)
+        sessions.update(gameserver_supervisor.running())
+        return sessions
+
+    def is_screen_session(self, name):
+        return name in self.refresh() and not gameserver_supervisor.is_running(name)
+
+    def invalidate(self):
+        with self.lock:
+            self.refreshed = 0
+
+    def get_pid(self, name, force=False):
+        return self.refresh(force).get(name)
+
+    def is_running(self, name, force=False):
+        return self.get_pid(name, force) is not None
+
+    def _process(self, pid):
+        process = self.processes.get(pid)
+        if process is None:
+            process = psutil.Process(pid)
+            # First call only primes the CPU counter
+            process.cpu_percent(interval=None)
+            self.processes[pid] = process
+        return process
+
+    def process_tree(self, name):
+        """Return the psutil processes of a session (screen process and all children)"""
+        pid = self.get_pid(name)
+        if pid is None:
+            return []
+        with self.lock:
+            try:
+                root = self._process(pid)
+                tree = [root]
+                for child in root.children(recursive=True):
+                    tree.append(self._process(child.pid))
+                return tree
+            except psutil.NoSuchProcess:
+                self.processes.pop(pid, None)
+                return []
+
+    def resource_usage(self, name):
+        """Sum CPU percent and RSS over the process tree of a session"""
+        cpu = 0.0
+        rss = 0
+        count = 0
+        for process in self.process_tree(name):
+            try:
+                with process.oneshot():
+                    cpu += process.cpu_percent(interval=None)
+                    rss += process.memory_info().rss
+                count += 1
+            except psutil.NoSuchProcess:
+                continue
+        return {'cpu': round(cpu, 1), 'rss': rss, 'processes': count}
+
+    def prune(self):
+        """Forget cached process handles of processes that have exited"""
+        with self.lock:
+            for pid, process in list(self.processes.items()):
+                if not process.is_running():
+                    del self.processes[pid]
+
+gameserver_index = GameserverProcessIndex()
+
+# Gameserver Resource Metrics
+# Sampling interval in seconds and number of samples kept per server (1 hour)
+GAMESERVER_METRICS_INTERVAL = 5.0
+GAMESERVER_METRICS_HISTORY = 720
+# cpu in percent, disk_read/disk_write in bytes per second like the system stats
+GAMESERVER_METRICS_COLUMNS = ('cpu', 'rss', 'threads', 'disk_read', 'disk_write')
+
+class GameserverMetricsCollector:
+    """Samples the process tree of every running gameserver into a bounded history"""
+
+    def __init__(self, interval=GAMESERVER_METRICS_INTERVAL, history_size=GAMESERVER_METRICS_HISTORY):
+        self.interval = interval
+        self.history_size = history_size
+        self.history = {}  # server name -> deque of sample dicts
+        self.latest = {}  # server name -> latest sample (including ports)
+        self.counters = {}  # server name -> (timestamp, cpu seconds, read bytes, written bytes)
+        self.lock = threading.Lock()
+        # Serializes sample_server(): request threads may sample next to the collector
+        self.sample_lock = threading.Lock()
+        self.thread = None
+
+    def ensure_started(self):
+        with self.lock:
+            if self.thread and self.thread.is_alive():
+                return
+            self.thread = threading.Thread(target=self._run, name='gameserver-metrics')
+            self.thread.daemon = True
+            self.thread.start()
+
+    def _listening_ports(self, process):
+        # psutil >= 6 renamed connections() to net_connections()
+        get_connections = getattr(process, 'net_connections', None) or process.connections
+        ports = set()
+        for conn in get_connections(kind='inet'):
+            if conn.status == psutil.CONN_LISTEN or (conn.type == socket.SOCK_DGRAM and conn.laddr):
+                ports.add((conn.laddr.port, 'udp' if conn.type == socket.SOCK_DGRAM else 'tcp'))
+        return ports
+
+    def sample_server(self, name):
+        """Collect CPU, RSS, threads, IO and listening sockets for one session"""
+        with self.sample_lock:
+            return self._sample_server(name)
+
+    def _sample_server(self, name):
+        now = time.time()
+        cpu_seconds = 0.0
+        read_bytes = write_bytes = 0
+        sample = {'timestamp': now, 'rss': 0, 'threads': 0, 'processes': 0}
+        ports = set()
+        for process in gameserver_index.process_tree(name):
+            try:
+                with process.oneshot():
+                    times = process.cpu_times()
+                    cpu_seconds += times.user + times.system
+                    sample['rss'] += process.memory_info().rss
+                    sample['threads'] += process.num_threads()
+                    try:
+                        io = process.io_counters()
+                        read_bytes += io.read_bytes
+                        write_bytes += io.write_bytes
+                    except (psutil.AccessDenied, AttributeError):
+                        pass
+                    try:
+                        ports |= self._listening_ports(process)
+                    except psutil.AccessDenied:
+                        pass
+                sample['processes'] += 1
+            except psutil.NoSuchProcess:
+                continue
+
+        # CPU percent and IO rates from the counter deltas of the whole tree since the last sample
+        previous = self.counters.get(name)
+        self.counters[name] = (now, cpu_seconds, read_bytes, write_bytes)
+        sample.update({'cpu': 0.0, 'disk_read': 0.0, 'disk_write': 0.0})
+        if previous and now > previous[0]:
+            elapsed = now - previous[0]
+            sample['cpu'] = round(max(0.0, cpu_seconds - previous[1]) / elapsed * 100, 1)
+            # Counters shrink when a process of the tree exits, do not report negative rates
+            sample['disk_read'] = round(max(0, read_bytes - previous[2]) / elapsed)
+            sample['disk_write'] = round(max(0, write_bytes - previous[3]) / elapsed)
+
+        sample['ports'] = [{'port': port, 'protocol': protocol} for port, protocol in sorted(ports)]
+        with self.lock:
+            if name not in self.history:
+                self.history[name] = deque(maxlen=self.history_size)
+            self.history[name].append(sample)
+            self.latest[name] = sample
+        return sample
+
+    def get_history(self, name, since=None):
+        """Return the history of a server as columns"""
+        with self.lock:
+            samples = [s for s in self.history.get(name, ()) if since is None or s['timestamp'] > since]
+        columns = {'timestamp': [s['timestamp'] for s in samples]}
+        for column in GAMESERVER_METRICS_COLUMNS:
+            columns[column] = [s[column] for s in samples]
+        return columns
+
+    def get_latest(self, name):
+        with self.lock:
+            return self.latest.get(name)
+
+    def forget(self, name):
+        with self.lock:
+            self.history.pop(name, None)
+            self.latest.pop(name, None)
+        with self.sample_lock:
+            self.counters.pop(name, None)
+
+    def _run(self):
+        while True:
+            try:
+                names = set(store.gameserver_names())
+                sessions = gameserver_index.refresh()
+                for name in names:
+                    if name in sessions:
+                        self.sample_server(name)
+                    else:
+                        # Drop the counter baseline so a restart does not produce a bogus delta
+                        with self.sample_lock:
+                            self.counters.pop(name, None)
+                        with self.lock:
+                            self.latest.pop(name, None)
+                gameserver_index.prune()
+            except Exception as e:
+                print(f"[METRICS ERROR] {e}")
+            time.sleep(self.interval)
+
+gameserver_metrics = GameserverMetricsCollector()
+
 # Gameserver API
 @app.route('/api/gameserver/list', methods=['GET'])
 def list_gameservers():
     """List all gameservers"""
-    servers = load_json_file(GAMESERVER_FILE)
+    servers = store.list_gameservers()
+    sessions = gameserver_index.refresh()
     
-    # Update status for each server
+    # Update status for each server from a single screen listing
     for server in servers:
         server_name = server.get('name')
-        # Check if server is running via screen session
-        check_cmd = f"screen -list | grep -q '{server_name}' && echo 'running' || echo 'stopped'"
-        result = run_command(check_cmd)
-        server['status'] = result.get('output', '').strip() or 'stopped'
+        if server_name in sessions:
+            server['status'] = 'running'
+            server['pid'] = sessions[server_name]
+            server['resources'] = gameserver_index.resource_usage(server_name)
+        elif server.get('status') in ('queued', 'installing'):
+            status = gameserver_installations.get(server.get('installation_id')) or {}
+            server['progress'] = status.get('progress', 0)
+            server['queue_position'] = status.get('queue_position')
+        else:
+            server['status'] = 'stopped'
+    gameserver_index.prune()
     
     return jsonify({
         'success': True,
@@ -958,9 +3745,15 @@ def create_gameserver():
             'error': 'Fehlende Parameter'
         }), 400
     
+    # Names starting with a dot are reserved (templates live in GAMESERVER_BASE_DIR/.templates)
+    if server_name.startswith('.') or '/' in server_name:
+        return jsonify({
+            'success': False,
+            'error': 'Ungültiger Servername'
+        }), 400
+    
     # Check if server with same name exists
-    servers = load_json_file(GAMESERVER_FILE)
-    if any(s['name'] == server_name for s in servers):
+    if store.get_gameserver(server_name):
         return jsonify({
             'success': False,
             'error': 'Server mit diesem Namen existiert bereits'
@@ -974,98 +3767,109 @@ def create_gameserver():
             'error': 'Unbekannter Server-Typ'
         }), 400
     
-    # Save server to database first
+    # Save server to database first, the record also persists the queued job
     server_entry = {
         'type': server_type,
         'name': server_name,
         'port': port,
         'ram': ram,
-        'status': 'installing',
+        'status': 'queued',
         'created': datetime.now().isoformat(),
         'directory': installer.server_dir,
-        'config_file': get_config_file_path(server_type, installer.server_dir)
+        'config_file': get_config_file_path(server_type, installer.server_dir),
+        'installation_id': installer.installation_id
     }
-    servers.append(server_entry)
-    save_json_file(GAMESERVER_FILE, servers)
-    
-    # Start installation in background thread
-    installation_id = installer.installation_id
-    
-    def install_thread():
-        try:
-            print(f"[GAMESERVER] Starte Installation von {server_name} (Typ: {server_type})")
-            print(f"[GAMESERVER] Installation ID: {installation_id}")
-            print(f"[GAMESERVER] Zielverzeichnis: {installer.server_dir}")
-            
-            success = installer.install()
-            
-            # Update server status after installation
-            servers = load_json_file(GAMESERVER_FILE)
-            for s in servers:
-                if s['name'] == server_name:
-                    status = gameserver_installations.get(installation_id, {})
-                    if status.get('status') == 'complete':
-                        s['status'] = 'stopped'
-                        print(f"[GAMESERVER] Installation von {server_name} erfolgreich abgeschlossen")
-                    else:
-                        s['status'] = 'error'
-                        error_msg = status.get('message', 'Unbekannter Fehler')
-                        print(f"[GAMESERVER] Installation von {server_name} fehlgeschlagen: {error_msg}")
-                    break
-            save_json_file(GAMESERVER_FILE, servers)
-            
-        except Exception as e:
-            error_msg = f"Kritischer Fehler im Install-Thread: {str(e)}"
-            print(f"[GAMESERVER ERROR] {error_msg}")
-            import traceback
-            traceback.print_exc()
-            
-            # Update installation status with error
-            gameserver_installations[installation_id] = {
-                'status': 'error',
-                'progress': 0,
-                'message': error_msg,
-                'timestamp': time.time()
-            }
-            
-            # Update server status in database
-            servers = load_json_file(GAMESERVER_FILE)
-            for s in servers:
-                if s['name'] == server_name:
-                    s['status'] = 'error'
-                    break
-            save_json_file(GAMESERVER_FILE, servers)
+    if not store.add_gameserver(server_entry):
+        return jsonify({
+            'success': False,
+            'error': 'Server mit diesem Namen existiert bereits'
+        }), 400
     
-    thread = threading.Thread(target=install_thread)
-    thread.daemon = True
-    thread.start()
+    install_scheduler.submit(installer)
     
     return jsonify({
         'success': True,
         'message': 'Server-Installation gestartet',
-        'installation_id': installation_id
+        'installation_id': installer.installation_id
+    })
+
+@app.route('/api/gameserver/templates', methods=['GET'])
+def list_gameserver_templates():
+    """List golden templates used for instant provisioning"""
+    return jsonify({
+        'success': True,
+        'templates': template_store.list()
+    })
+
+@app.route('/api/gameserver/templates/<server_type>', methods=['DELETE'])
+def delete_gameserver_template(server_type):
+    """Delete the templates of a type (or one ?version=), the next install rebuilds it"""
+    if not template_store.remove(server_type, request.args.get('version')):
+        return jsonify({'success': False, 'error': 'Vorlage nicht gefunden'}), 404
+    return jsonify({
+        'success': True,
+        'message': f'Vorlage {server_type} gelöscht'
+    })
+
+@app.route('/api/gameserver/artifacts', methods=['GET'])
+def get_artifact_cache_stats():
+    """Get size and hit statistics of the installer artifact cache"""
+    return jsonify({
+        'success': True,
+        'cache': artifact_cache.stats()
     })
 
 @app.route('/api/gameserver/installation/<installation_id>', methods=['GET'])
 def get_installation_status(installation_id):
     """Get installation status"""
-    status = gameserver_installations.get(installation_id, {
+    status = gameserver_installations.get(installation_id) or {
         'status': 'unknown',
         'progress': 0,
         'message': 'Keine Installation gefunden'
-    })
+    }
     
     return jsonify({
         'success': True,
         'status': status
     })
 
+@app.route('/api/gameserver/installation/<installation_id>/cancel', methods=['POST'])
+def cancel_installation(installation_id):
+    """Cancel a queued or running installation"""
+    if not install_scheduler.cancel(installation_id):
+        return jsonify({
+            'success': False,
+            'error': 'Keine laufende Installation gefunden'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'message': 'Installation wird abgebrochen'
+    })
+
+@app.route('/api/gameserver/installation/<installation_id>/events', methods=['GET'])
+def installation_events(installation_id):
+    """Stream installation progress as Server-Sent Events until it finishes"""
+    if gameserver_installations.get(installation_id) is None:
+        return jsonify({
+            'success': False,
+            'error': 'Keine Installation gefunden'
+        }), 404
+    
+    def initial_events():
+        # Evaluated after subscribing, so no update between snapshot and stream is lost
+        event = gameserver_installations.snapshot_event(installation_id)
+        if event:
+            yield event
+    
+    return sse_response(gameserver_installations.topic(installation_id), initial_events(),
+                        until=InstallationTracker.is_final)
+
 @app.route('/api/gameserver/<name>/start', methods=['POST'])
 def start_gameserver(name):
     """Start a gameserver"""
     try:
-        servers = load_json_file(GAMESERVER_FILE)
-        server = next((s for s in servers if s['name'] == name), None)
+        server = store.get_gameserver(name)
         
         if not server:
             return jsonify({'success': False, 'error': 'Server nicht gefunden'}), 404
@@ -1085,32 +3889,26 @@ def start_gameserver(name):
             log_error_to_file(name, error_msg)
             return jsonify({'success': False, 'error': error_msg}), 404
         
-        # Check if screen session already exists
-        check_screen = f"screen -list | grep -q {name}"
-        screen_exists = run_command(check_screen)
-        if screen_exists.get('returncode') == 0:
+        # Check if the server (or a legacy screen session) already runs
+        if gameserver_index.is_running(name, force=True):
             error_msg = f'Server {name} läuft bereits'
             return jsonify({'success': False, 'error': error_msg}), 400
         
-        # Start server in screen session with logging
+        # Start server under the supervisor, console output is also appended to server.log
         log_file = os.path.join(server_dir, 'server.log')
-        screen_cmd = f"screen -dmS {name} bash -c 'bash {start_script} 2>&1 | tee -a {log_file}'"
-        result = run_command(screen_cmd)
+        try:
+            gameserver_supervisor.start(name, start_script, os.path.dirname(start_script), log_file)
+            result = {'success': True}
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
         
         if result['success']:
             # Wait a moment and check if server is actually running
             time.sleep(2)
-            check_result = run_command(f"screen -list | grep {name}")
             
-            if check_result.get('returncode') == 0:
+            if gameserver_supervisor.is_running(name):
                 # Update server status
-                for s in servers:
-                    if s['name'] == name:
-                        s['status'] = 'running'
-                        if 'last_error' in s:
-                            del s['last_error']
-                        break
-                save_json_file(GAMESERVER_FILE, servers)
+                store.update_gameserver(name, {'status': 'running'}, remove=['last_error'])
                 
                 return jsonify({
                     'success': True,
@@ -1123,12 +3921,7 @@ def start_gameserver(name):
                 log_error_to_file(name, f"{error_msg}\n{error_log}")
                 
                 # Update server status
-                for s in servers:
-                    if s['name'] == name:
-                        s['status'] = 'error'
-                        s['last_error'] = error_msg
-                        break
-                save_json_file(GAMESERVER_FILE, servers)
+                store.update_gameserver(name, {'status': 'error', 'last_error': error_msg})
                 
                 return jsonify({
                     'success': False,
@@ -1152,17 +3945,10 @@ def start_gameserver(name):
 def stop_gameserver(name):
     """Stop a gameserver"""
     try:
-        # Send quit command to screen session and then kill it
-        stop_cmd = f"screen -S {name} -X quit"
-        result = run_command(stop_cmd)
+        stop_gameserver_process(name)
         
         # Update server status
-        servers = load_json_file(GAMESERVER_FILE)
-        for s in servers:
-            if s['name'] == name:
-                s['status'] = 'stopped'
-                break
-        save_json_file(GAMESERVER_FILE, servers)
+        store.update_gameserver(name, {'status': 'stopped'})
         
         return jsonify({
             'success': True,
@@ -1177,15 +3963,10 @@ def restart_gameserver(name):
     """Restart a gameserver"""
     try:
         # Stop server
-        stop_cmd = f"screen -S {name} -X quit"
-        run_command(stop_cmd)
-        
-        # Wait a moment
-        time.sleep(2)
+        stop_gameserver_process(name)
         
         # Start server
-        servers = load_json_file(GAMESERVER_FILE)
-        server = next((s for s in servers if s['name'] == name), None)
+        server = store.get_gameserver(name)
         
         if not server:
             return jsonify({'success': False, 'error': 'Server nicht gefunden'}), 404
@@ -1199,15 +3980,11 @@ def restart_gameserver(name):
         else:
             start_script = os.path.join(server_dir, 'start.sh')
             
-        screen_cmd = f"screen -dmS {name} bash {start_script}"
-        run_command(screen_cmd)
+        log_file = os.path.join(server_dir, 'server.log')
+        gameserver_supervisor.start(name, start_script, os.path.dirname(start_script), log_file)
         
         # Update status
-        for s in servers:
-            if s['name'] == name:
-                s['status'] = 'running'
-                break
-        save_json_file(GAMESERVER_FILE, servers)
+        store.update_gameserver(name, {'status': 'running'})
         
         return jsonify({
             'success': True,
@@ -1222,24 +3999,30 @@ def delete_gameserver(name):
     """Delete a gameserver"""
     try:
         # Stop server if running
-        stop_cmd = f"screen -S {name} -X quit"
-        run_command(stop_cmd)
+        stop_gameserver_process(name)
+        gameserver_supervisor.forget(name)
         
         # Get server info
-        servers = load_json_file(GAMESERVER_FILE)
-        server = next((s for s in servers if s['name'] == name), None)
+        server = store.get_gameserver(name)
         
         if not server:
             return jsonify({'success': False, 'error': 'Server nicht gefunden'}), 404
         
+        # Stop a queued or running installation first; a running one only stops at its
+        # next progress report and must not write into the directory deleted below
+        installation_id = server.get('installation_id')
+        if installation_id and install_scheduler.cancel(installation_id):
+            if not install_scheduler.wait(installation_id, INSTALL_CANCEL_TIMEOUT):
+                return jsonify({'success': False, 'error': 'Installation wird noch abgebrochen, bitte erneut versuchen'}), 409
+        
         # Delete server directory
         server_dir = server.get('directory')
         if os.path.exists(server_dir):
             shutil.rmtree(server_dir)
         
         # Remove from database
-        servers = [s for s in servers if s['name'] != name]
-        save_json_file(GAMESERVER_FILE, servers)
+        store.delete_gameserver(name)
+        gameserver_metrics.forget(name)
         
         return jsonify({
             'success': True,
@@ -1253,8 +4036,7 @@ def delete_gameserver(name):
 def get_gameserver_config(name):
     """Get gameserver config file content"""
     try:
-        servers = load_json_file(GAMESERVER_FILE)
-        server = next((s for s in servers if s['name'] == name), None)
+        server = store.get_gameserver(name)
         
         if not server:
             return jsonify({'success': False, 'error': 'Server nicht gefunden'}), 404
@@ -1285,8 +4067,7 @@ def update_gameserver_config(name):
         if content is None:
             return jsonify({'success': False, 'error': 'Kein Inhalt angegeben'}), 400
         
-        servers = load_json_file(GAMESERVER_FILE)
-        server = next((s for s in servers if s['name'] == name), None)
+        server = store.get_gameserver(name)
         
         if not server:
             return jsonify({'success': False, 'error': 'Server nicht gefunden'}), 404
@@ -1312,22 +4093,107 @@ def update_gameserver_config(name):
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/gameserver/<name>/metrics', methods=['GET'])
+def get_gameserver_metrics(name):
+    """Get live resource usage and history of a gameserver"""
+    try:
+        if not store.get_gameserver(name):
+            return jsonify({'success': False, 'error': 'Server nicht gefunden'}), 404
+        
+        gameserver_metrics.ensure_started()
+        since = request.args.get('since', type=float)
+        current = gameserver_metrics.get_latest(name)
+        running = gameserver_index.is_running(name)
+        if running and current is None:
+            current = gameserver_metrics.sample_server(name)
+        
+        return jsonify({
+            'success': True,
+            'name': name,
+            'running': running,
+            'current': current if running else None,
+            'interval': gameserver_metrics.interval,
+            'history': gameserver_metrics.get_history(name, since)
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def stop_gameserver_process(name):
+    """Stop a supervised server, or quit the screen session of a legacy one"""
+    if not gameserver_supervisor.stop(name):
+        run_command(f"screen -S {name} -X quit")
+        gameserver_index.invalidate()
+
 @app.route('/api/gameserver/<name>/console', methods=['GET'])
 def get_gameserver_console(name):
-    """Get console output from screen session"""
+    """Get the last console lines (from the supervisor's buffer)"""
     try:
-        # Capture screen output (last 50 lines)
-        log_cmd = f"screen -S {name} -X hardcopy /tmp/{name}_screen.log && tail -n 50 /tmp/{name}_screen.log 2>/dev/null || echo 'Keine Console-Ausgabe verfügbar'"
-        result = run_command(log_cmd)
+        lines = request.args.get('lines', 50, type=int)
+        process = gameserver_supervisor.get(name)
+        if process:
+            return jsonify({
+                'success': True,
+                'output': decode_console(process.buffer.tail(lines)) or 'Keine Ausgabe',
+                'offset': process.buffer.end,
+                'running': process.is_running()
+            })
+        
+        if gameserver_index.is_screen_session(name):
+            # Legacy server started in screen before the supervisor existed
+            log_cmd = f"screen -S {name} -X hardcopy /tmp/{name}_screen.log && tail -n {lines} /tmp/{name}_screen.log 2>/dev/null || echo 'Keine Console-Ausgabe verfügbar'"
+            result = run_command(log_cmd)
+            return jsonify({
+                'success': True,
+                'output': result.get('output', 'Keine Ausgabe')
+            })
         
         return jsonify({
             'success': True,
-            'output': result.get('output', 'Keine Ausgabe')
+            'output': 'Keine Console-Ausgabe verfügbar'
         })
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/gameserver/<name>/console/stream', methods=['GET'])
+def stream_gameserver_console(name):
+    """Stream console output as Server-Sent Events, starting after ?offset="""
+    if not gameserver_supervisor.get(name):
+        return jsonify({'success': False, 'error': 'Keine Console verfügbar'}), 404
+    offset = request.args.get('offset', type=int)
+    
+    def generate():
+        current_offset = offset
+        process = gameserver_supervisor.get(name)
+        idle = 0.0
+        # Flush the headers right away instead of with the first output
+        yield ": connected\n\n"
+        while process:
+            data, next_offset = process.buffer.read(current_offset, timeout=1.0)
+            if data:
+                idle = 0.0
+                yield f"data: {json.dumps({'offset': next_offset, 'output': decode_console(data), 'running': process.is_running()})}\n\n"
+            else:
+                idle += 1.0
+                if idle >= SSE_HEARTBEAT_INTERVAL:
+                    idle = 0.0
+                    yield ": keepalive\n\n"
+            current_offset = next_offset
+            latest = gameserver_supervisor.get(name)
+            if latest is not process:
+                # Server was restarted, continue with the new console from its beginning
+                process = latest
+                current_offset = 0
+            elif process.buffer.closed and not data:
+                # Keep the stream open for a restart, but do not spin on the closed buffer
+                time.sleep(1.0)
+    
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 @app.route('/api/gameserver/<name>/command', methods=['POST'])
 def send_gameserver_command(name):
     """Send command to gameserver console"""
@@ -1338,9 +4204,14 @@ def send_gameserver_command(name):
         if not command:
             return jsonify({'success': False, 'error': 'Kein Befehl angegeben'}), 400
         
-        # Send command to screen session
-        screen_cmd = f"screen -S {name} -X stuff '{command}\n'"
-        result = run_command(screen_cmd)
+        if gameserver_supervisor.is_running(name):
+            # Write straight to the PTY of the server
+            gameserver_supervisor.get(name).write(command + '\n')
+        elif gameserver_index.is_screen_session(name):
+            screen_cmd = f"screen -S {name} -X stuff '{command}\n'"
+            run_command(screen_cmd)
+        else:
+            return jsonify({'success': False, 'error': 'Server läuft nicht'}), 400
         
         return jsonify({
             'success': True,
@@ -1375,27 +4246,124 @@ def log_error_to_file(server_name, error_message):
     except Exception as e:
         print(f"Fehler beim Schreiben des Error-Logs: {e}")
 
+# Log Tailing
+LOG_TAIL_BLOCK_SIZE = 64 * 1024
+# Maximum bytes returned per incremental read
+LOG_READ_MAX_BYTES = 1024 * 1024
+LOG_FOLLOW_INTERVAL = 0.5
+GAMESERVER_LOG_FILES = [
+    'server.log',
+    'logs/latest.log',
+    'logs/server.log',
+    'BeamMP-Server.log',
+    'valheim.log',
+]
+
+def _read_tail(path, lines):
+    """Return (data, position): the end of the file from position, holding at least lines lines"""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b''
+        while position > 0 and data.count(b'\n') <= lines:
+            size = min(LOG_TAIL_BLOCK_SIZE, position)
+            position -= size
+            f.seek(position)
+            data = f.read(size) + data
+    return data, position
+
+def tail_file(path, lines=100):
+    """Return the last lines of a file by reading blocks backwards from the end"""
+    data, _ = _read_tail(path, lines)
+    return b'\n'.join(data.splitlines()[-lines:]).decode('utf-8', errors='replace')
+
+def parse_log_cursor(cursor):
+    """Parse an 'inode:offset' cursor, returns (inode, offset) or None"""
+    try:
+        inode, offset = cursor.split(':')
+        return int(inode), int(offset)
+    except (AttributeError, ValueError):
+        return None
+
+def _find_rotated(path, inode):
+    """Look for the previous log file (renamed, same inode) next to path"""
+    directory = os.path.dirname(path) or '.'
+    try:
+        for entry in os.scandir(directory):
+            if entry.inode() == inode and entry.path != path and entry.is_file():
+                return entry.path
+    except OSError:
+        pass
+    return None
+
+def _read_from(path, offset, max_bytes, partial=False):
+    """Read complete lines starting at offset, returns (data, new offset)
+
+    A trailing partial line is left for the next read unless partial is set
+    or the line alone fills max_bytes.
+    """
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        data = f.read(max_bytes)
+    if not partial and (len(data) < max_bytes or b'\n' in data):
+        data = data[:data.rfind(b'\n') + 1]
+    return data, offset + len(data)
+
+def read_log(path, cursor=None, lines=100, max_bytes=LOG_READ_MAX_BYTES):
+    """Incrementally read a log file
+
+    Without a cursor the last lines are returned. With an 'inode:offset' cursor
+    only complete lines written since then are returned. A rotated file (new
+    inode) is finished from its renamed copy if one exists and then read from
+    the start; a truncated file is read from the start.
+    Returns {'output', 'cursor', 'rotated', 'truncated'}.
+    """
+    st = os.stat(path)
+    parsed = parse_log_cursor(cursor)
+    result = {'output': '', 'rotated': False, 'truncated': False}
+    if parsed is None:
+        data, position = _read_tail(path, lines)
+        end = data.rfind(b'\n') + 1
+        result['output'] = b'\n'.join(data[:end].splitlines()[-lines:]).decode('utf-8', errors='replace')
+        # Continue after the last complete line
+        result['cursor'] = f"{st.st_ino}:{position + end}"
+        return result
+
+    inode, offset = parsed
+    chunks = []
+    if inode != st.st_ino:
+        result['rotated'] = True
+        previous = _find_rotated(path, inode)
+        if previous:
+            # The old file will not grow anymore, include its partial last line
+            data, _ = _read_from(previous, offset, max_bytes, partial=True)
+            if data and not data.endswith(b'\n'):
+                data += b'\n'
+            chunks.append(data)
+        offset = 0
+    elif st.st_size < offset:
+        result['truncated'] = True
+        offset = 0
+
+    data, offset = _read_from(path, offset, max(0, max_bytes - sum(len(chunk) for chunk in chunks)))
+    chunks.append(data)
+    result['output'] = b''.join(chunks).decode('utf-8', errors='replace')
+    result['cursor'] = f"{st.st_ino}:{offset}"
+    return result
+
 def get_server_error_log(server_name, server_dir):
     """Get the last lines from server log files"""
     log_content = []
     
     # Check various possible log file locations
-    possible_logs = [
-        os.path.join(server_dir, 'server.log'),
-        os.path.join(server_dir, 'logs', 'latest.log'),
-        os.path.join(server_dir, 'logs', 'server.log'),
-        os.path.join(server_dir, 'BeamMP-Server.log'),
-        os.path.join(server_dir, 'valheim.log'),
-    ]
+    possible_logs = [os.path.join(server_dir, log_name) for log_name in GAMESERVER_LOG_FILES]
     
     for log_file in possible_logs:
         if os.path.exists(log_file):
             try:
                 # Get last 100 lines
-                result = run_command(f"tail -n 100 {log_file}")
-                if result.get('success'):
-                    log_content.append(f"=== {os.path.basename(log_file)} ===")
-                    log_content.append(result.get('output', ''))
+                log_content.append(f"=== {os.path.basename(log_file)} ===")
+                log_content.append(tail_file(log_file, 100))
             except Exception as e:
                 log_content.append(f"Fehler beim Lesen von {log_file}: {str(e)}")
     
@@ -1408,8 +4376,7 @@ def get_server_error_log(server_name, server_dir):
 def get_gameserver_logs(name):
     """Get server logs including error logs"""
     try:
-        servers = load_json_file(GAMESERVER_FILE)
-        server = next((s for s in servers if s['name'] == name), None)
+        server = store.get_gameserver(name)
         
         if not server:
             return jsonify({'success': False, 'error': 'Server nicht gefunden'}), 404
@@ -1424,9 +4391,7 @@ def get_gameserver_logs(name):
         error_log = ''
         if os.path.exists(error_log_file):
             try:
-                result = run_command(f"tail -n 50 {error_log_file}")
-                if result.get('success'):
-                    error_log = result.get('output', '')
+                error_log = tail_file(error_log_file, 50)
             except Exception as e:
                 error_log = f"Fehler beim Lesen des Error-Logs: {str(e)}"
         
@@ -1445,6 +4410,73 @@ def get_gameserver_logs(name):
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/gameserver/<name>/logs/tail', methods=['GET'])
+def tail_gameserver_log(name):
+    """Read new log lines after ?cursor= (inode:offset)
+
+    ?file= selects one of GAMESERVER_LOG_FILES or 'errors' (default: first existing file).
+    ?wait=<seconds> long-polls until new lines arrive, ?follow=1 streams them as SSE.
+    """
+    server = store.get_gameserver(name)
+    if not server:
+        return jsonify({'success': False, 'error': 'Server nicht gefunden'}), 404
+    
+    log_name = request.args.get('file')
+    if log_name == 'errors':
+        log_file = os.path.join('data', 'error_logs', f'{name}_errors.log')
+    elif log_name:
+        if log_name not in GAMESERVER_LOG_FILES:
+            return jsonify({'success': False, 'error': 'Unbekannte Log-Datei'}), 400
+        log_file = os.path.join(server.get('directory'), log_name)
+    else:
+        candidates = [os.path.join(server.get('directory'), log) for log in GAMESERVER_LOG_FILES]
+        log_file = next((path for path in candidates if os.path.exists(path)), candidates[0])
+    
+    cursor = request.args.get('cursor')
+    lines = request.args.get('lines', 100, type=int)
+    
+    def read(cursor):
+        if not os.path.exists(log_file):
+            return None
+        result = read_log(log_file, cursor, lines)
+        result['file'] = os.path.relpath(log_file, server.get('directory')) if log_name != 'errors' else 'errors'
+        return result
+    
+    if request.args.get('follow'):
+        def generate():
+            current = cursor
+            idle = 0.0
+            yield ": connected\n\n"
+            while True:
+                result = read(current)
+                if result and (result['output'] or result['cursor'] != current):
+                    idle = 0.0
+                    current = result['cursor']
+                    yield f"data: {json.dumps(result)}\n\n"
+                else:
+                    idle += LOG_FOLLOW_INTERVAL
+                    if idle >= SSE_HEARTBEAT_INTERVAL:
+                        idle = 0.0
+                        yield ": keepalive\n\n"
+                time.sleep(LOG_FOLLOW_INTERVAL)
+        
+        return Response(generate(), mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        })
+    
+    try:
+        result = read(cursor)
+        deadline = time.time() + min(request.args.get('wait', 0, type=float), 60)
+        while cursor and (result is None or not result['output']) and time.time() < deadline:
+            time.sleep(LOG_FOLLOW_INTERVAL)
+            result = read(cursor)
+        if result is None:
+            return jsonify({'success': False, 'error': 'Log-Datei nicht gefunden'}), 404
+        return jsonify({'success': True, **result})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/gameserver/<name>/<action>', methods=['POST'])
 def control_gameserver(name, action):
     """Legacy endpoint - redirects to specific endpoints"""
@@ -1464,7 +4496,7 @@ def control_gameserver(name, action):
 @app.route('/api/webspace/list', methods=['GET'])
 def list_webspaces():
     """List all webspaces"""
-    webspaces = load_json_file(WEBSPACE_FILE)
+    webspaces = store.list_webspaces()
     return jsonify({
         'success': True,
         'webspaces': webspaces
@@ -1515,13 +4547,11 @@ def create_webspace():
         run_command('sudo systemctl reload apache2')
         
         # Save to database
-        webspaces = load_json_file(WEBSPACE_FILE)
-        webspaces.append({
+        store.add_webspace({
             'domain': domain,
             'path': path,
             'created': datetime.now().isoformat()
         })
-        save_json_file(WEBSPACE_FILE, webspaces)
         
         return jsonify({
             'success': True,
@@ -1552,9 +4582,7 @@ def delete_webspace():
         run_command('sudo systemctl reload apache2')
         
         # Remove from database
-        webspaces = load_json_file(WEBSPACE_FILE)
-        webspaces = [w for w in webspaces if w['domain'] != domain]
-        save_json_file(WEBSPACE_FILE, webspaces)
+        store.delete_webspaces(domain)
         
         return jsonify({
             'success': True,
@@ -1654,6 +4682,427 @@ def wake_system():
             'error': str(e)
         })
 
+# SSH Terminal Sessions
+# Seconds /api/ssh/execute waits for a command before returning partial output
+SSH_EXECUTE_TIMEOUT = 30
+SSH_EXECUTE_MAX_TIMEOUT = 300
+# Maximum bytes of unread shell output kept per session
+SSH_BUFFER_LIMIT = 1024 * 1024
+# Output chunks queued for a streaming client before the reader stops draining the channel
+SSH_STREAM_QUEUE_SIZE = 64
+ANSI_ESCAPE_PATTERN = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
+# Matched against the unfinished last line only ("[sudo] password for user: ", "Passwort: ")
+PASSWORD_PROMPT_PATTERN = re.compile(rb'(?:password|passwort)[^\n:]*:\s*\Z', re.IGNORECASE)
+
+class SSHSession:
+    """Interactive shell channel whose output is drained by a reader thread"""
+
+    def __init__(self, client, channel, host, port, username):
+        self.client = client
+        self.channel = channel
+        self.host = host
+        self.port = port
+        self.username = username
+        self.current_dir = '~'
+        self.buffer = bytearray()
+        self.closed = False
+        self.condition = threading.Condition()
+        self.exec_lock = threading.Lock()  # One command at a time per shell
+        self.pending_marker = None  # Marker of a command that has not finished yet
+        self.stream = None  # Output queue of an attached streaming client
+        self.created = time.time()
+        self.last_used = self.created
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self._start_reader()
+
+    @staticmethod
+    def open_shell(client):
+        """Open a shell channel set up for execute(): no colors, prompts, echo or history expansion"""
+        channel = client.invoke_shell(term='dumb', width=120, height=40)
+        channel.settimeout(2)
+        # Disabling history expansion fixes ! in passwords
+        channel.send('export TERM=dumb PS1="" PS2=""; unset PROMPT_COMMAND; set +H; stty -echo\n')
+        return channel
+
+    def _start_reader(self):
+        self.reader = threading.Thread(target=self._read_loop, args=(self.channel,),
+                                       name=f'ssh-reader-{self.username}@{self.host}')
+        self.reader.daemon = True
+        self.reader.start()
+
+    def _read_loop(self, channel):
+        while True:
+            try:
+                data = channel.recv(65536)
+            except socket.timeout:
+                continue
+            except Exception:
+                data = b''
+            # Decide under the lock whether output goes to the stream or the buffer,
+            # attach_stream() moves the buffer to the stream under the same lock
+            with self.condition:
+                if channel is not self.channel:
+                    # Replaced by a fresh shell when the stream detached
+                    return
+                self.bytes_received += len(data)
+                stream = self.stream
+                if stream is None:
+                    if not data:
+                        self.closed = True
+                        self.condition.notify_all()
+                        return
+                    self.buffer += data
+                    if len(self.buffer) > SSH_BUFFER_LIMIT:
+                        del self.buffer[:len(self.buffer) - SSH_BUFFER_LIMIT]
+                    self.condition.notify_all()
+                    continue
+            self._forward(stream, data)
+            if not data:
+                with self.condition:
+                    self.closed = True
+                    self.condition.notify_all()
+                return
+
+    def _forward(self, stream, data):
+        """Hand output to the streaming client, blocking while its queue is full"""
+        # Blocking here stops reading the channel, so the SSH window closes
+        # and the remote side is throttled to the speed of the client
+        while True:
+            try:
+                stream.put(data or None, timeout=1)
+                return
+            except queue.Full:
+                if self.stream is not stream:
+                    return
+
+    def attach_stream(self, term='xterm-256color', cols=80, rows=24):
+        """Switch the shell to interactive mode and route all output to a queue"""
+        with self.exec_lock:
+            if self.stream is not None:
+                return None
+            stream = queue.Queue(maxsize=SSH_STREAM_QUEUE_SIZE)
+            with self.condition:
+                # Hand over output that was not picked up by execute()
+                if self.buffer:
+                    stream.put(bytes(self.buffer))
+                    self.buffer.clear()
+                self.stream = stream
+            self.pending_marker = None
+            self.channel.resize_pty(width=cols, height=rows)
+            self.send(f"stty sane; export TERM={shlex.quote(term)} PS1='\\u@\\h:\\w\\$ ' PS2='> '\n")
+            return stream
+
+    def detach_stream(self, stream):
+        """Give execute() a fresh shell once the streaming client is gone
+
+        A full-screen program may still be running in the interactive shell,
+        so instead of typing setup commands into it the shell is replaced
+        (the old one is closed, which hangs up whatever still runs there).
+        """
+        with self.exec_lock:
+            if self.stream is not stream:
+                return
+            old_channel = self.channel
+            channel = None
+            if not self.closed:
+                try:
+                    channel = self.open_shell(self.client)
+                except Exception as e:
+                    print(f"[SSH] Neue Shell für {self.username}@{self.host} fehlgeschlagen: {e}")
+            with self.condition:
+                self.stream = None
+                self.pending_marker = None
+                self.buffer.clear()
+                if channel is None:
+                    self.closed = True
+                    self.condition.notify_all()
+                else:
+                    self.channel = channel
+            old_channel.close()
+            if channel is None:
+                return
+            self._start_reader()
+            if self.current_dir not in ('', '~'):
+                self.send(f"cd {shlex.quote(self.current_dir)}\n")
+
+    def _wait(self, marker_pattern, timeout, password=None):
+        """Wait until the marker appears, the shell closes, input is requested or timeout expires
+
+        Returns (output, (exit status, cwd) or None, waiting_for_input). The output is
+        taken from the buffer under the same lock the marker was searched with,
+        so a marker arriving in between can never be discarded with it.
+        """
+        deadline = time.time() + timeout
+        password_sent = False
+        with self.condition:
+            while True:
+                match = marker_pattern.search(self.buffer)
+                if match or self.closed:
+                    return self._take_output(match) + (False,)
+                # A prompt is the last line, not yet terminated and with no output after it;
+                # "password:" somewhere in the command's output does not count
+                line_start = self.buffer.rfind(b'\n') + 1
+                if not password_sent and PASSWORD_PROMPT_PATTERN.search(self.buffer, line_start):
+                    if password:
+                        self.send(password + '\n')
+                        password_sent = True
+                        # Do not match the same prompt again
+                        del self.buffer[line_start:]
+                    else:
+                        # Let the client answer the prompt with its next request
+                        return self._take_output(None) + (True,)
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return self._take_output(None) + (False,)
+                self.condition.wait(remaining)
+
+    def _take_output(self, match):
+        """Remove the output before the marker (or all of it) from the buffer, lock held
+
+        Returns (output, (exit status, cwd) or None).
+        """
+        if not match:
+            # Keep a marker that has only partly arrived for the next request
+            partial = self.buffer.rfind(b'__HSCP_')
+            end = partial if partial >= 0 and b'\n' not in self.buffer[partial:] else len(self.buffer)
+            output = bytes(self.buffer[:end])
+            del self.buffer[:end]
+            return output, None
+        # Read the groups before trimming, the match references the live buffer
+        marker = (int(match.group(1)), match.group(2).decode('utf-8', errors='ignore').strip())
+        output = bytes(self.buffer[:match.start()])
+        del self.buffer[:match.end()]
+        return output, marker
+
+    def _clean(self, data):
+        output = data.decode('utf-8', errors='ignore')
+        output = ANSI_ESCAPE_PATTERN.sub('', output)
+        return output.replace('\r', '').replace('\x07', '')
+
+    def execute(self, command, timeout=SSH_EXECUTE_TIMEOUT, password=None):
+        """Run a command in the shell and return as soon as its end marker arrives"""
+        with self.exec_lock:
+            if self.stream is not None:
+                raise RuntimeError('Terminal wird gerade interaktiv genutzt')
+            if self.pending_marker:
+                # Previous command is still running, pass the line to it as input
+                token = self.pending_marker
+                self.send(command + '\n')
+            else:
+                token = secrets.token_hex(8)
+                with self.condition:
+                    self.buffer.clear()
+                # The braces keep comments and trailing '&' in the command valid.
+                # The marker is split with quotes so the command line itself never matches it.
+                self.send(
+                    f'{{ {command}\n}}; printf \'\\n%s %d %s\\n\' "__HSCP_"\'{token}__\' "$?" "$PWD"\n'
+                )
+            marker_pattern = re.compile(rb'\n?__HSCP_' + token.encode() + rb'__ (\d+) ([^\n]*)\n')
+
+            output, marker, waiting_for_input = self._wait(marker_pattern, timeout, password)
+            if marker:
+                exit_status, current_dir = marker
+                self.pending_marker = None
+                self.current_dir = current_dir or self.current_dir
+            else:
+                self.pending_marker = token
+                exit_status = None
+
+            return {
+                'output': self._clean(output).strip('\n'),
+                'exit_status': exit_status,
+                'complete': marker is not None,
+                'waiting_for_input': waiting_for_input,
+                'closed': self.closed
+            }
+
+    def prompt(self):
+        return f'{self.username}@{self.host}:{self.current_dir}$'
+
+    def send(self, data):
+        """Write raw input to the shell"""
+        if isinstance(data, str):
+            data = data.encode()
+        self.channel.sendall(data)
+        self.bytes_sent += len(data)
+        self.touch()
+
+    def touch(self):
+        self.last_used = time.time()
+
+    def buffered_bytes(self):
+        """Bytes of shell output held in memory (execute buffer plus stream queue)"""
+        total = len(self.buffer)
+        stream = self.stream
+        if stream is not None:
+            with stream.mutex:
+                total += sum(len(chunk) for chunk in stream.queue if chunk)
+        return total
+
+    def stats(self):
+        now = time.time()
+        return {
+            'host': self.host,
+            'port': self.port,
+            'username': self.username,
+            'current_dir': self.current_dir,
+            'active': self.is_active(),
+            'streaming': self.stream is not None,
+            'age': round(now - self.created, 1),
+            'idle': round(now - self.last_used, 1),
+            'bytes_received': self.bytes_received,
+            'bytes_sent': self.bytes_sent,
+            'buffered_bytes': self.buffered_bytes()
+        }
+
+    def is_active(self):
+        transport = self.client.get_transport()
+        return not self.closed and transport is not None and transport.is_active()
+
+    def close(self):
+        self.client.close()
+
+# SSH Session Manager
+# Sessions unused for this many seconds are closed by the janitor
+SSH_SESSION_IDLE_TIMEOUT = 30 * 60
+SSH_MAX_SESSIONS = 20
+SSH_MAX_SESSIONS_PER_USER = 5
+SSH_JANITOR_INTERVAL = 60
+# IDs of evicted sessions remembered to tell their clients why the session is gone
+SSH_EVICTED_HISTORY = 100
+
+class SSHSessionLimitError(Exception):
+    """A user already has SSH_MAX_SESSIONS_PER_USER open terminals"""
+
+class SSHSessionManager:
+    """Owns all terminal sessions: random IDs, LRU eviction, limits and a janitor thread
+
+    Over the per-user limit a new session is refused. Over the global limit the
+    least recently used session is closed, and its client is told so on its
+    next request (see eviction()).
+    """
+
+    def __init__(self, max_sessions=SSH_MAX_SESSIONS, max_per_user=SSH_MAX_SESSIONS_PER_USER,
+                 idle_timeout=SSH_SESSION_IDLE_TIMEOUT):
+        self.max_sessions = max_sessions
+        self.max_per_user = max_per_user
+        self.idle_timeout = idle_timeout
+        self.sessions = OrderedDict()  # session ID -> SSHSession, least recently used first
+        self.evicted = 0
+        self.evicted_ids = OrderedDict()  # session ID -> reason, newest last
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def ensure_started(self):
+        with self.lock:
+            if self.thread and self.thread.is_alive():
+                return
+            self.thread = threading.Thread(target=self._run, name='ssh-janitor')
+            self.thread.daemon = True
+            self.thread.start()
+
+    def add(self, ssh_session):
+        """Register a session and return its ID, evicting the LRU sessions over the global limit
+
+        Raises SSHSessionLimitError if the user already has max_per_user sessions.
+        """
+        self.ensure_started()
+        session_id = secrets.token_urlsafe(24)
+        user = self._owner(ssh_session)
+        evicted = []
+        with self.lock:
+            if sum(1 for s in self.sessions.values() if self._owner(s) == user) >= self.max_per_user:
+                raise SSHSessionLimitError(f'Maximal {self.max_per_user} Terminals pro Benutzer')
+            while len(self.sessions) >= self.max_sessions:
+                old_id, old = self.sessions.popitem(last=False)
+                self._remember_eviction(old_id, 'Session wurde geschlossen, weil das Sitzungslimit erreicht war')
+                evicted.append(old)
+            self.sessions[session_id] = ssh_session
+            self.evicted += len(evicted)
+        for old in evicted:
+            print(f"[SSH] Session {old.username}@{old.host} verdrängt (Limit erreicht)")
+            old.close()
+        return session_id
+
+    @staticmethod
+    def _owner(ssh_session):
+        return (ssh_session.username, ssh_session.host, ssh_session.port)
+
+    def _remember_eviction(self, session_id, reason):
+        """Lock must be held"""
+        self.evicted_ids[session_id] = reason
+        while len(self.evicted_ids) > SSH_EVICTED_HISTORY:
+            self.evicted_ids.popitem(last=False)
+
+    def eviction(self, session_id):
+        """Why a session the client still knows was closed by the manager (None if it was not)"""
+        with self.lock:
+            return self.evicted_ids.get(session_id) if session_id else None
+
+    def get(self, session_id):
+        """Return the session and mark it as recently used (None if unknown)"""
+        with self.lock:
+            ssh_session = self.sessions.get(session_id) if session_id else None
+            if ssh_session:
+                self.sessions.move_to_end(session_id)
+        if ssh_session:
+            ssh_session.touch()
+        return ssh_session
+
+    def remove(self, session_id):
+        with self.lock:
+            ssh_session = self.sessions.pop(session_id, None)
+        if ssh_session:
+            ssh_session.close()
+        return ssh_session is not None
+
+    def cleanup(self):
+        """Close dead sessions and sessions idle for longer than idle_timeout"""
+        now = time.time()
+        with self.lock:
+            expired = [sid for sid, s in self.sessions.items()
+                       if not s.is_active() or (s.stream is None and now - s.last_used > self.idle_timeout)]
+            removed = [self.sessions.pop(sid) for sid in expired]
+        for ssh_session in removed:
+            print(f"[SSH] Session {ssh_session.username}@{ssh_session.host} geschlossen (inaktiv)")
+            ssh_session.close()
+        return len(removed)
+
+    def stats(self, owner=None):
+        """Limits and totals; the session list only contains sessions of owner (a session)"""
+        with self.lock:
+            sessions = list(self.sessions.items())
+        session_stats = []
+        buffered_bytes = 0
+        for session_id, ssh_session in sessions:
+            buffered_bytes += ssh_session.buffered_bytes()
+            if owner is None or self._owner(ssh_session) != self._owner(owner):
+                continue
+            entry = ssh_session.stats()
+            # Only a prefix, the full ID is the access token of the session
+            entry['id'] = session_id[:6]
+            session_stats.append(entry)
+        return {
+            'count': len(sessions),
+            'max_sessions': self.max_sessions,
+            'max_per_user': self.max_per_user,
+            'idle_timeout': self.idle_timeout,
+            'evicted': self.evicted,
+            'buffered_bytes': buffered_bytes,
+            'sessions': session_stats
+        }
+
+    def _run(self):
+        while True:
+            time.sleep(SSH_JANITOR_INTERVAL)
+            try:
+                self.cleanup()
+            except Exception as e:
+                print(f"[SSH ERROR] Janitor: {e}")
+
+ssh_sessions = SSHSessionManager()
+
 # SSH Terminal API
 @app.route('/api/ssh/connect', methods=['POST'])
 def ssh_connect():
@@ -1684,54 +5133,30 @@ def ssh_connect():
             timeout=10
         )
         
-        # Open an interactive shell channel (no ANSI colors)
-        channel = ssh.invoke_shell(term='dumb', width=120, height=40)
-        channel.settimeout(2)
-        
-        # Disable colors, special formatting, and history expansion
-        channel.send('export TERM=dumb\n')
-        channel.send('export PS1=""\n')  # Disable prompt in output
-        channel.send('unset PROMPT_COMMAND\n')
-        channel.send('set +H\n')  # Disable history expansion (fixes ! in passwords)
-        time.sleep(0.5)
-        
-        # Clear initial output
-        if channel.recv_ready():
-            channel.recv(65536)
-        
-        # Get initial working directory
-        channel.send('pwd\n')
-        time.sleep(0.3)
-        output = ''
-        if channel.recv_ready():
-            output = channel.recv(4096).decode('utf-8', errors='ignore')
-        
-        # Extract directory from output
-        lines = output.strip().split('\n')
-        current_dir = '~'
-        for line in lines:
-            if line.startswith('/'):
-                current_dir = line.strip()
-                break
+        # Open an interactive shell channel (no ANSI colors, prompts or echo)
+        channel = SSHSession.open_shell(ssh)
         
-        # Generate session ID
-        session_id = f"{username}@{host}:{port}"
+        ssh_session = SSHSession(ssh, channel, host, port, username)
+        # Wait for the setup to finish; this also reports the initial working directory
+        result = ssh_session.execute('true', timeout=10)
+        if not result['complete']:
+            ssh_session.close()
+            return jsonify({
+                'success': False,
+                'error': 'Shell antwortet nicht'
+            }), 500
         
-        # Store SSH connection with channel
-        ssh_connections[session_id] = {
-            'client': ssh,
-            'channel': channel,
-            'host': host,
-            'port': port,
-            'username': username,
-            'current_dir': current_dir
-        }
+        try:
+            session_id = ssh_sessions.add(ssh_session)
+        except SSHSessionLimitError as e:
+            ssh_session.close()
+            return jsonify({'success': False, 'error': str(e)}), 429
         
         return jsonify({
             'success': True,
             'message': 'SSH Verbindung erfolgreich',
             'session_id': session_id,
-            'prompt': f'{username}@{host}:{current_dir}$'
+            'prompt': ssh_session.prompt()
         })
     except paramiko.AuthenticationException:
         return jsonify({
@@ -1749,25 +5174,100 @@ def ssh_connect():
             'error': f'Verbindungsfehler: {str(e)}'
         }), 500
 
+@sock.route('/api/ssh/stream')
+def ssh_stream(ws):
+    """Interactive terminal over WebSocket, piping raw bytes to the shell channel
+    
+    Binary frames carry terminal input/output. Text frames are JSON control
+    messages: {"type": "resize", "cols": 120, "rows": 40} or
+    {"type": "input", "data": "ls\\n"}.
+    """
+    session_id = request.args.get('session_id')
+    ssh_session = ssh_sessions.get(session_id)
+    if not ssh_session or not ssh_session.is_active():
+        ws.send(json.dumps({'type': 'error', 'error': ssh_sessions.eviction(session_id) or 'Keine aktive SSH Verbindung'}))
+        return
+    
+    stream = ssh_session.attach_stream(
+        term=request.args.get('term', 'xterm-256color'),
+        cols=request.args.get('cols', 80, type=int),
+        rows=request.args.get('rows', 24, type=int)
+    )
+    if stream is None:
+        ws.send(json.dumps({'type': 'error', 'error': 'Terminal ist bereits verbunden'}))
+        return
+    
+    def send_output():
+        try:
+            while True:
+                chunk = stream.get()
+                if chunk is None:
+                    break
+                # Coalesce whatever else is already queued into one frame
+                parts = [chunk]
+                while True:
+                    try:
+                        more = stream.get_nowait()
+                    except queue.Empty:
+                        break
+                    if more is None:
+                        stream.put(None)
+                        break
+                    parts.append(more)
+                ws.send(b''.join(parts))
+            ws.send(json.dumps({'type': 'closed'}))
+            ws.close()
+        except Exception:
+            pass
+    
+    sender = threading.Thread(target=send_output, name=f'ssh-stream-{session_id}')
+    sender.daemon = True
+    sender.start()
+    
+    try:
+        while sender.is_alive():
+            message = ws.receive(timeout=1)
+            if message is None:
+                continue
+            if isinstance(message, bytes):
+                ssh_session.send(message)
+                continue
+            try:
+                control = json.loads(message)
+            except ValueError:
+                continue
+            if control.get('type') == 'resize':
+                ssh_session.channel.resize_pty(width=int(control.get('cols', 80)), height=int(control.get('rows', 24)))
+            elif control.get('type') == 'input':
+                ssh_session.send(control.get('data', ''))
+    except Exception:
+        # Client went away
+        pass
+    finally:
+        ssh_session.detach_stream(stream)
+        # Wake up the sender if it is still waiting for output
+        try:
+            stream.put_nowait(None)
+        except queue.Full:
+            pass
+
 @app.route('/api/ssh/disconnect', methods=['POST'])
 def ssh_disconnect():
     """Disconnect SSH session"""
     data = request.get_json()
     session_id = data.get('session_id')
     
-    if session_id and session_id in ssh_connections:
-        try:
-            ssh_connections[session_id]['client'].close()
-            del ssh_connections[session_id]
+    try:
+        if ssh_sessions.remove(session_id):
             return jsonify({
                 'success': True,
                 'message': 'SSH Verbindung getrennt'
             })
-        except Exception as e:
-            return jsonify({
-                'success': False,
-                'error': str(e)
-            })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
     
     return jsonify({
         'success': False,
@@ -1780,6 +5280,7 @@ def ssh_execute_command():
     data = request.get_json()
     session_id = data.get('session_id')
     command = data.get('command')
+    timeout = min(float(data.get('timeout', SSH_EXECUTE_TIMEOUT)), SSH_EXECUTE_MAX_TIMEOUT)
     
     if not command:
         return jsonify({
@@ -1787,122 +5288,43 @@ def ssh_execute_command():
             'error': 'Kein Befehl angegeben'
         }), 400
     
-    if not session_id or session_id not in ssh_connections:
+    ssh_session = ssh_sessions.get(session_id)
+    if not ssh_session:
         return jsonify({
             'success': False,
-            'error': 'Keine aktive SSH Verbindung'
+            'error': ssh_sessions.eviction(session_id) or 'Keine aktive SSH Verbindung',
+            'evicted': ssh_sessions.eviction(session_id) is not None
         }), 401
     
-    try:
-        conn = ssh_connections[session_id]
-        channel = conn['channel']
-        
-        # Clear any pending output
-        if channel.recv_ready():
-            channel.recv(65536)
-        
-        # Send command
-        channel.send(command + '\n')
-        time.sleep(0.5)
-        
-        # Collect output and watch for password prompt
-        output = ''
-        max_wait = 15
-        start_time = time.time()
-        password_sent = False
-        
-        # Get user's stored password if available
-        stored_password = None
-        if linux_credentials and linux_credentials.get('password'):
-            try:
-                stored_password = cipher_suite.decrypt(linux_credentials['password'].encode()).decode()
-            except:
-                pass
-        
-        while time.time() - start_time < max_wait:
-            if channel.recv_ready():
-                chunk = channel.recv(4096).decode('utf-8', errors='ignore')
-                output += chunk
-                
-                # Check if sudo is asking for password
-                if not password_sent and stored_password:
-                    lower_chunk = chunk.lower()
-                    if 'password:' in lower_chunk or '[sudo]' in lower_chunk or 'password for' in lower_chunk:
-                        # Password prompt detected! Send password immediately
-                        time.sleep(0.2)  # Brief wait for prompt to fully display
-                        channel.send(stored_password + '\n')
-                        password_sent = True
-                        time.sleep(1.0)  # Wait for command execution
-                        continue
-                
-                time.sleep(0.1)
-            else:
-                # Check if there might be more data
-                time.sleep(0.3)
-                if channel.recv_ready():
-                    continue
-                else:
-                    break
-        
-        # Remove ANSI escape codes and control characters
-        # Remove ANSI escape sequences
-        ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-        output = ansi_escape.sub('', output)
-        # Remove carriage returns
-        output = output.replace('\r', '')
-        # Remove bell character
-        output = output.replace('\x07', '')
-        
-        # Get current directory
-        channel.send('pwd\n')
-        time.sleep(0.2)
-        pwd_output = ''
-        if channel.recv_ready():
-            pwd_output = channel.recv(4096).decode('utf-8', errors='ignore')
-        
-        # Extract current directory from pwd output
-        current_dir = conn.get('current_dir', '~')
-        for line in pwd_output.split('\n'):
-            line = line.strip()
-            if line.startswith('/'):
-                current_dir = line
-                conn['current_dir'] = current_dir
-                break
-        
-        # Clean output (remove command echo and prompt)
-        lines = output.split('\n')
-        cleaned_lines = []
-        skip_first = True
-        
-        for line in lines:
-            # Skip command echo (first line that contains the command)
-            if skip_first and command.strip() in line:
-                skip_first = False
-                continue
-            
-            # Skip empty lines and prompts
-            line_stripped = line.strip()
-            if not line_stripped:
-                continue
-            if line_stripped.endswith('$') and len(line_stripped) < 50:
-                continue
-                
-            cleaned_lines.append(line.rstrip())
+    try:
+        
+        # Get user's stored password if available
+        stored_password = None
+        if linux_credentials and linux_credentials.get('password'):
+            try:
+                stored_password = cipher_suite.decrypt(linux_credentials['password'].encode()).decode()
+            except:
+                pass
         
-        output = '\n'.join(cleaned_lines).strip()
+        result = ssh_session.execute(command, timeout=timeout, password=stored_password)
         
-        # Create dynamic prompt
-        username = conn['username']
-        host = conn['host']
-        prompt = f'{username}@{host}:{current_dir}$'
+        if result['closed']:
+            ssh_sessions.remove(session_id)
+            return jsonify({
+                'success': False,
+                'output': result['output'],
+                'error': 'Keine aktive SSH Verbindung (Shell beendet)'
+            }), 401
         
         return jsonify({
             'success': True,
-            'output': output,
+            'output': result['output'],
             'error': '',
-            'exit_status': 0,
-            'prompt': prompt,
-            'current_dir': current_dir
+            'exit_status': result['exit_status'],
+            'complete': result['complete'],
+            'waiting_for_input': result['waiting_for_input'],
+            'prompt': ssh_session.prompt(),
+            'current_dir': ssh_session.current_dir
         })
     except Exception as e:
         return jsonify({
@@ -1910,29 +5332,41 @@ def ssh_execute_command():
             'error': f'Fehler bei Befehlsausführung: {str(e)}'
         }), 500
 
+@app.route('/api/ssh/pool', methods=['GET'])
+def ssh_pool_stats():
+    """Get statistics of the pooled SSH connections used for sudo commands"""
+    return jsonify({
+        'success': True,
+        'pool': ssh_pool.get_stats()
+    })
+
 @app.route('/api/ssh/status', methods=['GET'])
 def ssh_status():
-    """Check SSH connection status"""
+    """Check SSH connection status and list session statistics"""
     session_id = request.args.get('session_id')
     
-    if session_id and session_id in ssh_connections:
-        conn = ssh_connections[session_id]
+    ssh_session = ssh_sessions.get(session_id)
+    if ssh_session:
         try:
             # Test if connection is still alive
-            transport = conn['client'].get_transport()
-            if transport and transport.is_active():
+            if ssh_session.is_active():
                 return jsonify({
                     'success': True,
                     'connected': True,
-                    'host': conn['host'],
-                    'username': conn['username']
+                    'host': ssh_session.host,
+                    'username': ssh_session.username,
+                    'session': ssh_session.stats(),
+                    'manager': ssh_sessions.stats(owner=ssh_session)
                 })
         except:
             pass
     
+    # Without a valid session only the totals are shown, not other users' hosts and directories
     return jsonify({
         'success': True,
-        'connected': False
+        'connected': False,
+        'evicted': ssh_sessions.eviction(session_id),
+        'manager': ssh_sessions.stats()
     })
 
 # Terminal API (deprecated - use SSH API instead)
@@ -2109,51 +5543,1215 @@ def health_check():
         'timestamp': datetime.now().isoformat()
     })
 
+# Filemanager Listing
+FILEMANAGER_PAGE_SIZE = 500
+FILEMANAGER_MAX_PAGE_SIZE = 5000
+FILEMANAGER_SORT_KEYS = ('name', 'size', 'modified', 'type', 'none')
+
+class ListingError(Exception):
+    """Invalid listing parameters"""
+    pass
+
+@functools.total_ordering
+class _Descending:
+    """Wrap a value so it sorts in reverse order inside key tuples"""
+    __slots__ = ('value',)
+    
+    def __init__(self, value):
+        self.value = value
+    
+    def __eq__(self, other):
+        return self.value == other.value
+    
+    def __lt__(self, other):
+        return other.value < self.value
+
+def _entry_stat(entry):
+    """Stat a DirEntry (cached by scandir), falls back to the link itself for broken symlinks"""
+    try:
+        return entry.stat()
+    except OSError:
+        return entry.stat(follow_symlinks=False)
+
+def _entry_is_dir(entry):
+    try:
+        return entry.is_dir()
+    except OSError:
+        return False
+
+def _entry_sort_value(entry, is_dir, sort):
+    """Primary sort value of an entry, only stats when the sort key needs it"""
+    if sort == 'size':
+        return 0 if is_dir else _entry_stat(entry).st_size
+    if sort == 'modified':
+        return _entry_stat(entry).st_mtime
+    if sort == 'type':
+        return '' if is_dir else os.path.splitext(entry.name)[1].lower()
+    return entry.name.lower()
+
+def _listing_key(group, value, name, descending):
+    """Directories first, then by value with the name as tiebreaker"""
+    rest = (value, name.lower(), name)
+    return (group, _Descending(rest) if descending else rest)
+
+def encode_listing_cursor(data):
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+def decode_listing_cursor(cursor, sort):
+    """Decode and validate a cursor for the given sort key
+
+    Sorted cursors must carry a value of the sort key's type, otherwise comparing
+    it with the entries' keys would fail halfway through the listing.
+    """
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, AttributeError):
+        raise ListingError('Invalid cursor')
+    if not isinstance(position, dict):
+        raise ListingError('Invalid cursor')
+    if sort == 'none':
+        offset = position.get('offset', 0)
+        if isinstance(offset, bool) or not isinstance(offset, int) or offset < 0:
+            raise ListingError('Invalid cursor')
+        return position
+    value_type = (int, float) if sort in ('size', 'modified') else str
+    value = position.get('value')
+    if (position.get('group') not in (0, 1) or not isinstance(position.get('name'), str)
+            or isinstance(value, bool) or not isinstance(value, value_type)):
+        raise ListingError('Invalid cursor')
+    return position
+
+def _name_matcher(pattern, show_hidden):
+    """Build a name predicate: glob pattern if it contains wildcards, otherwise substring"""
+    pattern = (pattern or '').lower()
+    is_glob = any(char in pattern for char in '*?[')
+    
+    def matches(name):
+        if not show_hidden and name.startswith('.'):
+            return False
+        if not pattern:
+            return True
+        lowered = name.lower()
+        return fnmatch.fnmatchcase(lowered, pattern) if is_glob else pattern in lowered
+    
+    return matches
+
+def describe_entry(entry, is_dir=None):
+    """Build the file manager item for a DirEntry"""
+    if is_dir is None:
+        is_dir = _entry_is_dir(entry)
+    st = _entry_stat(entry)
+    return {
+        'name': entry.name,
+        'path': entry.path,
+        'is_directory': is_dir,
+        'size': st.st_size if not is_dir else 0,
+        'modified': datetime.fromtimestamp(st.st_mtime).isoformat(),
+        'permissions': oct(st.st_mode)[-3:],
+    }
+
+def scan_directory(abs_path):
+    """Yield (entry, is_dir) for a directory using scandir's cached d_type"""
+    with os.scandir(abs_path) as entries:
+        for entry in entries:
+            yield entry, _entry_is_dir(entry)
+
+def iter_directory(abs_path, sort='name', order='asc', pattern=None, kind=None,
+                   show_hidden=True, cursor=None, limit=FILEMANAGER_PAGE_SIZE, entries=None):
+    """Yield listing items for one page, then a final {'next_cursor', 'total'} dict
+
+    entries defaults to the cached listing from directory_cache.
+    sort='none' returns entries in directory order and stops after the page
+    (cursor is an offset). Sorted listings use keyset cursors,
+    so a page is stable even if entries are added or removed in between; only
+    the selected page is built, using a bounded heap instead of a full sort.
+    Inaccessible entries are skipped.
+    """
+    if sort not in FILEMANAGER_SORT_KEYS:
+        raise ListingError(f'Invalid sort key: {sort}')
+    if kind not in (None, 'files', 'directories'):
+        raise ListingError(f'Invalid type filter: {kind}')
+    limit = max(1, min(int(limit or FILEMANAGER_PAGE_SIZE), FILEMANAGER_MAX_PAGE_SIZE))
+    if entries is None:
+        entries, _ = directory_cache.get(abs_path)
+    descending = order == 'desc'
+    matches = _name_matcher(pattern, show_hidden)
+    position = decode_listing_cursor(cursor, sort) if cursor else None
+    
+    def selected(entry, is_dir):
+        if kind == 'files' and is_dir or kind == 'directories' and not is_dir:
+            return False
+        return matches(entry.name)
+    
+    if sort == 'none':
+        skip = position.get('offset', 0) if position else 0
+        seen = 0
+        emitted = 0
+        for entry, is_dir in entries:
+            if not selected(entry, is_dir):
+                continue
+            seen += 1
+            if seen <= skip:
+                continue
+            if emitted == limit:
+                yield {'next_cursor': encode_listing_cursor({'offset': skip + emitted}), 'total': None}
+                return
+            try:
+                item = describe_entry(entry, is_dir)
+            except OSError:
+                continue
+            emitted += 1
+            yield item
+        yield {'next_cursor': None, 'total': seen}
+        return
+    
+    after = None
+    if position:
+        after = _listing_key(position['group'], position['value'], position['name'], descending)
+    
+    total = 0
+    
+    def candidates():
+        nonlocal total
+        for entry, is_dir in entries:
+            if not selected(entry, is_dir):
+                continue
+            try:
+                value = _entry_sort_value(entry, is_dir, sort)
+            except OSError:
+                continue
+            total += 1
+            group = 0 if is_dir else 1
+            key = _listing_key(group, value, entry.name, descending)
+            if after is not None and not key > after:
+                continue
+            yield key, group, value, entry, is_dir
+    
+    # Fed from a generator, nsmallest keeps only a heap of limit + 1 candidates
+    page = heapq.nsmallest(limit + 1, candidates(), key=lambda candidate: candidate[0])
+    has_more = len(page) > limit
+    last = None
+    for key, group, value, entry, is_dir in page[:limit]:
+        last = (group, value, entry.name)
+        try:
+            item = describe_entry(entry, is_dir)
+        except OSError:
+            continue
+        yield item
+    
+    next_cursor = None
+    if has_more and last:
+        next_cursor = encode_listing_cursor({'group': last[0], 'value': last[1], 'name': last[2]})
+    yield {'next_cursor': next_cursor, 'total': total}
+
+# Directory Cache
+DIRECTORY_CACHE_MAX_DIRS = 128
+# Upper bound for the number of cached entries over all directories
+DIRECTORY_CACHE_MAX_ENTRIES = 250000
+# Without inotify a cached listing is trusted this long if the directory mtime is unchanged
+DIRECTORY_CACHE_POLL_INTERVAL = 2
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+INOTIFY_EVENT = struct.Struct('iIII')
+DIRECTORY_WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+                        IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+# Events that change the directory itself (and therefore its entry in the parent listing)
+DIRECTORY_CHANGE_MASK = IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+
+class InotifyWatcher:
+    """Minimal inotify binding (ctypes) calling back with the watched path on changes"""
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.paths = {}  # watch descriptor -> path
+        self.lock = threading.Lock()
+        libc_name = ctypes.util.find_library('c')
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.thread = threading.Thread(target=self._run, name='directory-watcher')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def add(self, path):
+        """Watch a directory, returns the watch descriptor or None (e.g. watch limit reached)"""
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), DIRECTORY_WATCH_MASK)
+        if wd < 0:
+            return None
+        with self.lock:
+            self.paths[wd] = path
+        return wd
+
+    def remove(self, wd):
+        with self.lock:
+            if self.paths.pop(wd, None) is None:
+                return
+        self.libc.inotify_rm_watch(self.fd, wd)
+
+    def _run(self):
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except OSError as e:
+                print(f"[FILEMANAGER] inotify-Fehler: {e}")
+                return
+            offset = 0
+            while offset + INOTIFY_EVENT.size <= len(data):
+                wd, mask, cookie, length = INOTIFY_EVENT.unpack_from(data, offset)
+                offset += INOTIFY_EVENT.size + length
+                if mask & IN_Q_OVERFLOW:
+                    self.callback(None, mask)
+                    continue
+                with self.lock:
+                    path = self.paths.pop(wd, None) if mask & IN_IGNORED else self.paths.get(wd)
+                if path:
+                    self.callback(path, mask)
+
+class DirectoryCache:
+    """Bounded LRU cache of directory listings for the file manager
+
+    Each listing keeps the scandir entries, so their stat results are cached
+    as well. Cached directories are watched with inotify and dropped on any
+    change; without inotify (or when the watch limit is reached) a listing is
+    revalidated against the directory mtime and trusted for
+    DIRECTORY_CACHE_POLL_INTERVAL seconds. The list endpoint uses a listing's
+    version as ETag: watched listings get a fresh version on every scan, polled
+    ones a digest of the entries' names and stat data, so rescanning an
+    unchanged directory keeps its version.
+    """
+
+    def __init__(self, max_dirs=DIRECTORY_CACHE_MAX_DIRS, max_entries=DIRECTORY_CACHE_MAX_ENTRIES):
+        self.max_dirs = max_dirs
+        self.max_entries = max_entries
+        self.listings = OrderedDict()  # path -> listing dict, least recently used first
+        self.scanning = {}  # path -> number of scans in progress
+        self.changes = {}  # path -> change counter while scanning, detects changes during a scan
+        self.entry_count = 0
+        self.epoch = secrets.token_hex(4)
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.watcher = None
+        self.watcher_failed = False
+
+    def _ensure_watcher(self):
+        if self.watcher or self.watcher_failed:
+            return self.watcher
+        try:
+            self.watcher = InotifyWatcher(self._on_change)
+        except (OSError, AttributeError, TypeError) as e:
+            # No inotify on this platform, fall back to mtime checks
+            print(f"[FILEMANAGER] inotify nicht verfügbar, nutze mtime-Prüfung: {e}")
+            self.watcher_failed = True
+        return self.watcher
+
+    def get(self, abs_path):
+        """Return (entries, version) for a directory, scanning it on a miss
+
+        entries is a list of (DirEntry, is_dir) tuples in directory order.
+        """
+        st = os.stat(abs_path)
+        signature = (st.st_ino, st.st_mtime_ns)
+        with self.lock:
+            listing = self.listings.get(abs_path)
+            if listing and self._valid(listing, signature):
+                self.listings.move_to_end(abs_path)
+                self.hits += 1
+                return listing['entries'], listing['version']
+            if listing:
+                self._drop(abs_path)
+            self.misses += 1
+            watcher = self._ensure_watcher()
+            self.scanning[abs_path] = self.scanning.get(abs_path, 0) + 1
+            before = self.changes.get(abs_path, 0)
+
+        try:
+            # Watch before scanning so changes during the scan are noticed
+            wd = watcher.add(abs_path) if watcher else None
+            entries = list(scan_directory(abs_path))
+            content_version = self._content_version(entries) if wd is None else None
+        except BaseException:
+            with self.lock:
+                self._scan_done(abs_path)
+            raise
+
+        with self.lock:
+            changed = self.changes.get(abs_path, 0) != before
+            self._scan_done(abs_path)
+            self.generation += 1
+            version = content_version or f"{self.epoch}-{self.generation}"
+            if changed or abs_path in self.listings:
+                # Changed while scanning (or cached concurrently): serve but do not cache
+                if wd is not None and abs_path not in self.listings:
+                    watcher.remove(wd)
+                return entries, version
+            self.listings[abs_path] = {
+                'entries': entries,
+                'version': version,
+                'signature': signature,
+                'wd': wd,
+                'cached_at': time.time()
+            }
+            self.entry_count += len(entries)
+            self._evict()
+        return entries, version
+
+    @staticmethod
+    def _content_version(entries):
+        """Digest of what a listing shows; the stat results stay cached in the DirEntries"""
+        digest = hashlib.sha1()
+        for entry, is_dir in entries:
+            try:
+                st = _entry_stat(entry)
+            except OSError:
+                continue
+            digest.update(f"{entry.name}\0{is_dir:d}\0{st.st_size}\0{st.st_mtime_ns}\0{st.st_mode}\n".encode(
+                'utf-8', 'surrogateescape'))
+        return digest.hexdigest()
+
+    def _valid(self, listing, signature):
+        if listing['wd'] is not None:
+            return True
+        return (listing['signature'] == signature and
+                time.time() - listing['cached_at'] < DIRECTORY_CACHE_POLL_INTERVAL)
+
+    def _scan_done(self, path):
+        """Forget the change counter once no scan of path is in progress (lock must be held)"""
+        self.scanning[path] -= 1
+        if not self.scanning[path]:
+            del self.scanning[path]
+            self.changes.pop(path, None)
+
+    def _note_change(self, path):
+        """Count a change of a directory that is being scanned (lock must be held)"""
+        if path in self.scanning:
+            self.changes[path] = self.changes.get(path, 0) + 1
+
+    def _drop(self, path):
+        """Remove a listing (lock must be held)"""
+        listing = self.listings.pop(path, None)
+        if not listing:
+            return
+        self.entry_count -= len(listing['entries'])
+        if listing['wd'] is not None and self.watcher:
+            self.watcher.remove(listing['wd'])
+
+    def _evict(self):
+        while self.listings and (len(self.listings) > self.max_dirs or self.entry_count > self.max_entries):
+            self._drop(next(iter(self.listings)))
+
+    def _on_change(self, path, mask):
+        with self.lock:
+            if path is None:
+                # Event queue overflow, anything might have changed
+                for scanned in self.scanning:
+                    self._note_change(scanned)
+                for cached in list(self.listings):
+                    self._drop(cached)
+                return
+            self._note_change(path)
+            listing = self.listings.pop(path, None)
+            if listing:
+                self.entry_count -= len(listing['entries'])
+                if not mask & IN_IGNORED and self.watcher:
+                    self.watcher.remove(listing['wd'])
+            if mask & DIRECTORY_CHANGE_MASK:
+                # The directory's own mtime changed, refresh its entry in the parent
+                parent = os.path.dirname(path)
+                if parent != path:
+                    self._note_change(parent)
+                    self._drop(parent)
+
+    def invalidate(self, path):
+        """Drop a cached listing explicitly, along with its parent's
+
+        Called by the file manager after it changed a directory, so the next
+        listing is fresh even when the change is not (yet) seen by inotify or
+        within the mtime granularity of a polled listing.
+        """
+        self._on_change(os.path.abspath(path), DIRECTORY_CHANGE_MASK)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'directories': len(self.listings),
+                'entries': self.entry_count,
+                'hits': self.hits,
+                'misses': self.misses,
+                'watching': self.watcher is not None
+            }
+
+directory_cache = DirectoryCache()
+
+# Chunked Uploads
+UPLOAD_STATE_DIR = 'data/uploads'
+UPLOAD_PART_SIZE = 8 * 1024 * 1024
+UPLOAD_MAX_PART_SIZE = 64 * 1024 * 1024
+UPLOAD_MIN_PART_SIZE = 256 * 1024
+UPLOAD_EXPIRY = 24 * 3600
+UPLOAD_BLOCK_SIZE = 1024 * 1024
+
+class UploadError(Exception):
+    """Rejected upload request, carries the HTTP status"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+class UploadManager:
+    """Resumable chunked uploads written in place with pwrite
+
+    init creates <dir>/.<name>.upload-<id> at its final size and a state file
+    in UPLOAD_STATE_DIR. Parts are PUT at index * part_size, possibly in
+    parallel, and acknowledged in the state file together with the sha256 of
+    the received bytes once they are on disk (and, if a sha256 was sent along,
+    verified). complete checks that every part arrived, re-reads the file to
+    verify each part and compute the whole-file sha256 (compared with the
+    client's if given) and renames the file into place, so the data is written
+    exactly once.
+    """
+
+    def __init__(self, state_dir=UPLOAD_STATE_DIR):
+        self.state_dir = state_dir
+        self.uploads = {}  # upload ID -> state dict
+        self.lock = threading.Lock()
+
+    def init(self, directory, filename, size, part_size=None, sha256=None, resume_key=None, overwrite=False):
+        """Start an upload or resume a matching unfinished one"""
+        if not filename or '/' in filename or filename in ('.', '..'):
+            raise UploadError('Invalid filename')
+        directory = os.path.abspath(directory)
+        if not os.path.isdir(directory):
+            raise UploadError('Target directory does not exist', 404)
+        size = int(size)
+        if size < 0:
+            raise UploadError('Invalid size')
+        target = os.path.join(directory, filename)
+        if os.path.exists(target) and not overwrite:
+            raise UploadError('File already exists', 409)
+        part_size = max(UPLOAD_MIN_PART_SIZE, min(int(part_size or UPLOAD_PART_SIZE), UPLOAD_MAX_PART_SIZE))
+
+        self.prune()
+        with self.lock:
+            for upload in self._all():
+                if (upload['target'] == target and upload['size'] == size and
+                        resume_key and upload.get('resume_key') == resume_key and
+                        os.path.exists(upload['temp'])):
+                    print(f"[UPLOAD] Setze Upload fort: {target} ({len(upload['received'])}/{upload['parts']} Teile)")
+                    upload['updated'] = time.time()
+                    self._save(upload)
+                    return upload
+
+            upload_id = secrets.token_urlsafe(16)
+            upload = {
+                'id': upload_id,
+                'target': target,
+                'temp': os.path.join(directory, f".{filename}.upload-{upload_id[:8]}"),
+                'size': size,
+                'part_size': part_size,
+                'parts': max(1, -(-size // part_size)),
+                'received': [],
+                'part_sha256': {},  # part index (str, JSON keys) -> sha256 computed on receipt
+                'sha256': sha256,
+                'resume_key': resume_key,
+                'overwrite': bool(overwrite),
+                'created': time.time(),
+                'updated': time.time()
+            }
+            fd = os.open(upload['temp'], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                if size:
+                    Downloader._preallocate(fd, size)
+            finally:
+                os.close(fd)
+            self.uploads[upload_id] = upload
+            self._save(upload)
+        directory_cache.invalidate(directory)
+        return upload
+
+    def get(self, upload_id):
+        with self.lock:
+            return self._load(upload_id)
+
+    def write_part(self, upload_id, index, stream, length=None, sha256=None):
+        """Write part index from a file-like stream at its offset, returns the upload state"""
+        upload = self.get(upload_id)
+        if not upload:
+            raise UploadError('Upload not found', 404)
+        if not 0 <= index < upload['parts']:
+            raise UploadError('Invalid part index')
+        offset = index * upload['part_size']
+        expected = min(upload['part_size'], upload['size'] - offset)
+        if length is not None and length != expected:
+            raise UploadError(f'Part {index} must be {expected} bytes, got {length}')
+
+        digest = hashlib.sha256()
+        written = 0
+        fd = os.open(upload['temp'], os.O_WRONLY)
+        try:
+            while written < expected:
+                block = stream.read(min(UPLOAD_BLOCK_SIZE, expected - written))
+                if not block:
+                    break
+                view = memoryview(block)
+                while view:
+                    count = os.pwrite(fd, view, offset + written)
+                    view = view[count:]
+                    written += count
+                digest.update(block)
+            # The part is only acknowledged once its data survives a crash
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+        if written != expected:
+            raise UploadError(f'Part {index} incomplete: {written} of {expected} bytes')
+        if sha256 and digest.hexdigest() != sha256.lower():
+            raise UploadError(f'Part {index} sha256 mismatch', 422)
+
+        with self.lock:
+            upload = self._load(upload_id)
+            if not upload:
+                raise UploadError('Upload not found', 404)
+            if index not in upload['received']:
+                upload['received'].append(index)
+                upload['received'].sort()
+            upload.setdefault('part_sha256', {})[str(index)] = digest.hexdigest()
+            upload['updated'] = time.time()
+            self._save(upload)
+            return upload
+
+    def complete(self, upload_id, sha256=None):
+        """Verify the upload and move it into place, returns (target path, sha256)"""
+        with self.lock:
+            upload = self._load(upload_id)
+        if not upload:
+            raise UploadError('Upload not found', 404)
+        missing = [index for index in range(upload['parts']) if index not in upload['received']]
+        if missing:
+            raise UploadError(f"{len(missing)} parts missing (first: {missing[0]})", 409)
+
+        digest = hashlib.sha256()
+        part_sha256 = upload.get('part_sha256', {})
+        with open(upload['temp'], 'rb') as f:
+            for index in range(upload['parts']):
+                part_digest = hashlib.sha256()
+                remaining = min(upload['part_size'], upload['size'] - index * upload['part_size'])
+                while remaining > 0:
+                    block = f.read(min(UPLOAD_BLOCK_SIZE, remaining))
+                    if not block:
+                        break
+                    remaining -= len(block)
+                    digest.update(block)
+                    part_digest.update(block)
+                recorded = part_sha256.get(str(index))
+                if remaining > 0 or recorded and part_digest.hexdigest() != recorded:
+                    # Not what was received, e.g. torn by a crash or modified on disk
+                    with self.lock:
+                        if index in upload['received']:
+                            upload['received'].remove(index)
+                        self._save(upload)
+                    raise UploadError(f"Part {index} is corrupt on disk, upload it again", 409)
+
+        expected = sha256 or upload.get('sha256')
+        if expected and digest.hexdigest() != expected.lower():
+            self.abort(upload_id)
+            raise UploadError(f"sha256 mismatch: {digest.hexdigest()} != {expected}", 422)
+
+        if os.path.exists(upload['target']) and not upload.get('overwrite'):
+            raise UploadError('File already exists', 409)
+        os.replace(upload['temp'], upload['target'])
+        directory_cache.invalidate(os.path.dirname(upload['target']))
+        self._forget(upload_id)
+        print(f"[UPLOAD] Upload abgeschlossen: {upload['target']}")
+        return upload['target'], digest.hexdigest()
+
+    def abort(self, upload_id):
+        with self.lock:
+            upload = self._load(upload_id)
+        if not upload:
+            return False
+        try:
+            os.remove(upload['temp'])
+        except OSError:
+            pass
+        directory_cache.invalidate(os.path.dirname(upload['temp']))
+        self._forget(upload_id)
+        return True
+
+    def prune(self):
+        """Discard uploads that have not received data for UPLOAD_EXPIRY seconds"""
+        with self.lock:
+            expired = [upload['id'] for upload in self._all() if time.time() - upload['updated'] > UPLOAD_EXPIRY]
+        for upload_id in expired:
+            print(f"[UPLOAD] Verwerfe abgelaufenen Upload {upload_id[:6]}")
+            self.abort(upload_id)
+
+    def _state_file(self, upload_id):
+        return os.path.join(self.state_dir, f"{upload_id}.json")
+
+    def _load(self, upload_id):
+        """Return the state of an upload, reading it from disk after a restart (lock held)"""
+        if upload_id in self.uploads:
+            return self.uploads[upload_id]
+        if not re.fullmatch(r'[A-Za-z0-9_-]+', upload_id or ''):
+            return None
+        try:
+            with open(self._state_file(upload_id)) as f:
+                upload = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self.uploads[upload_id] = upload
+        return upload
+
+    def _all(self):
+        """All known uploads including those only on disk (lock held)"""
+        if os.path.isdir(self.state_dir):
+            for name in os.listdir(self.state_dir):
+                if name.endswith('.json'):
+                    self._load(name[:-len('.json')])
+        return list(self.uploads.values())
+
+    def _save(self, upload):
+        os.makedirs(self.state_dir, exist_ok=True)
+        save_json_file(self._state_file(upload['id']), upload)
+
+    def _forget(self, upload_id):
+        with self.lock:
+            self.uploads.pop(upload_id, None)
+            try:
+                os.remove(self._state_file(upload_id))
+            except OSError:
+                pass
+
+    @staticmethod
+    def describe(upload):
+        return {
+            'upload_id': upload['id'],
+            'path': upload['target'],
+            'size': upload['size'],
+            'part_size': upload['part_size'],
+            'parts': upload['parts'],
+            'received': upload['received']
+        }
+
+upload_manager = UploadManager()
+
+# File Downloads
+FILE_DOWNLOAD_BLOCK_SIZE = 256 * 1024
+FILE_DOWNLOAD_MAX_RANGES = 32
+# 'sendfile': serve files from this process, zero-copy where the WSGI server allows it.
+# Behind a reverse proxy 'x-accel-redirect' (nginx) or 'x-sendfile' (Apache, lighttpd)
+# hand the transfer to the proxy, which then also handles Range and conditional requests.
+FILE_DOWNLOAD_MODE = 'sendfile'
+# nginx location (internal; alias /;) used for X-Accel-Redirect
+FILE_DOWNLOAD_ACCEL_PREFIX = '/internal-files'
+
+def file_etag(st):
+    """Strong validator from inode, size and mtime"""
+    return f"{st.st_ino:x}-{st.st_size:x}-{st.st_mtime_ns:x}"
+
+def _content_disposition(filename):
+    fallback = filename.encode('ascii', 'replace').decode().replace('\\', '_').replace('"', '_')
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{urllib.parse.quote(filename)}"
+
+def parse_byte_ranges(header_range, size):
+    """Resolve a parsed Range header into [(start, end_exclusive)]
+
+    Returns None if the header should be ignored (missing, not bytes, too
+    many ranges) and [] if no range is satisfiable.
+    """
+    if header_range is None or header_range.units != 'bytes':
+        return None
+    if len(header_range.ranges) > FILE_DOWNLOAD_MAX_RANGES:
+        return None
+    ranges = []
+    for start, stop in header_range.ranges:
+        if start < 0:
+            start, stop = max(0, size + start), size
+        else:
+            stop = size if stop is None else min(stop, size)
+        if start < stop:
+            ranges.append((start, stop))
+    return ranges
+
+def _is_not_modified(st, etag):
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since:
+        return int(st.st_mtime) <= request.if_modified_since.timestamp()
+    return False
+
+def _range_applies(st, etag):
+    """If-Range: only honour Range while the representation is unchanged"""
+    if_range = request.if_range
+    if if_range.etag:
+        return if_range.etag == etag
+    if if_range.date:
+        return int(st.st_mtime) <= if_range.date.timestamp()
+    return True
+
+def _file_body(environ, path, segments):
+    """WSGI body for a list of segments: bytes or (offset, length) regions of path
+
+    Under the werkzeug server the regions go straight to the client socket
+    with socket.sendfile() (os.sendfile on plain sockets); other servers get
+    their wsgi.file_wrapper for a single region or pread blocks otherwise.
+    """
+    sock = environ.get('werkzeug.socket')
+    file_wrapper = environ.get('wsgi.file_wrapper')
+    if sock is None and file_wrapper and len(segments) == 1 and not isinstance(segments[0], bytes):
+        # e.g. gunicorn: sends from the current file position for Content-Length bytes
+        offset, _ = segments[0]
+        f = open(path, 'rb')
+        f.seek(offset)
+        return file_wrapper(f, FILE_DOWNLOAD_BLOCK_SIZE)
+
+    def generate():
+        with open(path, 'rb') as f:
+            # Makes werkzeug send the headers before we write to the socket ourselves
+            yield b''
+            for segment in segments:
+                if isinstance(segment, bytes):
+                    yield segment
+                    continue
+                offset, length = segment
+                if sock is not None:
+                    sock.sendfile(f, offset, length)
+                    continue
+                end = offset + length
+                while offset < end:
+                    block = os.pread(f.fileno(), min(FILE_DOWNLOAD_BLOCK_SIZE, end - offset), offset)
+                    if not block:
+                        return
+                    offset += len(block)
+                    yield block
+
+    return generate()
+
+def send_file_response(abs_path):
+    """Serve a file as attachment with Range, multi-range and conditional request support"""
+    st = os.stat(abs_path)
+    size = st.st_size
+    etag = file_etag(st)
+    mimetype = mimetypes.guess_type(abs_path)[0] or 'application/octet-stream'
+    headers = {
+        'Content-Disposition': _content_disposition(os.path.basename(abs_path)),
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': 'no-cache'
+    }
+
+    if FILE_DOWNLOAD_MODE in ('x-accel-redirect', 'x-sendfile'):
+        if FILE_DOWNLOAD_MODE == 'x-accel-redirect':
+            headers['X-Accel-Redirect'] = FILE_DOWNLOAD_ACCEL_PREFIX + urllib.parse.quote(abs_path)
+        else:
+            headers['X-Sendfile'] = abs_path
+        return Response(status=200, mimetype=mimetype, headers=headers)
+
+    response = Response(status=200, mimetype=mimetype, headers=headers)
+    response.set_etag(etag)
+    response.last_modified = datetime.fromtimestamp(int(st.st_mtime), timezone.utc)
+
+    if _is_not_modified(st, etag):
+        response.status_code = 304
+        return response
+
+    ranges = parse_byte_ranges(request.range, size) if _range_applies(st, etag) else None
+    if ranges == []:
+        response.status_code = 416
+        response.headers['Content-Range'] = f"bytes */{size}"
+        return response
+
+    if ranges is None:
+        segments = [(0, size)]
+    elif len(ranges) == 1:
+        start, stop = ranges[0]
+        response.status_code = 206
+        response.headers['Content-Range'] = f"bytes {start}-{stop - 1}/{size}"
+        segments = [(start, stop - start)]
+    else:
+        boundary = secrets.token_hex(12)
+        segments = []
+        for start, stop in ranges:
+            segments.append((f"\r\n--{boundary}\r\nContent-Type: {mimetype}\r\n"
+                             f"Content-Range: bytes {start}-{stop - 1}/{size}\r\n\r\n").encode())
+            segments.append((start, stop - start))
+        segments.append(f"\r\n--{boundary}--\r\n".encode())
+        response.status_code = 206
+        response.headers['Content-Type'] = f"multipart/byteranges; boundary={boundary}"
+
+    response.response = _file_body(request.environ, abs_path, segments)
+    response.direct_passthrough = True
+    response.headers['Content-Length'] = str(sum(
+        len(segment) if isinstance(segment, bytes) else segment[1] for segment in segments))
+    return response
+
+# Directory Archives
+ARCHIVE_STREAM_CHUNK_SIZE = 256 * 1024
+# Chunks buffered between the archive writer thread and the response (bounds memory)
+ARCHIVE_STREAM_QUEUE_SIZE = 16
+ARCHIVE_STREAM_FORMATS = {
+    'zip': ('.zip', 'application/zip'),
+    'tar': ('.tar', 'application/x-tar'),
+    'tar.gz': ('.tar.gz', 'application/gzip'),
+    'tar.zst': ('.tar.zst', 'application/zstd'),
+}
+# (default, min, max) compression level per format
+ARCHIVE_STREAM_LEVELS = {
+    'zip': (6, 0, 9),
+    'tar.gz': (6, 0, 9),
+    'tar.zst': (3, 1, 19),
+}
+# Stored without recompression in zip archives
+ARCHIVE_STORED_EXTENSIONS = {
+    '.zip', '.jar', '.gz', '.tgz', '.bz2', '.xz', '.zst', '.7z', '.rar', '.lz4',
+    '.png', '.jpg', '.jpeg', '.gif', '.webp', '.mp3', '.ogg', '.opus', '.mp4', '.mkv', '.webm',
+}
+COMPRESSED_SIGNATURES = [
+    b'PK\x03\x04', b'\x1f\x8b', b'BZh', b'\xfd7zXZ\x00', b'\x28\xb5\x2f\xfd',
+    b'7z\xbc\xaf\x27\x1c', b'Rar!', b'\x89PNG', b'\xff\xd8\xff', b'OggS',
+]
+
+class ArchiveStreamCancelled(Exception):
+    """The client went away while the archive was being written"""
+    pass
+
+def is_compressed_file(path):
+    """Whether compressing the file again would be wasted effort (extension or magic bytes)"""
+    if os.path.splitext(path)[1].lower() in ARCHIVE_STORED_EXTENSIONS:
+        return True
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(8)
+    except OSError:
+        return False
+    return any(header.startswith(signature) for signature in COMPRESSED_SIGNATURES)
+
+def archive_excluded(rel_path, is_dir, patterns):
+    """gitignore-like matching: 'logs/' only matches directories, patterns
+    with a slash match the relative path, all others the name"""
+    name = os.path.basename(rel_path)
+    for pattern in patterns:
+        if pattern.endswith('/'):
+            if not is_dir:
+                continue
+            pattern = pattern.rstrip('/')
+        target = rel_path if '/' in pattern else name
+        if fnmatch.fnmatchcase(target, pattern.lstrip('/')):
+            return True
+    return False
+
+def walk_archive_entries(root, patterns):
+    """Yield (DirEntry, relative path, is_dir) below root in name order, without following symlinks"""
+    pending = ['']
+    while pending:
+        rel_dir = pending.pop()
+        try:
+            with os.scandir(os.path.join(root, rel_dir)) as entries:
+                entries = sorted(entries, key=lambda entry: entry.name)
+        except OSError as e:
+            print(f"[FILEMANAGER] Überspringe {rel_dir or root}: {e}")
+            continue
+        subdirs = []
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            is_dir = entry.is_dir(follow_symlinks=False)
+            if archive_excluded(rel_path, is_dir, patterns):
+                continue
+            yield entry, rel_path, is_dir
+            if is_dir:
+                subdirs.append(rel_path)
+        pending.extend(reversed(subdirs))
+
+class _ArchiveSink:
+    """Write-only file object handing (optionally compressed) chunks to a bounded queue"""
+
+    def __init__(self, compressor=None):
+        self.compressor = compressor
+        self.queue = queue.Queue(maxsize=ARCHIVE_STREAM_QUEUE_SIZE)
+        self.buffer = bytearray()
+        self.position = 0
+        self.cancelled = threading.Event()
+
+    def write(self, data):
+        if self.cancelled.is_set():
+            raise ArchiveStreamCancelled()
+        size = len(data)
+        self.position += size
+        self.buffer += self.compressor.compress(data) if self.compressor else data
+        if len(self.buffer) >= ARCHIVE_STREAM_CHUNK_SIZE:
+            self._emit()
+        return size
+
+    def tell(self):
+        # zipfile only needs tell(); without seek() it writes data descriptors
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        if self.compressor:
+            self.buffer += self.compressor.flush()
+        self._emit()
+
+    def _emit(self):
+        if not self.buffer:
+            return
+        chunk = bytes(self.buffer)
+        self.buffer.clear()
+        self.put(chunk)
+
+    def put(self, item):
+        while not self.cancelled.is_set():
+            try:
+                self.queue.put(item, timeout=1)
+                return
+            except queue.Full:
+                continue
+        raise ArchiveStreamCancelled()
+
+class _FixedSizeReader:
+    """Reads exactly size bytes (zero padded) so a file shrinking mid-read cannot break the tar stream"""
+
+    def __init__(self, f, size):
+        self.f = f
+        self.remaining = size
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.f.read(size)
+        if len(data) < size:
+            data += b'\0' * (size - len(data))
+        self.remaining -= len(data)
+        return data
+
+class DirectoryArchiver:
+    """Streams a directory as zip or tar(.gz/.zst) while walking it
+
+    The archive is written by a worker thread into a bounded queue, so memory
+    stays constant and nothing touches the disk. Zip entries of already
+    compressed files are stored; tar.gz/tar.zst compress the whole stream.
+    """
+
+    def __init__(self, root, archive_format='zip', level=None, exclude=()):
+        if archive_format not in ARCHIVE_STREAM_FORMATS:
+            raise ValueError(f"Unsupported format: {archive_format}")
+        if archive_format == 'tar.zst' and zstandard is None:
+            raise ValueError('tar.zst requires the zstandard package')
+        self.root = root
+        self.format = archive_format
+        self.exclude = [pattern.strip() for pattern in exclude if pattern.strip()]
+        self.level = None
+        if archive_format in ARCHIVE_STREAM_LEVELS:
+            default, minimum, maximum = ARCHIVE_STREAM_LEVELS[archive_format]
+            try:
+                self.level = default if level in (None, '') else max(minimum, min(int(level), maximum))
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid compression level: {level}")
+        self.base = os.path.basename(root.rstrip('/')) or 'root'
+        self.filename = self.base + ARCHIVE_STREAM_FORMATS[archive_format][0]
+        self.mimetype = ARCHIVE_STREAM_FORMATS[archive_format][1]
+        self.skipped = 0
+
+    def stream(self):
+        """Generator of archive chunks; closing it stops the writer thread"""
+        compressor = None
+        if self.format == 'tar.gz':
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        elif self.format == 'tar.zst':
+            compressor = zstandard.ZstdCompressor(level=self.level).compressobj()
+        sink = _ArchiveSink(compressor)
+
+        def produce():
+            # None marks the end; an exception is passed on so the download is aborted
+            # instead of ending like a complete (but truncated) archive
+            end = None
+            try:
+                if self.format == 'zip':
+                    self._write_zip(sink)
+                else:
+                    self._write_tar(sink)
+                sink.close()
+                if self.skipped:
+                    print(f"[FILEMANAGER] {self.filename}: {self.skipped} Einträge übersprungen")
+            except ArchiveStreamCancelled:
+                return
+            except Exception as e:
+                print(f"[FILEMANAGER] Fehler beim Packen von {self.root}: {e}")
+                end = e
+            try:
+                sink.put(end)
+            except ArchiveStreamCancelled:
+                pass
+
+        worker = threading.Thread(target=produce, name='archive-stream')
+        worker.daemon = True
+        worker.start()
+        try:
+            while True:
+                chunk = sink.queue.get()
+                if chunk is None:
+                    break
+                if isinstance(chunk, Exception):
+                    raise chunk
+                yield chunk
+        finally:
+            sink.cancelled.set()
+
+    def _write_zip(self, sink):
+        with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=self.level,
+                             allowZip64=True, strict_timestamps=False) as zf:
+            zf.write(self.root, self.base)
+            for entry, rel_path, is_dir in walk_archive_entries(self.root, self.exclude):
+                arcname = f"{self.base}/{rel_path}"
+                try:
+                    if entry.is_symlink():
+                        info = zipfile.ZipInfo(arcname, time.localtime(entry.stat(follow_symlinks=False).st_mtime)[:6])
+                        info.external_attr = (stat.S_IFLNK | 0o777) << 16
+                        zf.writestr(info, os.readlink(entry.path))
+                    elif is_dir:
+                        zf.write(entry.path, arcname)
+                    elif entry.is_file(follow_symlinks=False):
+                        if is_compressed_file(entry.path):
+                            zf.write(entry.path, arcname, compress_type=zipfile.ZIP_STORED)
+                        else:
+                            zf.write(entry.path, arcname)
+                except OSError as e:
+                    # Unreadable entries are skipped before anything of them is written
+                    self.skipped += 1
+                    print(f"[FILEMANAGER] Überspringe {entry.path}: {e}")
+
+    def _write_tar(self, sink):
+        with tarfile.open(fileobj=sink, mode='w|', format=tarfile.PAX_FORMAT) as tar:
+            tar.add(self.root, self.base, recursive=False)
+            for entry, rel_path, is_dir in walk_archive_entries(self.root, self.exclude):
+                arcname = f"{self.base}/{rel_path}"
+                try:
+                    if is_dir or entry.is_symlink():
+                        tar.add(entry.path, arcname, recursive=False)
+                    elif entry.is_file(follow_symlinks=False):
+                        with open(entry.path, 'rb') as f:
+                            info = tar.gettarinfo(arcname=arcname, fileobj=f)
+                            tar.addfile(info, _FixedSizeReader(f, info.size))
+                except OSError as e:
+                    self.skipped += 1
+                    print(f"[FILEMANAGER] Überspringe {entry.path}: {e}")
+
+def send_archive_response(abs_path, params):
+    """Stream abs_path as archive; params: format, level, exclude (repeatable or comma separated)"""
+    if hasattr(params, 'getlist'):
+        exclude = params.getlist('exclude')
+    else:
+        exclude = params.get('exclude') or []
+        exclude = [exclude] if isinstance(exclude, str) else exclude
+    patterns = [pattern for value in exclude for pattern in value.split(',')]
+    archiver = DirectoryArchiver(abs_path, params.get('format', 'zip'), params.get('level'), patterns)
+    return Response(archiver.stream(), mimetype=archiver.mimetype, headers={
+        'Content-Disposition': _content_disposition(archiver.filename),
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 # Filemanager API
-@app.route('/api/filemanager/list', methods=['POST'])
+@app.route('/api/filemanager/list', methods=['GET', 'POST'])
 def filemanager_list():
-    """List files and directories in a path"""
+    """List files and directories in a path
+
+    Parameters come from the JSON body (POST) or the query string (GET).
+    Optional: sort (name, size, modified, type, none), order (asc, desc),
+    filter (substring or glob), type (files, directories), show_hidden,
+    limit and cursor for pagination. With stream=true (or Accept:
+    application/x-ndjson) items are sent as NDJSON, one per line, followed
+    by a {"done": true, ...} line. Responses carry an ETag, a matching
+    If-None-Match is answered with 304.
+    """
     try:
-        data = request.get_json()
+        data = request.get_json() if request.method == 'POST' else request.args
         path = data.get('path', '/')
         
+        def flag(name, default=False):
+            value = data.get(name, default)
+            return value if isinstance(value, bool) else str(value).lower() in ('1', 'true', 'yes')
+        
         # Normalize path
         abs_path = os.path.abspath(path)
         
         if not os.path.exists(abs_path):
             return jsonify({'success': False, 'error': 'Path does not exist'}), 404
         
-        items = []
+        stream = flag('stream') or 'application/x-ndjson' in request.headers.get('Accept', '')
+        options = {
+            'sort': data.get('sort', 'name'),
+            'order': data.get('order', 'asc'),
+            'pattern': data.get('filter'),
+            'kind': data.get('type'),
+            'show_hidden': flag('show_hidden', True),
+            'cursor': data.get('cursor'),
+            'limit': data.get('limit', FILEMANAGER_PAGE_SIZE)
+        }
+        
         try:
-            for item_name in os.listdir(abs_path):
-                item_path = os.path.join(abs_path, item_name)
-                try:
-                    stat_info = os.stat(item_path)
-                    is_dir = os.path.isdir(item_path)
-                    
-                    items.append({
-                        'name': item_name,
-                        'path': item_path,
-                        'is_directory': is_dir,
-                        'size': stat_info.st_size if not is_dir else 0,
-                        'modified': datetime.fromtimestamp(stat_info.st_mtime).isoformat(),
-                        'permissions': oct(stat_info.st_mode)[-3:],
-                    })
-                except (PermissionError, OSError):
-                    # Skip items we can't access
-                    continue
+            entries, version = directory_cache.get(abs_path)
+            request_key = json.dumps([abs_path, version, stream, options], sort_keys=True)
+            etag = hashlib.sha1(request_key.encode()).hexdigest()
+            if etag in request.if_none_match:
+                response = Response(status=304)
+                response.set_etag(etag)
+                return response
             
-            # Sort: directories first, then files, both alphabetically
-            items.sort(key=lambda x: (not x['is_directory'], x['name'].lower()))
+            listing = iter_directory(abs_path, entries=entries, **options)
+            # Read the first item here so errors are reported before streaming starts
+            first = next(listing)
+        except ListingError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        except PermissionError:
+            return jsonify({'success': False, 'error': 'Permission denied'}), 403
+        
+        def results():
+            yield first
+            yield from listing
+        
+        if stream:
+            def generate():
+                for result in results():
+                    if 'next_cursor' in result:
+                        yield json.dumps({'done': True, 'path': abs_path, **result}) + '\n'
+                    else:
+                        yield json.dumps(result) + '\n'
             
-            return jsonify({
+            response = Response(generate(), mimetype='application/x-ndjson', headers={
+                'X-Accel-Buffering': 'no'
+            })
+        else:
+            items = list(results())
+            summary = items.pop()
+            response = jsonify({
                 'success': True,
                 'path': abs_path,
-                'items': items
+                'items': items,
+                'next_cursor': summary['next_cursor'],
+                'total': summary['total']
             })
-            
-        except PermissionError:
-            return jsonify({'success': False, 'error': 'Permission denied'}), 403
+        
+        # Let clients cache the listing but revalidate it on every use
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
             
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -2176,6 +6774,7 @@ def filemanager_upload():
         # Save file
         file_path = os.path.join(abs_path, file.filename)
         file.save(file_path)
+        directory_cache.invalidate(abs_path)
         
         return jsonify({
             'success': True,
@@ -2186,12 +6785,89 @@ def filemanager_upload():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@app.route('/api/filemanager/download', methods=['POST'])
-def filemanager_download():
-    """Download a file"""
+@app.route('/api/filemanager/upload/init', methods=['POST'])
+def filemanager_upload_init():
+    """Start (or resume) a chunked upload
+
+    Body: path (directory), filename, size, optional part_size, sha256,
+    resume_key and overwrite. Returns the upload ID, part layout and the
+    parts already received when an upload with the same resume_key exists.
+    """
     try:
-        from flask import send_file
         data = request.get_json()
+        upload = upload_manager.init(
+            data.get('path', '/'),
+            data.get('filename'),
+            data.get('size', 0),
+            part_size=data.get('part_size'),
+            sha256=data.get('sha256'),
+            resume_key=data.get('resume_key'),
+            overwrite=data.get('overwrite', False)
+        )
+        return jsonify({'success': True, **UploadManager.describe(upload)})
+    except UploadError as e:
+        return jsonify({'success': False, 'error': str(e)}), e.status
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'error': 'Invalid size'}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/filemanager/upload/<upload_id>', methods=['GET'])
+def filemanager_upload_status(upload_id):
+    """State of a chunked upload (which parts are acknowledged)"""
+    upload = upload_manager.get(upload_id)
+    if not upload:
+        return jsonify({'success': False, 'error': 'Upload not found'}), 404
+    return jsonify({'success': True, **UploadManager.describe(upload)})
+
+@app.route('/api/filemanager/upload/<upload_id>/parts/<int:index>', methods=['PUT'])
+def filemanager_upload_part(upload_id, index):
+    """Write one part from the raw request body (optional X-Part-SHA256 header)"""
+    try:
+        upload = upload_manager.write_part(
+            upload_id, index, request.stream,
+            length=request.content_length,
+            sha256=request.headers.get('X-Part-SHA256')
+        )
+        return jsonify({'success': True, 'part': index, 'received': len(upload['received']), 'parts': upload['parts']})
+    except UploadError as e:
+        return jsonify({'success': False, 'error': str(e)}), e.status
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/filemanager/upload/<upload_id>/complete', methods=['POST'])
+def filemanager_upload_complete(upload_id):
+    """Finish a chunked upload; the parts are re-verified and the file's sha256 returned"""
+    try:
+        data = request.get_json(silent=True) or {}
+        path, sha256 = upload_manager.complete(upload_id, sha256=data.get('sha256'))
+        return jsonify({
+            'success': True,
+            'message': f'File {os.path.basename(path)} uploaded successfully',
+            'path': path,
+            'sha256': sha256
+        })
+    except UploadError as e:
+        return jsonify({'success': False, 'error': str(e)}), e.status
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/filemanager/upload/<upload_id>', methods=['DELETE'])
+def filemanager_upload_abort(upload_id):
+    """Abort a chunked upload and remove its partial file"""
+    if not upload_manager.abort(upload_id):
+        return jsonify({'success': False, 'error': 'Upload not found'}), 404
+    return jsonify({'success': True, 'message': 'Upload aborted'})
+
+@app.route('/api/filemanager/download', methods=['GET', 'POST'])
+def filemanager_download():
+    """Download a file (GET ?path=... supports Range, If-Range and conditional requests)
+
+    Directories are streamed as archive: format (zip, tar, tar.gz, tar.zst),
+    level and exclude patterns (e.g. exclude=logs/&exclude=*.tmp).
+    """
+    try:
+        data = request.get_json() if request.method == 'POST' else request.args
         file_path = data.get('path')
         
         if not file_path:
@@ -2203,9 +6879,12 @@ def filemanager_download():
             return jsonify({'success': False, 'error': 'File not found'}), 404
         
         if os.path.isdir(abs_path):
-            return jsonify({'success': False, 'error': 'Cannot download directories'}), 400
+            try:
+                return send_archive_response(abs_path, data)
+            except ValueError as e:
+                return jsonify({'success': False, 'error': str(e)}), 400
         
-        return send_file(abs_path, as_attachment=True)
+        return send_file_response(abs_path)
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -2265,6 +6944,7 @@ def filemanager_write():
         # Write file
         with open(abs_path, 'w', encoding='utf-8') as f:
             f.write(content)
+        directory_cache.invalidate(os.path.dirname(abs_path))
         
         return jsonify({
             'success': True,
@@ -2296,6 +6976,8 @@ def filemanager_delete():
         else:
             os.remove(abs_path)
             message = 'File deleted successfully'
+        directory_cache.invalidate(abs_path)
+        directory_cache.invalidate(os.path.dirname(abs_path))
         
         return jsonify({
             'success': True,
@@ -2330,6 +7012,8 @@ def filemanager_rename():
         
         # Rename
         os.rename(abs_old_path, new_path)
+        directory_cache.invalidate(abs_old_path)
+        directory_cache.invalidate(directory)
         
         return jsonify({
             'success': True,
@@ -2360,6 +7044,7 @@ def filemanager_create_folder():
             return jsonify({'success': False, 'error': 'Folder already exists'}), 400
         
         os.makedirs(new_folder)
+        directory_cache.invalidate(os.path.dirname(new_folder))
         
         return jsonify({
             'success': True,
@@ -2396,6 +7081,9 @@ def filemanager_move():
         
         # Move
         shutil.move(abs_source, abs_dest)
+        directory_cache.invalidate(abs_source)
+        directory_cache.invalidate(os.path.dirname(abs_source))
+        directory_cache.invalidate(os.path.dirname(abs_dest))
         
         return jsonify({
             'success': True,
@@ -2410,7 +7098,7 @@ if __name__ == '__main__':
     print("Starting Homeserver Control Panel Backend...")
     print("API running on http://localhost:5000")
     print("\nAvailable endpoints:")
-    print("  - System Stats: GET /api/system/stats")
+    print("  - System Stats: GET /api/system/stats, /api/system/stats/history")
     print("  - Services: GET /api/services/list")
     print("  - DNS Management: GET/POST/DELETE /api/dns/*")
     print("  - Pi-hole: GET/POST /api/pihole/*")
@@ -2426,5 +7114,15 @@ if __name__ == '__main__':
         print(f"\n✓ Linux Credentials geladen für: {creds.get('username')}@{creds.get('host')}")
     else:
         print("\n⚠️  Keine Credentials gespeichert. Bitte in den Einstellungen konfigurieren.")
-    
-    app.run(host='0.0.0.0', port=5000, debug=True)
+
+    # Start background workers. With debug=True the reloader runs this module in a
+    # watcher process as well; only the child it spawns (WERKZEUG_RUN_MAIN) serves requests
+    debug = True
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        system_sampler.ensure_started()
+        service_watcher.ensure_started()
+        gameserver_metrics.ensure_started()
+        ssh_sessions.ensure_started()
+        install_scheduler.ensure_started()
+
+    app.run(host='0.0.0.0', port=5000, debug=debug)
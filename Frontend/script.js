@@ -154,10 +154,15 @@ document.addEventListener('DOMContentLoaded', () => {
     loadServices();
     loadGameservers();
     
+    // Service changes are pushed by the backend, polling is only the fallback
+    const serviceEventsActive = subscribeServiceEvents();
+    
     // Auto-refresh every 3 seconds (optimal balance)
     setInterval(() => {
         loadSystemStats();
-        loadServices();
+        if (!serviceEventsActive) {
+            loadServices();
+        }
     }, 3000);
     
     // Check system online status every second
@@ -348,31 +353,59 @@ async function loadSystemStats() {
 }
 
 // Load Services
+let currentServices = [];
+
 async function loadServices() {
     try {
         const data = await apiRequest(`${API_BASE}/services/list`);
         
         if (data && data.success) {
-            const servicesList = document.getElementById('services-list');
-            servicesList.innerHTML = '';
-            
-            data.services.forEach(service => {
-                const serviceItem = document.createElement('div');
-                serviceItem.className = 'service-item';
-                serviceItem.innerHTML = `
-                    <span class="service-name">${service.name}</span>
-                    <span class="status-badge ${service.status === 'running' ? 'running' : 'stopped'}">
-                        ${service.status === 'running' ? 'Running' : 'Stopped'}
-                    </span>
-                `;
-                servicesList.appendChild(serviceItem);
-            });
+            renderServices(data.services);
         }
     } catch (error) {
         console.error('Error loading services:', error);
     }
 }
 
+function renderServices(services) {
+    currentServices = services;
+    const servicesList = document.getElementById('services-list');
+    servicesList.innerHTML = '';
+    
+    services.forEach(service => {
+        const serviceItem = document.createElement('div');
+        serviceItem.className = 'service-item';
+        serviceItem.innerHTML = `
+            <span class="service-name">${service.name}</span>
+            <span class="status-badge ${service.status === 'running' ? 'running' : 'stopped'}">
+                ${service.status === 'running' ? 'Running' : 'Stopped'}
+            </span>
+        `;
+        servicesList.appendChild(serviceItem);
+    });
+}
+
+// Subscribe to pushed service state changes (Server-Sent Events)
+function subscribeServiceEvents() {
+    if (!window.EventSource) {
+        return false;
+    }
+    
+    const source = new EventSource(`${API_BASE}/services/events`);
+    source.onmessage = (event) => {
+        const data = JSON.parse(event.data);
+        if (data.type === 'snapshot') {
+            renderServices(data.services);
+        } else if (data.type === 'change') {
+            const services = currentServices.map(service =>
+                service.name === data.service.name ? data.service : service
+            );
+            renderServices(services);
+        }
+    };
+    return true;
+}
+
 // Service Control
 async function controlService(service, action) {
     try {
@@ -557,6 +590,8 @@ let currentServerForConfig = null;
 let currentServerForConsole = null;
 let currentServerForErrorLog = null;
 let consoleRefreshInterval = null;
+let consoleEventSource = null;
+let consoleOffset = null;
 
 async function controlGameserver(name, action) {
     try {
@@ -753,7 +788,58 @@ function resetGameserverForm() {
     document.getElementById('gameserver-install-progress').style.display = 'none';
 }
 
-async function pollInstallationStatus(installationId) {
+function pollInstallationStatus(installationId) {
+    if (!window.EventSource) {
+        pollInstallationStatusFallback(installationId);
+        return;
+    }
+    
+    let finished = false;
+    let lastMessage = '';
+    let lastProgress = 0;
+    const source = new EventSource(`${API_BASE}/gameserver/installation/${installationId}/events`);
+    
+    source.onmessage = (event) => {
+        const data = JSON.parse(event.data);
+        
+        if (data.type === 'download') {
+            const downloaded = data.percent !== null ? `${data.percent}%` : `${(data.bytes / 1048576).toFixed(1)} MB`;
+            updateInstallStatus('info', `${lastMessage} (${downloaded})`, lastProgress);
+            return;
+        }
+        if (data.type !== 'status' && data.type !== 'snapshot') {
+            return;
+        }
+        
+        const status = data.status;
+        lastMessage = status.message || '';
+        lastProgress = status.progress || 0;
+        
+        if (status.status === 'complete') {
+            finished = true;
+            source.close();
+            showInstallSuccess();
+            loadGameservers();
+        } else if (status.status === 'error' || status.status === 'cancelled') {
+            finished = true;
+            source.close();
+            showInstallError(lastMessage || 'Unbekannter Fehler bei der Installation');
+            loadGameservers();
+        } else if (status.status === 'installing' || status.status === 'queued') {
+            updateInstallStatus('info', lastMessage, lastProgress);
+        }
+    };
+    
+    source.onerror = () => {
+        // Stream closed or unavailable, fall back to polling
+        source.close();
+        if (!finished) {
+            pollInstallationStatusFallback(installationId);
+        }
+    };
+}
+
+async function pollInstallationStatusFallback(installationId) {
     let pollCount = 0;
     const maxPolls = 300; // 5 Minuten bei 1 Sekunde Intervall
     
@@ -774,18 +860,18 @@ async function pollInstallationStatus(installationId) {
                 const status = data.status;
                 const progress = status.progress || 0;
                 const message = status.message || '';
-                const statusType = status.status; // 'installing', 'complete', 'error'
+                const statusType = status.status; // 'queued', 'installing', 'complete', 'error', 'cancelled'
                 
                 // Update UI basierend auf Status
                 if (statusType === 'complete') {
                     clearInterval(pollInterval);
                     showInstallSuccess();
                     loadGameservers();
-                } else if (statusType === 'error') {
+                } else if (statusType === 'error' || statusType === 'cancelled') {
                     clearInterval(pollInterval);
                     showInstallError(message || 'Unbekannter Fehler bei der Installation');
                     loadGameservers(); // Aktualisiere Liste
-                } else if (statusType === 'installing') {
+                } else if (statusType === 'installing' || statusType === 'queued') {
                     updateInstallStatus('info', message, progress);
                     // Aktualisiere Gameserver-Liste alle 10 Sekunden während Installation
                     if (pollCount % 10 === 0) {
@@ -842,11 +928,12 @@ function createGameserverCard(server, theme = 'classic') {
     const card = document.createElement('div');
     
     const statusClass = server.status === 'running' ? 'running' : 
-                       server.status === 'installing' ? 'installing' : 
+                       server.status === 'installing' || server.status === 'queued' ? 'installing' : 
                        server.status === 'error' ? 'error' : 'stopped';
     
     const statusText = server.status === 'running' ? 'Läuft' : 
                       server.status === 'installing' ? 'Installiert...' : 
+                      server.status === 'queued' ? `Warteschlange (${server.queue_position || '-'})` : 
                       server.status === 'error' ? 'Fehler' : 'Gestoppt';
     
     const typeIcons = {
@@ -904,7 +991,7 @@ function createGameserverCard(server, theme = 'classic') {
             
             <div class="quantum-gameserver-controls">
                 <button class="quantum-btn quantum-btn-success" onclick="controlGameserver('${server.name}', 'start')" 
-                        ${server.status === 'running' || server.status === 'installing' ? 'disabled' : ''}>
+                        ${server.status === 'running' || server.status === 'installing' || server.status === 'queued' ? 'disabled' : ''}>
                     <i class="fas fa-play"></i>
                     <span>Start</span>
                 </button>
@@ -955,7 +1042,7 @@ function createGameserverCard(server, theme = 'classic') {
             </div>
             <div class="gameserver-controls">
                 <button class="btn btn-sm btn-success" onclick="controlGameserver('${server.name}', 'start')" 
-                        ${server.status === 'running' || server.status === 'installing' ? 'disabled' : ''}>
+                        ${server.status === 'running' || server.status === 'installing' || server.status === 'queued' ? 'disabled' : ''}>
                     <i class="fas fa-play"></i> Start
                 </button>
                 <button class="btn btn-sm btn-warning" onclick="controlGameserver('${server.name}', 'restart')"
@@ -1066,8 +1153,38 @@ async function openServerConsole(serverName) {
     // Load initial console output
     await refreshConsole();
     
-    // Auto-refresh every 3 seconds
-    consoleRefreshInterval = setInterval(refreshConsole, 3000);
+    // Stream new output, fall back to refreshing every 3 seconds
+    if (window.EventSource && consoleOffset !== null) {
+        subscribeConsole(serverName);
+    } else {
+        consoleRefreshInterval = setInterval(refreshConsole, 3000);
+    }
+}
+
+function subscribeConsole(serverName) {
+    consoleEventSource = new EventSource(`${API_BASE}/gameserver/${serverName}/console/stream?offset=${consoleOffset}`);
+    consoleEventSource.onmessage = (event) => {
+        const data = JSON.parse(event.data);
+        const consoleOutput = document.getElementById('console-output');
+        consoleOffset = data.offset;
+        consoleOutput.textContent += data.output;
+        consoleOutput.scrollTop = consoleOutput.scrollHeight;
+    };
+    consoleEventSource.onerror = () => {
+        // EventSource reconnects by itself but would restart at the old offset
+        consoleEventSource.close();
+        consoleEventSource = null;
+        if (currentServerForConsole === serverName && !consoleRefreshInterval) {
+            consoleRefreshInterval = setInterval(refreshConsole, 3000);
+        }
+    };
+}
+
+function closeConsoleStream() {
+    if (consoleEventSource) {
+        consoleEventSource.close();
+        consoleEventSource = null;
+    }
 }
 
 async function refreshConsole() {
@@ -1079,6 +1196,7 @@ async function refreshConsole() {
         
         if (data.success) {
             const output = data.output || 'Keine Ausgabe verfügbar';
+            consoleOffset = data.offset !== undefined ? data.offset : null;
             document.getElementById('console-output').textContent = output;
             // Scroll to bottom
             const consoleOutput = document.getElementById('console-output');
@@ -1109,8 +1227,10 @@ async function sendConsoleCommand() {
         
         if (data.success) {
             input.value = '';
-            // Refresh console after command
-            setTimeout(refreshConsole, 500);
+            // Streamed output arrives by itself, otherwise refresh after the command
+            if (!consoleEventSource) {
+                setTimeout(refreshConsole, 500);
+            }
         } else {
             showNotification('error', data.error || 'Befehl fehlgeschlagen');
         }
@@ -1231,6 +1351,101 @@ async function loadApacheLogs() {
 let terminalHistory = [];
 let historyIndex = -1;
 
+// Interactive terminal (xterm.js over /api/ssh/stream)
+let xterm = null;
+let xtermFit = null;
+let terminalSocket = null;
+
+function setTerminalMode(interactive) {
+    document.getElementById('terminal-xterm').style.display = interactive ? 'block' : 'none';
+    document.getElementById('terminal-output').style.display = interactive ? 'none' : 'block';
+    document.getElementById('terminal-input-group').style.display = interactive ? 'none' : 'flex';
+}
+
+// Open the interactive terminal; falls back to the line based terminal (/ssh/execute)
+function openTerminalStream() {
+    if (typeof Terminal === 'undefined' || typeof WebSocket === 'undefined') {
+        return;
+    }
+    
+    const container = document.getElementById('terminal-xterm');
+    setTerminalMode(true);
+    xterm = new Terminal({ cursorBlink: true, fontSize: 14, theme: { background: '#000000' } });
+    xtermFit = new FitAddon.FitAddon();
+    xterm.loadAddon(xtermFit);
+    xterm.open(container);
+    xtermFit.fit();
+    
+    const params = new URLSearchParams({
+        session_id: sshSessionId,
+        term: 'xterm-256color',
+        cols: xterm.cols,
+        rows: xterm.rows
+    });
+    const socket = new WebSocket(`${API_BASE.replace(/^http/, 'ws')}/ssh/stream?${params}`);
+    socket.binaryType = 'arraybuffer';
+    terminalSocket = socket;
+    let opened = false;
+    const encoder = new TextEncoder();
+    
+    socket.onopen = () => {
+        opened = true;
+        xterm.focus();
+    };
+    
+    socket.onmessage = (event) => {
+        if (event.data instanceof ArrayBuffer) {
+            xterm.write(new Uint8Array(event.data));
+            return;
+        }
+        const message = JSON.parse(event.data);
+        if (message.type === 'error') {
+            showNotification('warning', message.error);
+            closeTerminalStream();
+        } else if (message.type === 'closed') {
+            xterm.write('\r\n[Verbindung beendet]\r\n');
+        }
+    };
+    
+    socket.onclose = () => {
+        if (terminalSocket !== socket) return;
+        if (!opened) {
+            // WebSocket not reachable (e.g. proxy), keep using the line based terminal
+            closeTerminalStream();
+        } else {
+            terminalSocket = null;
+        }
+    };
+    
+    xterm.onData(data => {
+        if (socket.readyState === WebSocket.OPEN) {
+            socket.send(encoder.encode(data));
+        }
+    });
+    
+    xterm.onResize(({ cols, rows }) => {
+        if (socket.readyState === WebSocket.OPEN) {
+            socket.send(JSON.stringify({ type: 'resize', cols, rows }));
+        }
+    });
+}
+
+function closeTerminalStream() {
+    const socket = terminalSocket;
+    terminalSocket = null;
+    if (socket) socket.close();
+    if (xterm) {
+        xterm.dispose();
+        xterm = null;
+        xtermFit = null;
+    }
+    setTerminalMode(false);
+}
+
+window.addEventListener('resize', () => {
+    if (xtermFit) xtermFit.fit();
+});
+
 // SSH Connection Functions
 async function connectSSH() {
     const host = document.getElementById('ssh-host').value.trim();
@@ -1281,6 +1496,9 @@ async function connectSSH() {
             // Focus on input
             document.getElementById('terminal-input').focus();
             
+            // Full terminal emulation when available
+            openTerminalStream();
+            
             showNotification('success', 'SSH Verbindung hergestellt');
         } else {
             statusDiv.innerHTML = `<p style="color: var(--danger);">${data.error}</p>`;
@@ -1296,6 +1514,8 @@ async function connectSSH() {
 async function disconnectSSH() {
     if (!sshSessionId) return;
     
+    closeTerminalStream();
+    
     try {
         const response = await fetch(`${API_BASE}/ssh/disconnect`, {
             method: 'POST',
@@ -1502,6 +1722,7 @@ async function autoFillPassword() {
 
 function clearTerminal() {
     document.getElementById('terminal-output').innerHTML = '';
+    if (xterm) xterm.clear();
 }
 
 // Modal Functions
@@ -1509,9 +1730,12 @@ function closeModal(modalId) {
     document.getElementById(modalId).classList.remove('active');
     
     // Stop console refresh if closing console modal
-    if (modalId === 'serverConsoleModal' && consoleRefreshInterval) {
-        clearInterval(consoleRefreshInterval);
-        consoleRefreshInterval = null;
+    if (modalId === 'serverConsoleModal') {
+        closeConsoleStream();
+        if (consoleRefreshInterval) {
+            clearInterval(consoleRefreshInterval);
+            consoleRefreshInterval = null;
+        }
         currentServerForConsole = null;
     }
     
@@ -1999,6 +2223,8 @@ let currentPath = '/';
 let currentView = 'grid';
 let selectedItem = null;
 let fileManagerItems = [];
+let fileManagerCursor = null;
+let fileManagerTotal = 0;
 
 // Load files in current directory
 async function loadFileManager(path = currentPath) {
@@ -2006,15 +2232,15 @@ async function loadFileManager(path = currentPath) {
         const fileGrid = document.getElementById('file-grid');
         fileGrid.innerHTML = '<div class="filemanager-loading"><div class="spinner"></div></div>';
         
-        const response = await apiRequest(`${API_BASE}/filemanager/list`, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ path })
-        });
+        // GET so the browser revalidates cached listings via ETag
+        const params = new URLSearchParams({ path });
+        const response = await apiRequest(`${API_BASE}/filemanager/list?${params}`);
         
         if (response.success) {
             currentPath = response.path;
             fileManagerItems = response.items;
+            fileManagerCursor = response.next_cursor;
+            fileManagerTotal = response.total;
             renderBreadcrumb();
             renderFileGrid();
         } else {
@@ -2030,6 +2256,28 @@ async function loadFileManager(path = currentPath) {
     }
 }
 
+// Load the next page of the current directory
+async function loadMoreFiles() {
+    if (!fileManagerCursor) return;
+    
+    try {
+        const params = new URLSearchParams({ path: currentPath, cursor: fileManagerCursor });
+        const response = await apiRequest(`${API_BASE}/filemanager/list?${params}`);
+        
+        if (response.success) {
+            fileManagerItems = fileManagerItems.concat(response.items);
+            fileManagerCursor = response.next_cursor;
+            fileManagerTotal = response.total;
+            renderFileGrid();
+        } else {
+            showNotification('danger', response.error || 'Fehler beim Laden');
+        }
+    } catch (error) {
+        console.error('Error loading files:', error);
+        showNotification('danger', 'Verbindungsfehler');
+    }
+}
+
 // Render breadcrumb navigation
 function renderBreadcrumb() {
     const breadcrumbPath = document.getElementById('breadcrumb-path');
@@ -2085,6 +2333,12 @@ function renderFileGrid() {
         return;
     }
     
+    const moreHTML = fileManagerCursor ? `<div class="file-grid-more">
+            <button class="btn btn-sm btn-info" onclick="loadMoreFiles()">
+                <i class="fas fa-chevron-down"></i> Weitere laden (${fileManagerItems.length} von ${fileManagerTotal})
+            </button>
+        </div>` : '';
+    
     // Render Classic Design
     if (fileGridClassic) {
         fileGridClassic.innerHTML = fileManagerItems.map(item => {
@@ -2104,7 +2358,7 @@ function renderFileGrid() {
                     <div class="file-info">${date}</div>
                 </div>
             `;
-        }).join('');
+        }).join('') + moreHTML;
     }
     
     // Render Quantum Design
@@ -2126,7 +2380,7 @@ function renderFileGrid() {
                     ${!item.is_directory ? `<div class="quantum-file-size">${size}</div>` : ''}
                 </div>
             `;
-        }).join('');
+        }).join('') + moreHTML;
     }
 }
 
@@ -2244,9 +2498,8 @@ async function contextAction(action) {
             }
             break;
         case 'download':
-            if (!selectedItem.isDirectory) {
-                downloadFile(selectedItem.path);
-            }
+            // Directories are streamed as zip archive
+            downloadFile(selectedItem.path);
             break;
         case 'rename':
             showRenameModal();
@@ -2288,6 +2541,89 @@ function showUploadModal() {
     document.getElementById('uploadModal').classList.add('active');
 }
 
+const UPLOAD_PART_SIZE = 8 * 1024 * 1024;
+const UPLOAD_CONCURRENCY = 4;
+const UPLOAD_PART_RETRIES = 3;
+
+async function sha256Hex(buffer) {
+    // crypto.subtle is only available in secure contexts (HTTPS / localhost)
+    if (!window.crypto || !window.crypto.subtle) return null;
+    const digest = await window.crypto.subtle.digest('SHA-256', buffer);
+    return Array.from(new Uint8Array(digest)).map(b => b.toString(16).padStart(2, '0')).join('');
+}
+
+async function uploadPart(uploadId, file, index, partSize) {
+    const blob = file.slice(index * partSize, (index + 1) * partSize);
+    const buffer = await blob.arrayBuffer();
+    const hash = await sha256Hex(buffer);
+    const headers = { 'Content-Type': 'application/octet-stream' };
+    if (hash) headers['X-Part-SHA256'] = hash;
+    
+    for (let attempt = 1; ; attempt++) {
+        try {
+            const response = await fetch(`${API_BASE}/filemanager/upload/${uploadId}/parts/${index}`, {
+                method: 'PUT',
+                headers,
+                body: buffer
+            });
+            const data = await response.json();
+            if (data.success) return data;
+            if (attempt >= UPLOAD_PART_RETRIES) throw new Error(data.error || `Teil ${index} fehlgeschlagen`);
+        } catch (error) {
+            if (attempt >= UPLOAD_PART_RETRIES) throw error;
+        }
+        await new Promise(resolve => setTimeout(resolve, 1000 * attempt));
+    }
+}
+
+// Upload a file in parts; an interrupted upload of the same file resumes with the missing parts
+async function uploadFileChunked(file, path) {
+    const initResponse = await fetch(`${API_BASE}/filemanager/upload/init`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+            path,
+            filename: file.name,
+            size: file.size,
+            part_size: UPLOAD_PART_SIZE,
+            resume_key: `${file.name}:${file.size}:${file.lastModified}`,
+            overwrite: true
+        })
+    });
+    const upload = await initResponse.json();
+    if (!upload.success) return upload;
+    
+    let received = upload.received;
+    for (let round = 1; ; round++) {
+        const done = new Set(received);
+        const pending = [];
+        for (let index = 0; index < upload.parts; index++) {
+            if (!done.has(index)) pending.push(index);
+        }
+        
+        const workers = Array.from({ length: Math.min(UPLOAD_CONCURRENCY, pending.length) }, async () => {
+            while (pending.length > 0) {
+                await uploadPart(upload.upload_id, file, pending.shift(), upload.part_size);
+            }
+        });
+        await Promise.all(workers);
+        
+        // The server re-reads every part; one that no longer matches is dropped (409) and sent again
+        const completeResponse = await fetch(`${API_BASE}/filemanager/upload/${upload.upload_id}/complete`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({})
+        });
+        const result = await completeResponse.json();
+        if (result.success || completeResponse.status !== 409 || round >= 2) return result;
+        
+        const statusResponse = await fetch(`${API_BASE}/filemanager/upload/${upload.upload_id}`);
+        const status = await statusResponse.json();
+        if (!status.success) return result;
+        received = status.received;
+    }
+}
+
 async function uploadFiles() {
     const fileInput = document.getElementById('upload-file-input');
     const files = fileInput.files;
@@ -2298,17 +2634,8 @@ async function uploadFiles() {
     }
     
     for (let file of files) {
-        const formData = new FormData();
-        formData.append('file', file);
-        formData.append('path', currentPath);
-        
         try {
-            const response = await fetch(`${API_BASE}/filemanager/upload`, {
-                method: 'POST',
-                body: formData
-            });
-            
-            const data = await response.json();
+            const data = await uploadFileChunked(file, currentPath);
             
             if (data.success) {
                 showNotification('success', `${file.name} hochgeladen`);
@@ -2361,17 +2688,8 @@ function setupFileDropZone() {
 
 async function handleFiles(files) {
     for (let file of files) {
-        const formData = new FormData();
-        formData.append('file', file);
-        formData.append('path', currentPath);
-        
         try {
-            const response = await fetch(`${API_BASE}/filemanager/upload`, {
-                method: 'POST',
-                body: formData
-            });
-            
-            const data = await response.json();
+            const data = await uploadFileChunked(file, currentPath);
             
             if (data.success) {
                 showNotification('success', `${file.name} hochgeladen`);
@@ -2539,32 +2857,15 @@ async function saveFileContent() {
 }
 
 // Download file
-async function downloadFile(path) {
-    try {
-        const response = await fetch(`${API_BASE}/filemanager/download`, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ path })
-        });
-        
-        if (response.ok) {
-            const blob = await response.blob();
-            const url = window.URL.createObjectURL(blob);
-            const a = document.createElement('a');
-            a.href = url;
-            a.download = path.split('/').pop();
-            document.body.appendChild(a);
-            a.click();
-            window.URL.revokeObjectURL(url);
-            document.body.removeChild(a);
-            showNotification('success', 'Download gestartet');
-        } else {
-            showNotification('danger', 'Download fehlgeschlagen');
-        }
-    } catch (error) {
-        console.error('Error downloading file:', error);
-        showNotification('danger', 'Download fehlgeschlagen');
-    }
+function downloadFile(path) {
+    // Plain GET link: the browser streams the file to disk and can resume it
+    const a = document.createElement('a');
+    a.href = `${API_BASE}/filemanager/download?${new URLSearchParams({ path })}`;
+    a.download = '';
+    document.body.appendChild(a);
+    a.click();
+    document.body.removeChild(a);
+    showNotification('success', 'Download gestartet');
 }
 
 // Initialize file manager when section is activated